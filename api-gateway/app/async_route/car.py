@@ -0,0 +1,41 @@
+from quart import Blueprint, Response, request, jsonify
+from app.upstream.configuration import async_upstream
+from app.cache.configuration import async_cached_get, response_cache
+from app.env_variables import RESPONSE_CACHE_LIST_TTL, RESPONSE_CACHE_ITEM_TTL
+import logging
+
+"""
+Async (ASGI) counterpart of app.route.car, exposing the same url surface.
+"""
+cars_blueprint = Blueprint('cars_blueprint', __name__, url_prefix='/cars')
+
+
+@cars_blueprint.route('/all')
+async def get_all() -> Response:
+    # Pagination cursor, filters and fields are passed to cars service, so they are part of the cache key
+    path = f"/cars/all?{request.query_string.decode()}" if request.query_string else '/cars/all'
+    res = await async_cached_get('cars', path, RESPONSE_CACHE_LIST_TTL)
+    return res.as_tuple(request.if_none_match)
+
+
+@cars_blueprint.route('/<int:car_id>', methods=['GET'])
+async def get_one_by_id(car_id: int) -> Response:
+    res = await async_cached_get('cars', f'/car/{car_id}', RESPONSE_CACHE_ITEM_TTL)
+    return res.as_tuple(request.if_none_match)
+
+
+@cars_blueprint.route('/', methods=["POST"])
+async def create_car() -> Response:
+    data = await request.get_json()
+    res = await async_upstream('cars').post('/car', json=data)
+    response_cache.invalidate('cars:')
+    if type(res.json()) == int:
+        return jsonify(res.json())
+    return res.json(), 400
+
+
+@cars_blueprint.route('/<int:car_id>', methods=['DELETE'])
+async def delete_car(car_id: int) -> Response:
+    res = await async_upstream('cars').delete(f'/car/{car_id}')
+    response_cache.invalidate('cars:')
+    return res.json(), res.status_code
@@ -0,0 +1,13 @@
+from quart import Blueprint, Response
+
+from app.dashboard.configuration import async_fetch_dashboard
+
+"""
+Async (ASGI) counterpart of app.route.dashboard, exposing the same url surface.
+"""
+fleet_blueprint = Blueprint('fleet_blueprint', __name__, url_prefix='/fleet')
+
+
+@fleet_blueprint.route('/dashboard')
+async def get_dashboard() -> Response:
+    return await async_fetch_dashboard()
@@ -0,0 +1,62 @@
+import httpx
+from quart import Blueprint, Response, request
+from app.upstream.configuration import async_upstream
+from app.cache.configuration import async_cached_get, response_cache
+from app.env_variables import RESPONSE_CACHE_LIST_TTL, RESPONSE_CACHE_ITEM_TTL
+from app.upstream.streaming import async_upload_to_aws, async_delete_from_aws
+from app.upstream.forms import typed_form, LIABILITY_FORM_TYPES
+import logging
+
+"""
+Async (ASGI) counterpart of app.route.insurance, exposing the same url surface.
+"""
+insurances_blueprint = Blueprint('insurances_blueprint', __name__, url_prefix='/insurances')
+
+
+@insurances_blueprint.route('/all')
+async def get_all() -> Response:
+    res = await async_cached_get('insurances', '/insurances/all', RESPONSE_CACHE_LIST_TTL)
+    return res.as_tuple(request.if_none_match)
+
+
+@insurances_blueprint.route('/<int:insurance_id>', methods=['GET'])
+async def get_one_by_id(insurance_id: int) -> Response:
+    res = await async_cached_get('insurances', f'/insurances/{insurance_id}', RESPONSE_CACHE_ITEM_TTL)
+    return res.as_tuple(request.if_none_match)
+
+
+@insurances_blueprint.route('/', methods=["POST"])
+async def create_insurance() -> Response:
+    try:
+        # form fields are strings, services expect JSON types, invalid form aborts the upload before it completes
+        aws_response, data = await async_upload_to_aws(request, lambda form: typed_form(form, LIABILITY_FORM_TYPES))
+    except ValueError:
+        return {'message': 'Invalid request'}, 400
+    if aws_response.status_code != 201:
+        return aws_response.json(), aws_response.status_code
+
+    img_url = aws_response.json()['url']
+    try:
+        res = await async_upstream('insurances').post('/insurances', json={**data, 'img_url': img_url})
+    except httpx.HTTPError:
+        await async_delete_from_aws(img_url)
+        raise
+    if res.status_code != 201:
+        # insurances service rejected the record, so the uploaded file belongs to nothing
+        await async_delete_from_aws(img_url)
+    response_cache.invalidate('insurances:')
+    return res.json(), res.status_code
+
+
+@insurances_blueprint.route('/<int:insurance_id>', methods=['DELETE'])
+async def delete_insurance(insurance_id: int) -> Response:
+    insurance_res = await async_upstream('insurances').get(f'/insurances/{insurance_id}')
+    insurance_data = insurance_res.json()
+    img_url = insurance_data.get('img_url')
+    if img_url:
+        aws_response = await async_upstream('aws-resources').request('DELETE', '/file', json={"file": img_url})
+        if aws_response.status_code == 201:
+            res = await async_upstream('insurances').delete(f'/insurances/{insurance_id}')
+            response_cache.invalidate('insurances:')
+            return res.json(), res.status_code
+    return insurance_res.json(), insurance_res.status_code
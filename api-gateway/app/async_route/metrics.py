@@ -0,0 +1,22 @@
+from quart import Blueprint, Response
+
+from app.cache.configuration import response_cache
+from app.upstream.configuration import AsyncUpstreamClients
+
+metrics_blueprint = Blueprint('metrics_blueprint', __name__, url_prefix='/metrics')
+
+
+@metrics_blueprint.route('/upstreams')
+async def get_upstreams_metrics() -> Response:
+    """
+    :return: Connection pool utilisation of every async upstream client created by current worker.
+    """
+    return AsyncUpstreamClients.metrics(), 200
+
+
+@metrics_blueprint.route('/cache')
+async def get_cache_metrics() -> Response:
+    """
+    :return: Hit and miss counters and size of response cache of current worker.
+    """
+    return response_cache.metrics(), 200
@@ -0,0 +1,62 @@
+import httpx
+from quart import Blueprint, Response, request
+from app.upstream.configuration import async_upstream
+from app.cache.configuration import async_cached_get, response_cache
+from app.env_variables import RESPONSE_CACHE_LIST_TTL, RESPONSE_CACHE_ITEM_TTL
+from app.upstream.streaming import async_upload_to_aws, async_delete_from_aws
+from app.upstream.forms import typed_form, LIABILITY_FORM_TYPES
+import logging
+
+"""
+Async (ASGI) counterpart of app.route.mot, exposing the same url surface.
+"""
+mots_blueprint = Blueprint('mots_blueprint', __name__, url_prefix='/mots')
+
+
+@mots_blueprint.route('/all')
+async def get_all() -> Response:
+    res = await async_cached_get('mots', '/mots/all', RESPONSE_CACHE_LIST_TTL)
+    return res.as_tuple(request.if_none_match)
+
+
+@mots_blueprint.route('/<int:mot_id>', methods=['GET'])
+async def get_one_by_id(mot_id: int) -> Response:
+    res = await async_cached_get('mots', f'/mots/{mot_id}', RESPONSE_CACHE_ITEM_TTL)
+    return res.as_tuple(request.if_none_match)
+
+
+@mots_blueprint.route('/', methods=["POST"])
+async def create_mot() -> Response:
+    try:
+        # form fields are strings, services expect JSON types, invalid form aborts the upload before it completes
+        aws_response, data = await async_upload_to_aws(request, lambda form: typed_form(form, LIABILITY_FORM_TYPES))
+    except ValueError:
+        return {'message': 'Invalid request'}, 400
+    if aws_response.status_code != 201:
+        return aws_response.json(), aws_response.status_code
+
+    img_url = aws_response.json()['url']
+    try:
+        res = await async_upstream('mots').post('/mots', json={**data, 'img_url': img_url})
+    except httpx.HTTPError:
+        await async_delete_from_aws(img_url)
+        raise
+    if res.status_code != 201:
+        # mots service rejected the record, so the uploaded file belongs to nothing
+        await async_delete_from_aws(img_url)
+    response_cache.invalidate('mots:')
+    return res.json(), res.status_code
+
+
+@mots_blueprint.route('/<int:mot_id>', methods=['DELETE'])
+async def delete_mot(mot_id: int) -> Response:
+    mot_res = await async_upstream('mots').get(f'/mots/{mot_id}')
+    mot_data = mot_res.json()
+    img_url = mot_data.get('img_url')
+    if img_url:
+        aws_response = await async_upstream('aws-resources').request('DELETE', '/file', json={"file": img_url})
+        if aws_response.status_code == 201:
+            res = await async_upstream('mots').delete(f'/mots/{mot_id}')
+            response_cache.invalidate('mots:')
+            return res.json(), res.status_code
+    return mot_res.json(), mot_res.status_code
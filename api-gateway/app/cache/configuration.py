@@ -0,0 +1,300 @@
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable
+
+import httpx
+from werkzeug.datastructures import ETags
+from werkzeug.http import unquote_etag
+
+from app.env_variables import RESPONSE_CACHE_ENABLED, RESPONSE_CACHE_MAX_BYTES
+from app.upstream.configuration import upstream, async_upstream
+
+# Approximate memory taken by entry apart from its body (key, object, OrderedDict node)
+ENTRY_OVERHEAD = 256
+
+
+class CachedResponse:
+    """
+    Body and status of upstream response, kept as raw bytes so cache hit doesn't need to serialize json again.
+    ETag of upstream response is passed through to the client unchanged, as the body is.
+    """
+    __slots__ = ('content', 'status_code', 'content_type', 'etag', 'expires_at')
+
+    def __init__(self, content: bytes, status_code: int, content_type: str = 'application/json',
+                 etag: str | None = None):
+        self.content = content
+        self.status_code = status_code
+        self.content_type = content_type
+        self.etag = etag
+        self.expires_at = 0.0
+
+    @classmethod
+    def from_httpx(cls, res: httpx.Response) -> 'CachedResponse':
+        return cls(
+            res.content,
+            res.status_code,
+            res.headers.get('Content-Type', 'application/json'),
+            res.headers.get('ETag')
+        )
+
+    @property
+    def size(self) -> int:
+        return len(self.content) + ENTRY_OVERHEAD
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+    def as_tuple(self, if_none_match: ETags | None = None) -> tuple[bytes, int, dict[str, str]]:
+        """
+        :param if_none_match: Parsed If-None-Match header of client request (request.if_none_match).
+        :return: Response in a form that can be returned from Flask or Quart view, 304 without body when client
+            already has the response with the same ETag.
+        """
+        if self.etag is None or self.status_code != 200:
+            return self.content, self.status_code, {'Content-Type': self.content_type}
+        if if_none_match is not None and if_none_match.contains_weak(unquote_etag(self.etag)[0]):
+            return b'', 304, {'ETag': self.etag}
+        return self.content, self.status_code, {'Content-Type': self.content_type, 'ETag': self.etag}
+
+
+class ResponseCache:
+    """
+    In-memory cache of upstream GET responses shared by all threads (or event loop) of gateway worker.
+
+    - Every entry has its own ttl, only 200 responses are stored.
+    - Entries are evicted in LRU order, so that total size of cached bodies doesn't exceed max_bytes.
+    - Expired entries with ETag are kept (until evicted) so that they can be revalidated with upstream by
+      If-None-Match, see stale(). Upstream answering 304 doesn't read nor serialize the rows again.
+    - Concurrent misses of the same key are coalesced (single-flight) - only first request calls the upstream,
+      others wait for its result.
+    - invalidate() drops entries by key prefix. Responses fetched while invalidation happened are not stored,
+      so write can't be overwritten by stale read that was already in flight.
+
+    Example usage:
+        res = response_cache.get_or_fetch('cars:/cars/all', 5.0, lambda: CachedResponse.from_httpx(...))
+    """
+    def __init__(self, max_bytes: int, enabled: bool = True):
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._bytes = 0
+        self._generation = 0
+        self._in_flight: dict[str, Future] = {}
+        self._async_in_flight: dict[str, asyncio.Task] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get_or_fetch(self, key: str, ttl: float, fetch: Callable[[], CachedResponse]) -> CachedResponse:
+        """
+        :param key: Cache key, prefixed with name of upstream.
+        :param ttl: Seconds for which fetched response stays valid.
+        :param fetch: Function calling the upstream.
+        :return: Cached or freshly fetched response.
+        """
+        if not self.enabled:
+            return fetch()
+
+        with self._lock:
+            cached = self._lookup(key)
+            if cached is not None:
+                self.hits += 1
+                return cached
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                self.misses += 1
+                future = self._in_flight[key] = Future()
+                generation = self._generation
+                leader = True
+
+        if not leader:
+            return future.result()
+
+        try:
+            response = fetch()
+        except BaseException as e:
+            # Waiting requests get the same error instead of hanging on the future
+            with self._lock:
+                del self._in_flight[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            self._store(key, response, ttl, generation)
+            del self._in_flight[key]
+        future.set_result(response)
+        return response
+
+    async def async_get_or_fetch(self, key: str, ttl: float,
+                                 fetch: Callable[[], Awaitable[CachedResponse]]) -> CachedResponse:
+        """
+        Async counterpart of get_or_fetch(). Upstream call runs in separate task, so cancellation of request that
+        started it doesn't cancel requests waiting for the same key.
+
+        :param key: Cache key, prefixed with name of upstream.
+        :param ttl: Seconds for which fetched response stays valid.
+        :param fetch: Coroutine function calling the upstream.
+        :return: Cached or freshly fetched response.
+        """
+        if not self.enabled:
+            return await fetch()
+
+        with self._lock:
+            cached = self._lookup(key)
+            if cached is not None:
+                self.hits += 1
+                return cached
+            task = self._async_in_flight.get(key)
+            if task is not None:
+                self.coalesced += 1
+            else:
+                self.misses += 1
+                task = asyncio.ensure_future(self._async_fetch(key, ttl, fetch, self._generation))
+                self._async_in_flight[key] = task
+        return await asyncio.shield(task)
+
+    async def _async_fetch(self, key: str, ttl: float, fetch: Callable[[], Awaitable[CachedResponse]],
+                           generation: int) -> CachedResponse:
+        try:
+            response = await fetch()
+            with self._lock:
+                self._store(key, response, ttl, generation)
+            return response
+        finally:
+            with self._lock:
+                self._async_in_flight.pop(key, None)
+
+    def stale(self, key: str) -> CachedResponse | None:
+        """
+        :param key: Cache key, prefixed with name of upstream.
+        :return: Expired response of the key that can be revalidated with upstream by its ETag, None if there
+            isn't any.
+        """
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is None or cached.etag is None or cached.expires_at > time.monotonic():
+                return None
+            return cached
+
+    def invalidate(self, prefix: str) -> None:
+        """
+        Drops all entries which key starts with given prefix.
+
+        :param prefix: Key prefix, usually name of upstream e.g. 'cars:'
+        :return: None
+        """
+        with self._lock:
+            self._generation += 1
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                self._bytes -= self._entries.pop(key).size
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._bytes = 0
+
+    def metrics(self) -> dict[str, Any]:
+        """
+        :return: Hit and miss counters together with current size of the cache.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                'enabled': self.enabled,
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'hit_ratio': round((self.hits + self.coalesced) / lookups, 3) if lookups else None,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+            }
+
+    def _lookup(self, key: str) -> CachedResponse | None:
+        cached = self._entries.get(key)
+        if cached is None:
+            return None
+        if cached.expires_at <= time.monotonic():
+            if cached.etag is None:
+                self._bytes -= self._entries.pop(key).size
+            return None
+        self._entries.move_to_end(key)
+        return cached
+
+    def _store(self, key: str, response: CachedResponse, ttl: float, generation: int) -> None:
+        if response.status_code != 200 or generation != self._generation or response.size > self.max_bytes:
+            return
+        response.expires_at = time.monotonic() + ttl
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= previous.size
+        self._entries[key] = response
+        self._bytes += response.size
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+            self.evictions += 1
+
+
+response_cache = ResponseCache(RESPONSE_CACHE_MAX_BYTES, RESPONSE_CACHE_ENABLED)
+
+
+def cached_get(name: str, path: str, ttl: float, **kwargs) -> CachedResponse:
+    """
+    GET request to upstream served through response_cache.
+
+    :param name: Name of upstream declared in UPSTREAMS.
+    :param path: Path of the request, part of cache key.
+    :param ttl: Seconds for which response stays valid.
+    :param kwargs: Additional arguments of httpx.Client.get()
+    :return: Cached or freshly fetched response.
+    """
+    key = f'{name}:{path}'
+
+    def fetch() -> CachedResponse:
+        stale = response_cache.stale(key)
+        res = upstream(name).get(path, **_revalidation_kwargs(stale, kwargs))
+        return _revalidated(stale, res)
+
+    return response_cache.get_or_fetch(key, ttl, fetch)
+
+
+async def async_cached_get(name: str, path: str, ttl: float, **kwargs) -> CachedResponse:
+    """
+    Async counterpart of cached_get().
+    """
+    key = f'{name}:{path}'
+
+    async def fetch() -> CachedResponse:
+        stale = response_cache.stale(key)
+        res = await async_upstream(name).get(path, **_revalidation_kwargs(stale, kwargs))
+        return _revalidated(stale, res)
+
+    return await response_cache.async_get_or_fetch(key, ttl, fetch)
+
+
+def _revalidation_kwargs(stale: CachedResponse | None, kwargs: dict[str, Any]) -> dict[str, Any]:
+    if stale is None:
+        return kwargs
+    return {**kwargs, 'headers': {**kwargs.get('headers', {}), 'If-None-Match': stale.etag}}
+
+
+def _revalidated(stale: CachedResponse | None, res: httpx.Response) -> CachedResponse:
+    # 304 confirms that expired body is still current, it is stored again with new ttl
+    if stale is not None and res.status_code == 304:
+        return stale
+    return CachedResponse.from_httpx(res)
@@ -3,7 +3,8 @@ from flask_restful import Api
 from flask_migrate import Migrate
 
 from app.db.configuration import sa
-from app.env_variables import SQLALCHEMY_DATABASE_URI
+from app.json.configuration import configure_json
+from app.env_variables import SQLALCHEMY_DATABASE_URI, UPLOAD_MAX_SIZE
 from app.route.user import UserResource, UserActivationResource
 from flask_cors import CORS
 
@@ -13,6 +14,8 @@ from app.email.configuration import MAIL_SETTINGS, MailSender
 from app.route.car import cars_blueprint
 from app.route.mot import mots_blueprint
 from app.route.insurance import insurances_blueprint
+from app.route.metrics import metrics_blueprint
+from app.route.dashboard import fleet_blueprint
 app = Flask(__name__)
 
 
@@ -23,11 +26,19 @@ def main():
         app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
         sa.init_app(app)
 
+        # Uploaded files are streamed to aws-resources service, only their size is limited
+        app.config["MAX_CONTENT_LENGTH"] = UPLOAD_MAX_SIZE
+
         # KONFIGURACJA API
         api = Api(app)
         api.add_resource(UserResource, '/users')
         api.add_resource(UserActivationResource, '/users/activate')
 
+        # ----------------------------------------------------------------------
+        # JSON CONFIGURATION
+        # ----------------------------------------------------------------------
+        configure_json(app, api)
+
         # ----------------------------------------------------------------------
         # EMAIL CONFIGURATION
         # ----------------------------------------------------------------------
@@ -72,6 +83,8 @@ def main():
         app.register_blueprint(cars_blueprint)
         app.register_blueprint(mots_blueprint)
         app.register_blueprint(insurances_blueprint)
+        app.register_blueprint(metrics_blueprint)
+        app.register_blueprint(fleet_blueprint)
 
         @app.route('/')
         def index():
@@ -0,0 +1,81 @@
+from asgiref.wsgi import WsgiToAsgi
+from quart import Quart
+from quart_cors import cors
+
+from app.create_app import main as create_wsgi_app
+from app.env_variables import UPLOAD_MAX_SIZE
+from app.json.configuration import configure_json
+from app.upstream.configuration import AsyncUpstreamClients
+
+from app.async_route.car import cars_blueprint
+from app.async_route.mot import mots_blueprint
+from app.async_route.insurance import insurances_blueprint
+from app.async_route.metrics import metrics_blueprint
+from app.async_route.dashboard import fleet_blueprint
+
+"""
+Url prefixes served natively by async app. Remaining routes (users, login, refresh...) are handled by
+synchronous Flask app running in thread pool.
+"""
+ASYNC_PREFIXES = ('/cars', '/mots', '/insurances', '/metrics', '/fleet')
+
+async_app = Quart(__name__)
+
+
+class GatewayDispatcher:
+    """
+    ASGI application that routes proxy endpoints to async Quart app and everything else to wrapped Flask app.
+
+    :param async_app: ASGI application handling ASYNC_PREFIXES and lifespan events.
+    :param wsgi_app: ASGI application wrapping synchronous Flask app.
+    """
+    def __init__(self, async_app, wsgi_app):
+        self.async_app = async_app
+        self.wsgi_app = wsgi_app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan' or scope['path'].startswith(ASYNC_PREFIXES):
+            await self.async_app(scope, receive, send)
+        else:
+            await self.wsgi_app(scope, receive, send)
+
+
+def main():
+    """
+    Entry point of async gateway mode. Proxied requests to upstream services are multiplexed on event loop
+    with pooled httpx.AsyncClient, so slow upstream doesn't block other requests of the worker.
+
+    Example Usage:
+
+    ```
+    gunicorn --workers 1 -k uvicorn_worker.UvicornWorker 'app.create_asgi_app:main()'
+    ```
+
+    :return: The ASGI application.
+    """
+    # Quart limits request body to 16MB by default, uploads are streamed so they can be much bigger
+    async_app.config['MAX_CONTENT_LENGTH'] = UPLOAD_MAX_SIZE
+    # Quart uses Flask's JSON providers, so the same fast provider encodes dashboard and proxied documents
+    configure_json(async_app)
+
+    # ----------------------------------------------------------------------
+    # CORS CONFIGURATION
+    # ----------------------------------------------------------------------
+    app = cors(
+        async_app,
+        allow_headers=['accept', 'accept-encoding', 'authorization', 'content-type'],
+        allow_methods=['DELETE', 'GET', 'POST', 'PATCH', 'PUT', 'OPTIONS'],
+        allow_origin=['http://localhost:3000']
+    )
+
+    app.register_blueprint(cars_blueprint)
+    app.register_blueprint(mots_blueprint)
+    app.register_blueprint(insurances_blueprint)
+    app.register_blueprint(metrics_blueprint)
+    app.register_blueprint(fleet_blueprint)
+
+    @app.after_serving
+    async def close_upstream_clients():
+        await AsyncUpstreamClients.close_all()
+
+    return GatewayDispatcher(app, WsgiToAsgi(create_wsgi_app()))
@@ -0,0 +1,209 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import httpx
+
+from app.cache.configuration import CachedResponse, cached_get, async_cached_get
+from app.env_variables import DASHBOARD_UPSTREAM_TIMEOUT, DASHBOARD_WORKERS, RESPONSE_CACHE_LIST_TTL
+
+logger = logging.getLogger(__name__)
+
+"""
+Upstreams queried by fleet dashboard - path of the collection endpoint and key under which the collection is returned.
+Paginated collections (the ones returning 'next_cursor') are read page by page.
+"""
+DASHBOARD_SOURCES = {
+    'cars': ('/cars/all?limit=1000', 'all_cars'),
+    'mots': ('/mots/all', 'all_mots'),
+    'insurances': ('/insurances/all', 'all_insurances'),
+    'repairs': ('/repairs/all', 'all_repairs'),
+    'drivers': ('/drivers/all', 'all_drivers'),
+}
+
+# Threads are started lazily on first submit, so every gunicorn worker gets its own threads
+_executor = ThreadPoolExecutor(max_workers=DASHBOARD_WORKERS, thread_name_prefix='dashboard')
+
+
+class UpstreamResult:
+    """
+    Outcome of one upstream call made by fleet dashboard.
+
+    Attributes:
+        - name: Name of the upstream.
+        - items: Collection returned by the upstream, None if the call failed.
+        - status: 'ok', 'error' (unexpected response) or 'unavailable' (timeout, refused connection...).
+        - status_code: Http status of the response, None if no response was received.
+        - latency_ms: Duration of the call in milliseconds.
+        - next_cursor: Cursor of the next page of paginated collection, None on the last page.
+    """
+    def __init__(self, name: str, items: list[dict[str, Any]] | None, status: str,
+                 status_code: int | None, latency_ms: float, next_cursor: Any = None):
+        self.name = name
+        self.items = items
+        self.status = status
+        self.status_code = status_code
+        self.latency_ms = latency_ms
+        self.next_cursor = next_cursor
+
+    @classmethod
+    def from_response(cls, name: str, res: CachedResponse, started: float) -> 'UpstreamResult':
+        latency_ms = round((time.perf_counter() - started) * 1000, 1)
+        try:
+            if res.status_code == 200:
+                body = res.json()
+                return cls(name, body[DASHBOARD_SOURCES[name][1]], 'ok', res.status_code, latency_ms,
+                           body.get('next_cursor'))
+        except (ValueError, KeyError):
+            logger.warning(f'Unexpected response body of {name} upstream')
+        return cls(name, None, 'error', res.status_code, latency_ms)
+
+    @classmethod
+    def from_exception(cls, name: str, e: Exception, started: float) -> 'UpstreamResult':
+        logger.warning(f'Dashboard call to {name} upstream failed: {e!r}')
+        return cls(name, None, 'unavailable', None, round((time.perf_counter() - started) * 1000, 1))
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            'status': self.status,
+            'status_code': self.status_code,
+            'latency_ms': self.latency_ms,
+        }
+
+
+def _page_path(name: str, cursor: Any) -> str:
+    path = DASHBOARD_SOURCES[name][0]
+    if cursor is None:
+        return path
+    return f"{path}{'&' if '?' in path else '?'}cursor={cursor}"
+
+
+def _merge_page(result: UpstreamResult | None, page: UpstreamResult) -> UpstreamResult:
+    if result is None or page.status != 'ok':
+        return page
+    page.items = result.items + page.items
+    return page
+
+
+def _fetch(name: str) -> UpstreamResult:
+    started = time.perf_counter()
+    result = None
+    try:
+        while result is None or result.next_cursor is not None:
+            res = cached_get(
+                name,
+                _page_path(name, result.next_cursor if result else None),
+                RESPONSE_CACHE_LIST_TTL,
+                timeout=DASHBOARD_UPSTREAM_TIMEOUT
+            )
+            result = _merge_page(result, UpstreamResult.from_response(name, res, started))
+            if result.status != 'ok':
+                break
+    except httpx.HTTPError as e:
+        return UpstreamResult.from_exception(name, e, started)
+    return result
+
+
+async def _async_fetch(name: str) -> UpstreamResult:
+    started = time.perf_counter()
+    result = None
+    try:
+        while result is None or result.next_cursor is not None:
+            res = await async_cached_get(
+                name,
+                _page_path(name, result.next_cursor if result else None),
+                RESPONSE_CACHE_LIST_TTL,
+                timeout=DASHBOARD_UPSTREAM_TIMEOUT
+            )
+            result = _merge_page(result, UpstreamResult.from_response(name, res, started))
+            if result.status != 'ok':
+                break
+    except httpx.HTTPError as e:
+        return UpstreamResult.from_exception(name, e, started)
+    return result
+
+
+def compose_dashboard(results: list[UpstreamResult]) -> dict[str, Any]:
+    """
+    Joins collections of all upstreams into one document per car registration.
+
+    Repairs reference cars by id, so they are matched through cars collection. Records that can't be matched
+    with any car (e.g. because cars upstream is down) are grouped by registration anyway, or land in 'unmatched'
+    when even registration is unknown.
+
+    :param results: Results of dashboard upstream calls.
+    :return: Fleet dashboard document.
+    """
+    by_name = {result.name: result.items or [] for result in results}
+    fleet: dict[str, dict[str, Any]] = {}
+
+    def entry(registration: str) -> dict[str, Any]:
+        if registration not in fleet:
+            fleet[registration] = {
+                'registration': registration,
+                'car': None,
+                'mots': [],
+                'insurances': [],
+                'repairs': [],
+                'drivers': [],
+            }
+        return fleet[registration]
+
+    registration_by_car_id = {}
+    for car in by_name.get('cars', []):
+        entry(car['registration'])['car'] = car
+        registration_by_car_id[car['id']] = car['registration']
+
+    for name in ('mots', 'insurances'):
+        for item in by_name.get(name, []):
+            entry(item['car_registration_number'])[name].append(item)
+
+    for driver in by_name.get('drivers', []):
+        entry(driver['car_registration'])['drivers'].append(driver)
+
+    unmatched_repairs = []
+    for repair in by_name.get('repairs', []):
+        registration = registration_by_car_id.get(repair['car_id'])
+        if registration is None:
+            unmatched_repairs.append(repair)
+        else:
+            entry(registration)['repairs'].append(repair)
+
+    return {
+        'fleet': list(fleet.values()),
+        'unmatched': {'repairs': unmatched_repairs},
+        'upstreams': {result.name: result.as_dict() for result in results},
+        'partial': any(result.status != 'ok' for result in results),
+    }
+
+
+def dashboard_status_code(results: list[UpstreamResult]) -> int:
+    """
+    :param results: Results of dashboard upstream calls.
+    :return: 200 if at least one upstream answered, 502 otherwise.
+    """
+    return 200 if any(result.status == 'ok' for result in results) else 502
+
+
+def fetch_dashboard() -> tuple[dict[str, Any], int]:
+    """
+    Queries all dashboard upstreams in parallel with thread pool, so total latency is the latency of the slowest
+    upstream (bounded by DASHBOARD_UPSTREAM_TIMEOUT) instead of their sum. Collections are shared with list
+    endpoints through response cache.
+
+    :return: Fleet dashboard document and http status code.
+    """
+    results = list(_executor.map(_fetch, DASHBOARD_SOURCES))
+    return compose_dashboard(results), dashboard_status_code(results)
+
+
+async def async_fetch_dashboard() -> tuple[dict[str, Any], int]:
+    """
+    Async counterpart of fetch_dashboard(), upstream calls run concurrently on event loop.
+
+    :return: Fleet dashboard document and http status code.
+    """
+    results = await asyncio.gather(*(_async_fetch(name) for name in DASHBOARD_SOURCES))
+    return compose_dashboard(results), dashboard_status_code(results)
@@ -1,6 +1,9 @@
 from app.db.configuration import sa
+from sqlalchemy import or_
+from datetime import datetime, timedelta
 from typing import Self
-from werkzeug.security import generate_password_hash, check_password_hash
+
+from app.security.password import password_hasher
 
 
 class UserModel(sa.Model):
@@ -23,6 +26,8 @@ class UserModel(sa.Model):
         Saves or updates the user in the database.
     - check_password(self, password: str) -> bool:
         Checks if the provided password matches the stored hashed password for the user.
+    - rehash_password_if_needed(self, password: str) -> None:
+        Re-hashes verified password when it was hashed with outdated parameters.
     - as_dict(self):
         Returns a dictionary representation of the user, containing username, role, and active status.
     - find_by_username(cls, username: str) -> Self | None:
@@ -31,20 +36,22 @@ class UserModel(sa.Model):
         Finds and returns the user with the specified email address, or None if not found.
     - find_by_id(cls, id_: int) -> Self | None:
         Finds and returns the user with the specified ID, or None if not found.
+    - find_taken_fields(cls, username: str, email: str) -> set[str]:
+        Returns which of the username and email are already used, checked with a single query.
 
     """
     __tablename__ = 'users'
 
     id = sa.Column(sa.Integer, primary_key=True)
-    username = sa.Column(sa.String(255))
+    username = sa.Column(sa.String(255), unique=True, index=True)
     password = sa.Column(sa.String(255))
-    email = sa.Column(sa.String(255))
+    email = sa.Column(sa.String(255), unique=True, index=True)
     role = sa.Column(sa.String(10), default="USER")
     active = sa.Column(sa.Boolean, default=False)
 
     def __init__(self, username: str, password: str, email: str, role: str = "USER"):
         self.username = username
-        self.password = generate_password_hash(password)
+        self.password = password_hasher.hash(password)
         self.email = email
         self.role = role
 
@@ -61,7 +68,19 @@ class UserModel(sa.Model):
         @param password: The password to be checked against the stored hash.
         @return: True if the password matches the stored hash, False otherwise.
         """
-        return check_password_hash(self.password, password)
+        return password_hasher.verify(self.password, password)
+
+    def rehash_password_if_needed(self, password: str) -> None:
+        """
+        Upgrades stored hash when hashing method or its cost was changed. Must be called only with password
+        that was already checked.
+
+        @param password: The verified plain password.
+        @return: None
+        """
+        if password_hasher.needs_rehash(self.password):
+            self.password = password_hasher.hash(password)
+            self.save_or_update()
 
     def as_dict(self):
         """
@@ -106,3 +125,128 @@ class UserModel(sa.Model):
         @return: The user object with the specified id if found, otherwise None.
         """
         return UserModel.query.filter_by(id=id_).first()
+
+    @classmethod
+    def find_taken_fields(cls, username: str, email: str) -> set[str]:
+        """
+        Checks username and email in one round trip, both columns have unique index, so at most two rows are read.
+
+        @param username: The username to check.
+        @param email: The email address to check.
+        @return: Set containing 'username' and/or 'email' if they belong to existing user, empty set otherwise.
+        """
+        rows = (
+            sa.session.query(UserModel.username, UserModel.email)
+            .filter(or_(UserModel.username == username, UserModel.email == email))
+            .limit(2)
+            .all()
+        )
+        taken = set()
+        for row in rows:
+            if row.username == username:
+                taken.add('username')
+            if row.email == email:
+                taken.add('email')
+        return taken
+
+
+class MailOutboxModel(sa.Model):
+    """
+
+    The MailOutboxModel class represents an email waiting to be sent by background outbox workers.
+
+    Attributes:
+    - id: An integer representing the primary key of the mail.
+    - recipient: A string representing the email address of the recipient.
+    - subject: A string representing the subject of the mail.
+    - html: A text representing the html body of the mail.
+    - status: 'pending' (waiting to be sent), 'sending' (claimed by worker), 'sent' or 'failed' (out of attempts).
+    - attempts: An integer representing number of sending attempts started, counted when the mail is claimed.
+    - next_attempt_at: A datetime after which the mail can be claimed by worker.
+    - last_error: A string describing the last sending error.
+    - created_at: A datetime when the mail was enqueued.
+    - sent_at: A datetime when the mail was sent.
+
+    """
+    __tablename__ = 'mail_outbox'
+    __table_args__ = (
+        sa.Index('ix_mail_outbox_status_next_attempt_at', 'status', 'next_attempt_at'),
+    )
+
+    id = sa.Column(sa.Integer, primary_key=True)
+    recipient = sa.Column(sa.String(255), nullable=False)
+    subject = sa.Column(sa.String(255), nullable=False)
+    html = sa.Column(sa.Text, nullable=False)
+    status = sa.Column(sa.String(10), nullable=False, default='pending')
+    attempts = sa.Column(sa.Integer, nullable=False, default=0)
+    next_attempt_at = sa.Column(sa.DateTime, nullable=False, default=datetime.utcnow)
+    last_error = sa.Column(sa.String(500), nullable=True)
+    created_at = sa.Column(sa.DateTime, nullable=False, default=datetime.utcnow)
+    sent_at = sa.Column(sa.DateTime, nullable=True)
+
+    @classmethod
+    def claim_batch(cls, limit: int, lease: float, max_attempts: int) -> list[Self]:
+        """
+        Claims mails that are due for sending. Rows locked by other workers are skipped, so workers of all
+        gunicorn processes can drain the outbox concurrently. Claimed mails that weren't finished before
+        the lease expired (e.g. worker was killed) are claimed again. Every claim counts as an attempt, so mail
+        which keeps outliving its lease is marked as failed once attempts run out instead of being retried forever.
+
+        @param limit: Maximal number of mails to claim.
+        @param lease: Seconds for which claimed mails are reserved for the worker.
+        @param max_attempts: Maximal number of sending attempts of one mail.
+        @return: Claimed mails with status 'sending'.
+        """
+        now = datetime.utcnow()
+        mails = (
+            cls.query
+            .filter(cls.status.in_(('pending', 'sending')), cls.next_attempt_at <= now)
+            .order_by(cls.next_attempt_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        claimed = []
+        for mail in mails:
+            if mail.attempts >= max_attempts:
+                mail.status = 'failed'
+                mail.last_error = 'Sending lease expired in the last attempt'
+                continue
+            mail.status = 'sending'
+            mail.attempts += 1
+            mail.next_attempt_at = now + timedelta(seconds=lease)
+            claimed.append(mail)
+        sa.session.commit()
+        return claimed
+
+    @classmethod
+    def purge_sent(cls, retention: float) -> int:
+        """
+        Deletes mails that were sent before the retention window, caller commits.
+
+        @param retention: Seconds for which sent mails are kept.
+        @return: Number of deleted mails.
+        """
+        sent_before = datetime.utcnow() - timedelta(seconds=retention)
+        return cls.query.filter(cls.status == 'sent', cls.sent_at < sent_before).delete(synchronize_session=False)
+
+    def mark_sent(self) -> None:
+        """
+        @return: None
+        """
+        self.status = 'sent'
+        self.sent_at = datetime.utcnow()
+        self.last_error = None
+
+    def mark_failed(self, error: str, retry_in: float | None) -> None:
+        """
+        @param error: Description of the sending error.
+        @param retry_in: Seconds after which sending should be retried, None when there are no attempts left.
+        @return: None
+        """
+        self.last_error = error[:500]
+        if retry_in is None:
+            self.status = 'failed'
+        else:
+            self.status = 'pending'
+            self.next_attempt_at = datetime.utcnow() + timedelta(seconds=retry_in)
@@ -0,0 +1,176 @@
+import logging
+import random
+import threading
+import time
+
+from flask import Flask
+from flask_mail import Connection, Mail, Message
+
+from app.db.configuration import sa
+from app.db.model import MailOutboxModel
+from app.env_variables import (
+    MAIL_OUTBOX_WORKERS,
+    MAIL_OUTBOX_BATCH_SIZE,
+    MAIL_OUTBOX_POLL_INTERVAL,
+    MAIL_OUTBOX_MAX_ATTEMPTS,
+    MAIL_OUTBOX_RETRY_BASE_DELAY,
+    MAIL_OUTBOX_RETRY_MAX_DELAY,
+    MAIL_OUTBOX_LEASE,
+    MAIL_OUTBOX_SENT_RETENTION,
+    MAIL_OUTBOX_PURGE_INTERVAL
+)
+
+logger = logging.getLogger(__name__)
+
+
+class MailOutbox:
+    """
+    Persistent outbox of emails. Request only inserts the mail into mail_outbox table, background workers
+    drain the table in batches.
+
+    - Every worker keeps one SMTP connection open while there are mails to send and closes it when outbox is empty.
+    - Mails are claimed with SELECT ... FOR UPDATE SKIP LOCKED, so workers of all gunicorn processes cooperate.
+    - Failed mail is retried with exponential backoff (with jitter) until MAIL_OUTBOX_MAX_ATTEMPTS is reached.
+    - Idle workers delete mails sent more than MAIL_OUTBOX_SENT_RETENTION seconds ago.
+
+    Example usage:
+        MailOutbox.init(app, MailSender.mail)
+        MailOutbox.enqueue('user@example.com', 'Activate your account', html_body)
+    """
+    app: Flask | None = None
+    mail: Mail | None = None
+    _wake = threading.Event()
+    _stop = threading.Event()
+    _workers: list[threading.Thread] = []
+    _purged_at: float | None = None
+    _purge_lock = threading.Lock()
+
+    @classmethod
+    def init(cls, app: Flask, mail: Mail, workers: int = MAIL_OUTBOX_WORKERS) -> None:
+        """
+        :param app: Flask application, workers push its app context.
+        :param mail: Mail extension used to open SMTP connections.
+        :param workers: Number of background worker threads, 0 means that outbox is drained only by process_batch().
+        :return: None
+        """
+        cls.app = app
+        cls.mail = mail
+        cls._stop.clear()
+        for number in range(workers):
+            worker = threading.Thread(target=cls._run_worker, name=f'mail-outbox-{number}', daemon=True)
+            worker.start()
+            cls._workers.append(worker)
+
+    @classmethod
+    def stop(cls) -> None:
+        """
+        Stops background workers, mails that were not sent stay in the outbox.
+
+        :return: None
+        """
+        cls._stop.set()
+        cls._wake.set()
+        for worker in cls._workers:
+            worker.join()
+        cls._workers = []
+
+    @classmethod
+    def enqueue(cls, recipient: str, subject: str, html: str) -> MailOutboxModel:
+        """
+        :param recipient: Email address of the recipient.
+        :param subject: Subject of the mail.
+        :param html: Html body of the mail.
+        :return: Stored mail waiting for sending.
+        """
+        mail = MailOutboxModel(recipient=recipient, subject=subject, html=html)
+        sa.session.add(mail)
+        sa.session.commit()
+        cls._wake.set()
+        return mail
+
+    @classmethod
+    def process_batch(cls, connection: Connection | None = None) -> tuple[int, Connection | None]:
+        """
+        Claims one batch of due mails and sends them. Requires app context.
+
+        :param connection: Open SMTP connection to reuse, new one is opened when None.
+        :return: Number of processed mails and SMTP connection that can be reused for next batch.
+        """
+        mails = MailOutboxModel.claim_batch(MAIL_OUTBOX_BATCH_SIZE, MAIL_OUTBOX_LEASE, MAIL_OUTBOX_MAX_ATTEMPTS)
+        for mail in mails:
+            try:
+                if connection is None:
+                    connection = cls.mail.connect().__enter__()
+                connection.send(Message(subject=mail.subject, recipients=[mail.recipient], html=mail.html))
+                mail.mark_sent()
+            except Exception as e:
+                logger.warning(f'Sending mail {mail.id} failed: {e!r}')
+                # Connection may be broken, next mail opens a new one
+                connection = cls.close_connection(connection)
+                mail.mark_failed(repr(e), cls.retry_delay(mail.attempts))
+            sa.session.commit()
+        return len(mails), connection
+
+    @classmethod
+    def purge_sent(cls) -> int:
+        """
+        Deletes mails sent before the retention window. Requires app context.
+
+        :return: Number of deleted mails.
+        """
+        purged = MailOutboxModel.purge_sent(MAIL_OUTBOX_SENT_RETENTION)
+        sa.session.commit()
+        return purged
+
+    @staticmethod
+    def retry_delay(attempt: int) -> float | None:
+        """
+        :param attempt: Number of the failed attempt, starting from 1.
+        :return: Seconds to wait before next attempt or None if mail shouldn't be retried anymore.
+        """
+        if attempt >= MAIL_OUTBOX_MAX_ATTEMPTS:
+            return None
+        delay = min(MAIL_OUTBOX_RETRY_BASE_DELAY * 2 ** (attempt - 1), MAIL_OUTBOX_RETRY_MAX_DELAY)
+        return delay * random.uniform(0.5, 1.0)
+
+    @staticmethod
+    def close_connection(connection: Connection | None) -> None:
+        if connection is not None:
+            try:
+                connection.__exit__(None, None, None)
+            except Exception:
+                pass
+        return None
+
+    @classmethod
+    def _run_worker(cls) -> None:
+        connection = None
+        while not cls._stop.is_set():
+            processed = 0
+            try:
+                with cls.app.app_context():
+                    processed, connection = cls.process_batch(connection)
+            except Exception:
+                logger.exception('Mail outbox worker failed to process batch')
+                connection = cls.close_connection(connection)
+
+            if not processed:
+                # Outbox is empty, so SMTP connection isn't kept open while idle
+                connection = cls.close_connection(connection)
+                cls._purge_if_due()
+                cls._wake.wait(MAIL_OUTBOX_POLL_INTERVAL)
+                cls._wake.clear()
+        cls.close_connection(connection)
+
+    @classmethod
+    def _purge_if_due(cls) -> None:
+        # One worker of the process purges, at most once per interval
+        with cls._purge_lock:
+            if cls._purged_at is not None and time.monotonic() - cls._purged_at < MAIL_OUTBOX_PURGE_INTERVAL:
+                return
+            cls._purged_at = time.monotonic()
+        try:
+            with cls.app.app_context():
+                cls.purge_sent()
+        except Exception:
+            logger.exception('Mail outbox worker failed to purge sent mails')
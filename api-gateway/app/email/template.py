@@ -0,0 +1,61 @@
+import re
+from html import escape
+from pathlib import Path
+
+TEMPLATES_DIR = Path(__file__).parent / 'templates'
+
+PLACEHOLDER = re.compile(r'{{\s*(\w+)\s*}}')
+
+
+class MailTemplate:
+    """
+    Html mail template compiled once into static chunks and placeholder names, so rendering is a single join of
+    the chunks with escaped per-user values. Placeholders are written as {{ name }}, css braces are left untouched.
+
+    Example usage:
+        template = MailTemplate.load('activation.html')
+        html = template.render(username='john', activation_link='http://localhost/users/activate?id=1')
+    """
+    __slots__ = ('name', 'fields', '_chunks', '_slots')
+
+    def __init__(self, name: str, source: str):
+        """
+        :param name: Name of the template, used in error messages.
+        :param source: Html source containing {{ name }} placeholders.
+        """
+        self.name = name
+        self._chunks: list[str] = []
+        self._slots: list[tuple[int, str]] = []
+
+        position = 0
+        for match in PLACEHOLDER.finditer(source):
+            self._chunks.append(source[position:match.start()])
+            # Index of the chunk that will be replaced by value of the field
+            self._slots.append((len(self._chunks), match.group(1)))
+            self._chunks.append('')
+            position = match.end()
+        self._chunks.append(source[position:])
+        self.fields = frozenset(field for _, field in self._slots)
+
+    @classmethod
+    def load(cls, filename: str, directory: Path = TEMPLATES_DIR) -> 'MailTemplate':
+        """
+        :param filename: Name of the template file.
+        :param directory: Directory with templates, app/email/templates by default.
+        :return: Compiled template.
+        """
+        return cls(filename, (directory / filename).read_text(encoding='utf-8'))
+
+    def render(self, **values: object) -> str:
+        """
+        :param values: Values of all placeholders of the template, they are html escaped.
+        :return: Rendered html.
+        """
+        missing = self.fields - values.keys()
+        if missing:
+            raise KeyError(f'Template {self.name} is missing values of: {", ".join(sorted(missing))}')
+
+        chunks = self._chunks.copy()
+        for index, field in self._slots:
+            chunks[index] = escape(str(values[field]))
+        return ''.join(chunks)
@@ -1,6 +1,6 @@
 from dotenv import load_dotenv
 from pathlib import Path
-from os import getenv
+from os import getenv, cpu_count
 import logging
 
 logger = logging.getLogger(__name__)
@@ -43,3 +43,58 @@ JWT_REFRESHMAXAGE = int(getenv('JWT_REFRESHMAXAGE', 'DEFAULT JWT_REFRESHMAXAGE')
 JWT_PREFIX = getenv('JWT_PREFIX', 'DEFAULT JWT_PREFIX')
 
 
+# UPSTREAM SERVICES
+CARS_SERVICE_URL = getenv('CARS_SERVICE_URL', 'http://cars-service:8001')
+MOTS_SERVICE_URL = getenv('MOTS_SERVICE_URL', 'http://mots-service:8002')
+AWS_RESOURCES_SERVICE_URL = getenv('AWS_RESOURCES_SERVICE_URL', 'http://aws-resources-service:8003')
+INSURANCES_SERVICE_URL = getenv('INSURANCES_SERVICE_URL', 'http://insurances-service:8004')
+REPAIRS_SERVICE_URL = getenv('REPAIRS_SERVICE_URL', 'http://repairs-service:8005')
+DRIVERS_SERVICE_URL = getenv('DRIVERS_SERVICE_URL', 'http://drivers-service:8008')
+
+# UPSTREAM HTTP CLIENTS
+UPSTREAM_CONNECT_TIMEOUT = float(getenv('UPSTREAM_CONNECT_TIMEOUT', '2.0'))
+UPSTREAM_READ_TIMEOUT = float(getenv('UPSTREAM_READ_TIMEOUT', '30.0'))
+UPSTREAM_WRITE_TIMEOUT = float(getenv('UPSTREAM_WRITE_TIMEOUT', '30.0'))
+UPSTREAM_POOL_TIMEOUT = float(getenv('UPSTREAM_POOL_TIMEOUT', '5.0'))
+UPSTREAM_MAX_CONNECTIONS = int(getenv('UPSTREAM_MAX_CONNECTIONS', '20'))
+UPSTREAM_MAX_KEEPALIVE_CONNECTIONS = int(getenv('UPSTREAM_MAX_KEEPALIVE_CONNECTIONS', '10'))
+UPSTREAM_KEEPALIVE_EXPIRY = float(getenv('UPSTREAM_KEEPALIVE_EXPIRY', '30.0'))
+UPSTREAM_HTTP2 = getenv('UPSTREAM_HTTP2', 'true').lower() == 'true'
+
+# UPLOADS
+UPLOAD_CHUNK_SIZE = int(getenv('UPLOAD_CHUNK_SIZE', str(64 * 1024)))
+UPLOAD_MAX_SIZE = int(getenv('UPLOAD_MAX_SIZE', str(128 * 1024 * 1024)))
+UPLOAD_MAX_FIELD_SIZE = int(getenv('UPLOAD_MAX_FIELD_SIZE', str(64 * 1024)))
+
+# FLEET DASHBOARD
+DASHBOARD_UPSTREAM_TIMEOUT = float(getenv('DASHBOARD_UPSTREAM_TIMEOUT', '5.0'))
+DASHBOARD_WORKERS = int(getenv('DASHBOARD_WORKERS', '20'))
+
+# RESPONSE CACHE
+RESPONSE_CACHE_ENABLED = getenv('RESPONSE_CACHE_ENABLED', 'true').lower() == 'true'
+RESPONSE_CACHE_MAX_BYTES = int(getenv('RESPONSE_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+RESPONSE_CACHE_LIST_TTL = float(getenv('RESPONSE_CACHE_LIST_TTL', '5.0'))
+RESPONSE_CACHE_ITEM_TTL = float(getenv('RESPONSE_CACHE_ITEM_TTL', '15.0'))
+
+# VERIFIED TOKENS CACHE
+JWT_CACHE_ENABLED = getenv('JWT_CACHE_ENABLED', 'true').lower() == 'true'
+JWT_CACHE_MAX_ENTRIES = int(getenv('JWT_CACHE_MAX_ENTRIES', '10000'))
+JWT_CACHE_MAX_TTL = float(getenv('JWT_CACHE_MAX_TTL', '300.0'))
+
+# MAIL OUTBOX
+MAIL_OUTBOX_WORKERS = int(getenv('MAIL_OUTBOX_WORKERS', '2'))
+MAIL_OUTBOX_BATCH_SIZE = int(getenv('MAIL_OUTBOX_BATCH_SIZE', '20'))
+MAIL_OUTBOX_POLL_INTERVAL = float(getenv('MAIL_OUTBOX_POLL_INTERVAL', '5.0'))
+MAIL_OUTBOX_MAX_ATTEMPTS = int(getenv('MAIL_OUTBOX_MAX_ATTEMPTS', '6'))
+MAIL_OUTBOX_RETRY_BASE_DELAY = float(getenv('MAIL_OUTBOX_RETRY_BASE_DELAY', '10.0'))
+MAIL_OUTBOX_RETRY_MAX_DELAY = float(getenv('MAIL_OUTBOX_RETRY_MAX_DELAY', '3600.0'))
+MAIL_OUTBOX_LEASE = float(getenv('MAIL_OUTBOX_LEASE', '300.0'))
+# Sent mails are kept for a week, outbox deletes them at most once per purge interval
+MAIL_OUTBOX_SENT_RETENTION = float(getenv('MAIL_OUTBOX_SENT_RETENTION', '604800.0'))
+MAIL_OUTBOX_PURGE_INTERVAL = float(getenv('MAIL_OUTBOX_PURGE_INTERVAL', '3600.0'))
+
+# PASSWORD HASHING
+PASSWORD_HASH_METHOD = getenv('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+PASSWORD_HASH_WORKERS = int(getenv('PASSWORD_HASH_WORKERS', str(cpu_count() or 1)))
+PASSWORD_HASH_MAX_PENDING = int(getenv('PASSWORD_HASH_MAX_PENDING', '32'))
+PASSWORD_HASH_TIMEOUT = float(getenv('PASSWORD_HASH_TIMEOUT', '10.0'))
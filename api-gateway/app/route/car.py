@@ -1,27 +1,30 @@
 from flask import Blueprint, make_response, Response, request, jsonify
 from app.security.configuration import token_required
-import httpx
+from app.upstream.configuration import upstream
+from app.cache.configuration import cached_get, response_cache
+from app.env_variables import RESPONSE_CACHE_LIST_TTL, RESPONSE_CACHE_ITEM_TTL
 import logging
 
 cars_blueprint = Blueprint('cars_blueprint', __name__, url_prefix='/cars')
 # @token_required(roles=['ADMIN'])
 @cars_blueprint.route('/all')
 def get_all() -> Response:
-    res = httpx.get('http://cars-service:8001/cars/all')
-    logging.info(res.json())
-    return res.json(), res.status_code
+    # Pagination cursor, filters and fields are passed to cars service, so they are part of the cache key
+    path = f"/cars/all?{request.query_string.decode()}" if request.query_string else '/cars/all'
+    res = cached_get('cars', path, RESPONSE_CACHE_LIST_TTL)
+    return res.as_tuple(request.if_none_match)
 
 @cars_blueprint.route('/<int:car_id>', methods=['GET'])
 def get_one_by_id(car_id) -> Response:
-    res = httpx.get(f'http://cars-service:8001/car/{car_id}')
-    logging.info(res.json())
-    return res.json(), res.status_code
+    res = cached_get('cars', f'/car/{car_id}', RESPONSE_CACHE_ITEM_TTL)
+    return res.as_tuple(request.if_none_match)
 
 
 @cars_blueprint.route('/', methods=["POST"])
 def create_car() -> Response:
     data = request.get_json()
-    res = httpx.post('http://cars-service:8001/car', json=data)
+    res = upstream('cars').post('/car', json=data)
+    response_cache.invalidate('cars:')
     if type(res.json()) == int:
         return jsonify(res.json())
     return res.json(), 400
@@ -29,5 +32,6 @@ def create_car() -> Response:
 
 @cars_blueprint.route('/<int:car_id>', methods=['DELETE'])
 def delete_car(car_id) -> Response:
-    res = httpx.delete(f'http://cars-service:8001/car/{car_id}')
+    res = upstream('cars').delete(f'/car/{car_id}')
+    response_cache.invalidate('cars:')
     return res.json(), res.status_code
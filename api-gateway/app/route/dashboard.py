@@ -0,0 +1,14 @@
+from flask import Blueprint, Response
+
+from app.dashboard.configuration import fetch_dashboard
+
+fleet_blueprint = Blueprint('fleet_blueprint', __name__, url_prefix='/fleet')
+
+
+@fleet_blueprint.route('/dashboard')
+def get_dashboard() -> Response:
+    """
+    :return: Cars joined with their mots, insurances, repairs and drivers, together with status and latency of
+             every upstream. Unavailable upstreams are reported instead of failing whole request.
+    """
+    return fetch_dashboard()
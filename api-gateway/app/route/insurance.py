@@ -1,44 +1,58 @@
+import httpx
 from flask import Blueprint, Response, request
 from app.security.configuration import token_required
-import httpx
+from app.upstream.configuration import upstream
+from app.cache.configuration import cached_get, response_cache
+from app.env_variables import RESPONSE_CACHE_LIST_TTL, RESPONSE_CACHE_ITEM_TTL
+from app.upstream.streaming import upload_to_aws, delete_from_aws
+from app.upstream.forms import typed_form, LIABILITY_FORM_TYPES
 import logging
-from pathlib import Path
 
 insurances_blueprint = Blueprint('insurances_blueprint', __name__, url_prefix='/insurances')
 # @token_required(roles=['ADMIN'])
 @insurances_blueprint.route('/all')
 def get_all() -> Response:
-    res = httpx.get('http://insurances-service:8004/insurances/all')
-    logging.info(res.json())
-    return res.json(), res.status_code
+    res = cached_get('insurances', '/insurances/all', RESPONSE_CACHE_LIST_TTL)
+    return res.as_tuple(request.if_none_match)
 
 @insurances_blueprint.route('/<int:insurance_id>', methods=['GET'])
 def get_one_by_id(insurance_id: int) -> Response:
-    res = httpx.get(f'http://insurances-service:8004/insurances/{insurance_id}')
-    logging.info(res.json())
-    return res.json(), res.status_code
+    res = cached_get('insurances', f'/insurances/{insurance_id}', RESPONSE_CACHE_ITEM_TTL)
+    return res.as_tuple(request.if_none_match)
 
 
 @insurances_blueprint.route('/', methods=["POST"])
 def create_insurance() -> Response:
-    data = dict(request.form)
-    file = request.files['file']
-    filename = file.filename
-    file.save(file.filename)
-    aws_response = httpx.post(f'http://aws-resources-service:8003/file', files={'file': open(f'{filename}', 'rb')})
-    Path.cwd().joinpath(filename).unlink()
-    res = httpx.post('http://insurances-service:8004/insurances', json={**data, 'img_url': aws_response.json()['url']})
+    try:
+        # form fields are strings, services expect JSON types, invalid form aborts the upload before it completes
+        aws_response, data = upload_to_aws(request, lambda form: typed_form(form, LIABILITY_FORM_TYPES))
+    except ValueError:
+        return {'message': 'Invalid request'}, 400
+    if aws_response.status_code != 201:
+        return aws_response.json(), aws_response.status_code
+
+    img_url = aws_response.json()['url']
+    try:
+        res = upstream('insurances').post('/insurances', json={**data, 'img_url': img_url})
+    except httpx.HTTPError:
+        delete_from_aws(img_url)
+        raise
+    if res.status_code != 201:
+        # insurances service rejected the record, so the uploaded file belongs to nothing
+        delete_from_aws(img_url)
+    response_cache.invalidate('insurances:')
     return res.json(), res.status_code
 
 
 @insurances_blueprint.route('/<int:insurance_id>', methods=['DELETE'])
 def delete_insurance(insurance_id: int) -> Response:
-    insurance_res = httpx.get(f"http://insurances-service:8004/insurances/{insurance_id}")
+    insurance_res = upstream('insurances').get(f'/insurances/{insurance_id}')
     insurance_data = insurance_res.json()
     img_url = insurance_data.get('img_url')
     if img_url:
-        aws_response = httpx.request('DELETE', f'http://aws-resources-service:8003/file', json={"file": img_url})
+        aws_response = upstream('aws-resources').request('DELETE', '/file', json={"file": img_url})
         if aws_response.status_code == 201:
-            res = httpx.delete(f'http://insurances-service:8004/insurances/{insurance_id}')
+            res = upstream('insurances').delete(f'/insurances/{insurance_id}')
+            response_cache.invalidate('insurances:')
             return res.json(), res.status_code
     return insurance_res.json(), insurance_res.status_code
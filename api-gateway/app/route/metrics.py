@@ -0,0 +1,22 @@
+from flask import Blueprint, Response
+
+from app.cache.configuration import response_cache
+from app.upstream.configuration import UpstreamClients
+
+metrics_blueprint = Blueprint('metrics_blueprint', __name__, url_prefix='/metrics')
+
+
+@metrics_blueprint.route('/upstreams')
+def get_upstreams_metrics() -> Response:
+    """
+    :return: Connection pool utilisation of every upstream client created by current worker.
+    """
+    return UpstreamClients.metrics(), 200
+
+
+@metrics_blueprint.route('/cache')
+def get_cache_metrics() -> Response:
+    """
+    :return: Hit and miss counters and size of response cache of current worker.
+    """
+    return response_cache.metrics(), 200
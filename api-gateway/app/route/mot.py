@@ -1,46 +1,59 @@
+import httpx
 from flask import Blueprint, Response, request, jsonify
 from app.security.configuration import token_required
-import httpx
+from app.upstream.configuration import upstream
+from app.cache.configuration import cached_get, response_cache
+from app.env_variables import RESPONSE_CACHE_LIST_TTL, RESPONSE_CACHE_ITEM_TTL
+from app.upstream.streaming import upload_to_aws, delete_from_aws
+from app.upstream.forms import typed_form, LIABILITY_FORM_TYPES
 import logging
-from pathlib import Path
 
 mots_blueprint = Blueprint('mots_blueprint', __name__, url_prefix='/mots')
 # @token_required(roles=['ADMIN'])
 @mots_blueprint.route('/all')
 def get_all() -> Response:
-    res = httpx.get('http://mots-service:8002/mots/all')
-    logging.info(res.json())
-    return res.json(), res.status_code
+    res = cached_get('mots', '/mots/all', RESPONSE_CACHE_LIST_TTL)
+    return res.as_tuple(request.if_none_match)
 
 @mots_blueprint.route('/<int:mot_id>', methods=['GET'])
 def get_one_by_id(mot_id: int) -> Response:
-    res = httpx.get(f'http://mots-service:8002/mots/{mot_id}')
-    logging.info(res.json())
-    return res.json(), res.status_code
+    res = cached_get('mots', f'/mots/{mot_id}', RESPONSE_CACHE_ITEM_TTL)
+    return res.as_tuple(request.if_none_match)
 
 
 @mots_blueprint.route('/', methods=["POST"])
 def create_mot() -> Response:
-    data = dict(request.form)
-    file = request.files['file']
-    filename = file.filename
-    file.save(file.filename)
-    aws_response = httpx.post(f'http://aws-resources-service:8003/file', files={'file': open(f'{filename}', 'rb')})
-    Path.cwd().joinpath(filename).unlink()
+    try:
+        # form fields are strings, services expect JSON types, invalid form aborts the upload before it completes
+        aws_response, data = upload_to_aws(request, lambda form: typed_form(form, LIABILITY_FORM_TYPES))
+    except ValueError:
+        return {'message': 'Invalid request'}, 400
+    if aws_response.status_code != 201:
+        return aws_response.json(), aws_response.status_code
 
-    res = httpx.post('http://mots-service:8002/mots', json={**data, 'img_url': aws_response.json()['url']})
+    img_url = aws_response.json()['url']
+    try:
+        res = upstream('mots').post('/mots', json={**data, 'img_url': img_url})
+    except httpx.HTTPError:
+        delete_from_aws(img_url)
+        raise
+    if res.status_code != 201:
+        # mots service rejected the record, so the uploaded file belongs to nothing
+        delete_from_aws(img_url)
+    response_cache.invalidate('mots:')
     return res.json(), res.status_code
 
 
 @mots_blueprint.route('/<int:mot_id>', methods=['DELETE'])
 def delete_mot(mot_id: int) -> Response:
     # TODO, czy trzeba to przerabiac
-    mot_res = httpx.get(f"http://mots-service:8002/mots/{mot_id}")
+    mot_res = upstream('mots').get(f'/mots/{mot_id}')
     mot_data = mot_res.json()
     img_url = mot_data.get('img_url')
     if img_url:
-        aws_response = httpx.request('DELETE', f'http://aws-resources-service:8003/file', json={"file": img_url})
+        aws_response = upstream('aws-resources').request('DELETE', '/file', json={"file": img_url})
         if aws_response.status_code == 201:
-            res = httpx.delete(f'http://mots-service:8002/mots/{mot_id}')
+            res = upstream('mots').delete(f'/mots/{mot_id}')
+            response_cache.invalidate('mots:')
             return res.json(), res.status_code
     return mot_res.json(), mot_res.status_code
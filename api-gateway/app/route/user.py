@@ -3,6 +3,8 @@ import logging
 from flask import request, Response
 from flask_restful import Resource, reqparse
 from datetime import datetime
+from sqlalchemy.exc import IntegrityError
+from app.db.configuration import sa
 from app.db.model import UserModel
 from app.email.configuration import MailSender
 
@@ -18,14 +20,16 @@ class UserResource(Resource):
         try:
             request_data = UserResource.parser.parse_args()
 
-            if UserModel.find_by_username(request_data['username']):
-                return {'message': 'User already exists'}, 400
-
-            if UserModel.find_by_email(request_data['email']):
-                return {'message': 'Email already exists'}, 400
-
+            # Unique indexes on username and email detect duplicates, also the ones created concurrently
             user = UserModel(**request_data)
-            user.save_or_update()
+            try:
+                user.save_or_update()
+            except IntegrityError:
+                sa.session.rollback()
+                taken = UserModel.find_taken_fields(request_data['username'], request_data['email'])
+                if 'email' in taken and 'username' not in taken:
+                    return {'message': 'Email already exists'}, 400
+                return {'message': 'User already exists'}, 400
 
             MailSender.send_activation_email(user.id, user.username, user.email)
 
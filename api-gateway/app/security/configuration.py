@@ -7,6 +7,8 @@ from datetime import datetime, timedelta
 
 from app.env_variables import JWT_AUTHMAXAGE, JWT_SECRET, JWT_PREFIX, JWT_AUTHTYPE, JWT_REFRESHMAXAGE
 from app.db.model import UserModel
+from app.security.token_cache import token_cache
+from app.security.password import PasswordHasherBusy
 logger = logging.getLogger(__name__)
 
 # ------------------------------------------------------------
@@ -31,8 +33,12 @@ def configure_security(app):
         if not user.active:
             return make_response({'message': 'Authentication failed [2] !'}, 500)
 
-        if not user.check_password(password):
-            return make_response({'message': 'Authentication failed [3] !'}, 400)
+        try:
+            if not user.check_password(password):
+                return make_response({'message': 'Authentication failed [3] !'}, 400)
+            user.rehash_password_if_needed(password)
+        except PasswordHasherBusy:
+            return make_response({'message': 'Too many login attempts, try again later'}, 503)
 
         access_token_exp = int((datetime.utcnow() + timedelta(minutes=JWT_AUTHMAXAGE)).timestamp())
         refresh_token_exp = int((datetime.utcnow() + timedelta(minutes=JWT_REFRESHMAXAGE)).timestamp())
@@ -124,7 +130,12 @@ def token_required(roles: list[str]):
     Checks if:
     - access token is valid
     - user has role that is required
+
+    Required roles are lowercased once, when decorator is created. Token that was verified once is served from
+    token_cache until it expires, so dashboards presenting the same token skip jwt.decode.
     """
+    allowed_roles = frozenset(role.lower() for role in roles)
+
     def decorator(f):
         @wraps(f)
         def decorated(*args, **kwargs):
@@ -139,17 +150,19 @@ def token_required(roles: list[str]):
 
             access_token = header.split(' ')[1]
 
-            try:
-                access_token_data = jwt.decode(access_token, JWT_SECRET, algorithms=[JWT_AUTHTYPE])
-
-                if access_token_data['role'].lower() not in [role.lower() for role in roles]:
-                    return make_response({'message': 'Acess denied [1]!'}, 403)
+            verified_token = token_cache.get(access_token)
+            if verified_token is None:
+                try:
+                    access_token_data = jwt.decode(access_token, JWT_SECRET, algorithms=[JWT_AUTHTYPE])
+                    verified_token = token_cache.put(access_token, access_token_data)
+                except Exception:
+                    return make_response({'message': 'Authorization failed [3] !'}, 403)
 
-                if datetime.fromtimestamp(access_token_data['exp']) < datetime.utcnow():
-                    return make_response({'message': 'Acess denied [2]!'}, 403)
+            if verified_token.role not in allowed_roles:
+                return make_response({'message': 'Acess denied [1]!'}, 403)
 
-            except Exception:
-                return make_response({'message': 'Authorization failed [3] !'}, 403)
+            if datetime.fromtimestamp(verified_token.exp) < datetime.utcnow():
+                return make_response({'message': 'Acess denied [2]!'}, 403)
 
             return f(*args, **kwargs)
 
@@ -0,0 +1,90 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.security import generate_password_hash, check_password_hash
+
+from app.env_variables import (
+    PASSWORD_HASH_METHOD,
+    PASSWORD_HASH_WORKERS,
+    PASSWORD_HASH_MAX_PENDING,
+    PASSWORD_HASH_TIMEOUT
+)
+
+
+class PasswordHasherBusy(Exception):
+    """
+    Raised when too many passwords are already waiting for hashing.
+    """
+
+
+class PasswordHasher:
+    """
+    Hashes and verifies passwords in a bounded thread pool. hashlib releases the GIL while computing scrypt and
+    pbkdf2, and at most max_pending hashes queue up before PasswordHasherBusy is raised.
+
+    The calling thread waits for the result, so the pool only helps when the worker serves requests in several
+    threads (gunicorn --threads N, which selects gthread worker) or through the ASGI app. With sync worker the
+    single request thread of the process is blocked for the whole hash and login burst stops every other request,
+    see benchmarks/bench_login.py.
+
+    Method uses werkzeug format, e.g. 'scrypt:32768:8:1' or 'pbkdf2:sha256:600000'. Hashes created with
+    different method are reported by needs_rehash(), so they can be upgraded on successful login.
+
+    Example usage:
+        if password_hasher.verify(user.password, password) and password_hasher.needs_rehash(user.password):
+            user.password = password_hasher.hash(password)
+    """
+    def __init__(self, method: str, workers: int, max_pending: int, timeout: float):
+        """
+        :param method: Werkzeug hashing method with cost parameters.
+        :param workers: Number of threads computing hashes.
+        :param max_pending: Maximal number of hashes computed or waiting at the same time.
+        :param timeout: Seconds to wait for free slot and for result of hashing.
+        """
+        # Werkzeug fills in default cost parameters, hash of empty password shows the full method
+        self.method = generate_password_hash('', method).split('$', 1)[0]
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hasher')
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    def _run(self, function, *args):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PasswordHasherBusy('Too many passwords are waiting for hashing')
+        try:
+            future = self._executor.submit(function, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        # Slot is freed when hashing really ends, not when caller stops waiting for it
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            raise PasswordHasherBusy('Hashing of password timed out')
+
+    def hash(self, password: str) -> str:
+        """
+        :param password: Plain password.
+        :return: Salted hash of the password created with configured method.
+        """
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash: str, password: str) -> bool:
+        """
+        :param password_hash: Stored hash, method is read from it.
+        :param password: Plain password to check.
+        :return: True if password matches the hash.
+        """
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """
+        :param password_hash: Stored hash.
+        :return: True if hash was created with different method or cost parameters than configured ones.
+        """
+        return password_hash.split('$', 1)[0] != self.method
+
+
+password_hasher = PasswordHasher(
+    PASSWORD_HASH_METHOD, PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING, PASSWORD_HASH_TIMEOUT
+)
@@ -0,0 +1,85 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from app.env_variables import JWT_CACHE_ENABLED, JWT_CACHE_MAX_ENTRIES, JWT_CACHE_MAX_TTL
+
+
+class VerifiedToken:
+    """
+    Claims of access token, which signature was already verified.
+    """
+    __slots__ = ('role', 'exp', 'valid_until')
+
+    def __init__(self, role: str, exp: float, valid_until: float):
+        self.role = role
+        self.exp = exp
+        self.valid_until = valid_until
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU cache of access tokens that passed jwt.decode, keyed by sha256 digest of the token, so raw tokens
+    aren't kept in memory.
+
+    Entry is valid until token's 'exp' and never longer than max_ttl. Only successfully verified tokens are stored,
+    invalid ones are decoded (and rejected) every time.
+
+    Example usage:
+        cached = token_cache.get(access_token)
+        if cached is None:
+            data = jwt.decode(access_token, ...)
+            cached = token_cache.put(access_token, data)
+    """
+    def __init__(self, max_entries: int, max_ttl: float, enabled: bool = True):
+        self.max_entries = max_entries
+        self.max_ttl = max_ttl
+        self.enabled = enabled
+        self._entries: OrderedDict[bytes, VerifiedToken] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> VerifiedToken | None:
+        """
+        :param token: Raw access token.
+        :return: Verified claims or None if token isn't cached or already expired.
+        """
+        if not self.enabled:
+            return None
+        digest = self._digest(token)
+        with self._lock:
+            cached = self._entries.get(digest)
+            if cached is None:
+                return None
+            if cached.valid_until <= time.time():
+                del self._entries[digest]
+                return None
+            self._entries.move_to_end(digest)
+            return cached
+
+    def put(self, token: str, claims: dict[str, Any]) -> VerifiedToken:
+        """
+        :param token: Raw access token that was successfully decoded.
+        :param claims: Decoded claims of the token, must contain 'role' and 'exp'.
+        :return: Verified claims that will be served for the token from now on.
+        """
+        exp = float(claims['exp'])
+        verified = VerifiedToken(claims['role'].lower(), exp, min(exp, time.time() + self.max_ttl))
+        if self.enabled:
+            with self._lock:
+                self._entries[self._digest(token)] = verified
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return verified
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = VerifiedTokenCache(JWT_CACHE_MAX_ENTRIES, JWT_CACHE_MAX_TTL, JWT_CACHE_ENABLED)
@@ -0,0 +1,390 @@
+import asyncio
+import atexit
+import logging
+import os
+import threading
+from importlib.util import find_spec
+from typing import Any, AsyncIterator, Iterator
+
+import httpx
+
+from app.env_variables import (
+    CARS_SERVICE_URL,
+    MOTS_SERVICE_URL,
+    AWS_RESOURCES_SERVICE_URL,
+    INSURANCES_SERVICE_URL,
+    REPAIRS_SERVICE_URL,
+    DRIVERS_SERVICE_URL,
+    UPSTREAM_CONNECT_TIMEOUT,
+    UPSTREAM_READ_TIMEOUT,
+    UPSTREAM_WRITE_TIMEOUT,
+    UPSTREAM_POOL_TIMEOUT,
+    UPSTREAM_MAX_CONNECTIONS,
+    UPSTREAM_MAX_KEEPALIVE_CONNECTIONS,
+    UPSTREAM_KEEPALIVE_EXPIRY,
+    UPSTREAM_HTTP2
+)
+
+logger = logging.getLogger(__name__)
+
+"""
+Base urls of services that gateway proxies requests to. Keys are used as names of pooled clients.
+"""
+UPSTREAMS = {
+    'cars': CARS_SERVICE_URL,
+    'mots': MOTS_SERVICE_URL,
+    'aws-resources': AWS_RESOURCES_SERVICE_URL,
+    'insurances': INSURANCES_SERVICE_URL,
+    'repairs': REPAIRS_SERVICE_URL,
+    'drivers': DRIVERS_SERVICE_URL,
+}
+
+"""
+Per-upstream overrides of pool limits. File uploads keep connections busy much longer than json calls,
+so aws-resources gets smaller pool in order not to starve other upstreams of sockets.
+"""
+UPSTREAM_LIMITS = {
+    'aws-resources': httpx.Limits(
+        max_connections=max(UPSTREAM_MAX_CONNECTIONS // 2, 1),
+        max_keepalive_connections=max(UPSTREAM_MAX_KEEPALIVE_CONNECTIONS // 2, 1),
+        keepalive_expiry=UPSTREAM_KEEPALIVE_EXPIRY
+    ),
+}
+
+DEFAULT_LIMITS = httpx.Limits(
+    max_connections=UPSTREAM_MAX_CONNECTIONS,
+    max_keepalive_connections=UPSTREAM_MAX_KEEPALIVE_CONNECTIONS,
+    keepalive_expiry=UPSTREAM_KEEPALIVE_EXPIRY
+)
+
+DEFAULT_TIMEOUT = httpx.Timeout(
+    connect=UPSTREAM_CONNECT_TIMEOUT,
+    read=UPSTREAM_READ_TIMEOUT,
+    write=UPSTREAM_WRITE_TIMEOUT,
+    pool=UPSTREAM_POOL_TIMEOUT
+)
+
+# HTTP/2 needs optional 'h2' package, without it httpx raises ImportError when transport is created
+HTTP2_ENABLED = UPSTREAM_HTTP2 and find_spec('h2') is not None
+
+
+class PoolMetrics:
+    """
+    Thread safe counters describing usage of one upstream connection pool.
+
+    Attributes:
+        - requests_total: Number of requests sent to the upstream.
+        - failures_total: Number of requests that ended with transport error (timeouts, refused connections...).
+        - in_flight: Number of requests that currently hold or wait for connection from the pool.
+          Can exceed max_connections when pool is exhausted.
+        - peak_in_flight: Highest observed value of in_flight.
+    """
+    def __init__(self, max_connections: int | None):
+        self.max_connections = max_connections
+        self.requests_total = 0
+        self.failures_total = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._lock = threading.Lock()
+
+    def request_started(self) -> None:
+        with self._lock:
+            self.requests_total += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def request_finished(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def request_failed(self) -> None:
+        with self._lock:
+            self.failures_total += 1
+            self.in_flight -= 1
+
+    def as_dict(self, connections: list[Any]) -> dict[str, Any]:
+        """
+        :param connections: Connections currently kept by pool of the transport.
+        :return: Snapshot of counters extended with state of pooled connections.
+        """
+        with self._lock:
+            in_flight = self.in_flight
+            snapshot = {
+                'requests_total': self.requests_total,
+                'failures_total': self.failures_total,
+                'in_flight': in_flight,
+                'peak_in_flight': self.peak_in_flight,
+            }
+        idle = sum(1 for connection in connections if connection.is_idle())
+        return {
+            **snapshot,
+            'connections_open': len(connections),
+            'connections_idle': idle,
+            'max_connections': self.max_connections,
+            'utilisation': round(in_flight / self.max_connections, 3) if self.max_connections else None,
+        }
+
+
+class _MeteredResponseStream(httpx.SyncByteStream):
+    """
+    Wraps response body, so request is counted as in flight until body is read and connection goes back to pool.
+    """
+    def __init__(self, stream: httpx.SyncByteStream, metrics: PoolMetrics):
+        self._stream = stream
+        self._metrics = metrics
+        self._closed = False
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield from self._stream
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            if not self._closed:
+                self._closed = True
+                self._metrics.request_finished()
+
+
+class MeteredTransport(httpx.HTTPTransport):
+    """
+    HTTPTransport that reports usage of its connection pool to PoolMetrics.
+    """
+    def __init__(self, metrics: PoolMetrics, **kwargs):
+        super().__init__(**kwargs)
+        self.metrics = metrics
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        self.metrics.request_started()
+        try:
+            response = super().handle_request(request)
+        except Exception:
+            self.metrics.request_failed()
+            raise
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_MeteredResponseStream(response.stream, self.metrics),
+            extensions=response.extensions
+        )
+
+    def pool_connections(self) -> list[Any]:
+        return list(self._pool.connections)
+
+
+class _AsyncMeteredResponseStream(httpx.AsyncByteStream):
+    """
+    Async counterpart of _MeteredResponseStream.
+    """
+    def __init__(self, stream: httpx.AsyncByteStream, metrics: PoolMetrics):
+        self._stream = stream
+        self._metrics = metrics
+        self._closed = False
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._closed:
+                self._closed = True
+                self._metrics.request_finished()
+
+
+class AsyncMeteredTransport(httpx.AsyncHTTPTransport):
+    """
+    AsyncHTTPTransport that reports usage of its connection pool to PoolMetrics.
+    """
+    def __init__(self, metrics: PoolMetrics, **kwargs):
+        super().__init__(**kwargs)
+        self.metrics = metrics
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.metrics.request_started()
+        try:
+            response = await super().handle_async_request(request)
+        except Exception:
+            self.metrics.request_failed()
+            raise
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_AsyncMeteredResponseStream(response.stream, self.metrics),
+            extensions=response.extensions
+        )
+
+    def pool_connections(self) -> list[Any]:
+        return list(self._pool.connections)
+
+
+class UpstreamClients:
+    """
+    Registry of pooled, keep-alive http clients - one client per upstream service and per worker process.
+
+    Clients are created lazily, so every gunicorn worker builds its own pool after fork instead of sharing
+    sockets inherited from master process. httpx.Client is thread safe, so one client serves all threads of worker.
+
+    Example usage:
+        res = UpstreamClients.get('cars').get('/cars/all')
+    """
+    _clients: dict[str, httpx.Client] = {}
+    _transports: dict[str, MeteredTransport] = {}
+    _pid: int | None = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls, name: str) -> httpx.Client:
+        """
+        :param name: Name of upstream declared in UPSTREAMS.
+        :return: Pooled client with base_url of the upstream.
+        :raises KeyError: If upstream with given name is not declared.
+        """
+        if cls._pid != os.getpid():
+            cls._reset_after_fork()
+
+        client = cls._clients.get(name)
+        if client is None:
+            with cls._lock:
+                client = cls._clients.get(name)
+                if client is None:
+                    client = cls._create_client(name)
+        return client
+
+    @classmethod
+    def metrics(cls) -> dict[str, dict[str, Any]]:
+        """
+        :return: Pool utilisation metrics for every upstream client created in current worker.
+        """
+        return {
+            name: transport.metrics.as_dict(transport.pool_connections())
+            for name, transport in cls._transports.items()
+        }
+
+    @classmethod
+    def close_all(cls) -> None:
+        """
+        Closes all clients of current worker together with their keep-alive connections.
+
+        :return: None
+        """
+        with cls._lock:
+            for client in cls._clients.values():
+                client.close()
+            cls._clients = {}
+            cls._transports = {}
+
+    @classmethod
+    def _create_client(cls, name: str) -> httpx.Client:
+        limits = UPSTREAM_LIMITS.get(name, DEFAULT_LIMITS)
+        transport = MeteredTransport(
+            PoolMetrics(limits.max_connections),
+            limits=limits,
+            http2=HTTP2_ENABLED,
+            retries=1
+        )
+        client = httpx.Client(base_url=UPSTREAMS[name], transport=transport, timeout=DEFAULT_TIMEOUT)
+        cls._transports[name] = transport
+        cls._clients[name] = client
+        logger.info(f'Created pooled client for {name} upstream (http2={HTTP2_ENABLED}, limits={limits})')
+        return client
+
+    @classmethod
+    def _reset_after_fork(cls) -> None:
+        # Sockets inherited from other process can't be reused, so pools are dropped without closing them
+        with cls._lock:
+            if cls._pid != os.getpid():
+                cls._clients = {}
+                cls._transports = {}
+                cls._pid = os.getpid()
+
+
+class AsyncUpstreamClients:
+    """
+    Registry of pooled httpx.AsyncClient instances used by async (ASGI) mode of the gateway.
+
+    AsyncClient is bound to event loop it was created in, so clients are kept per running loop - with
+    uvicorn worker that means one set of pools per worker process.
+
+    Example usage:
+        res = await AsyncUpstreamClients.get('cars').get('/cars/all')
+    """
+    _clients: dict[str, httpx.AsyncClient] = {}
+    _transports: dict[str, AsyncMeteredTransport] = {}
+    _loop: asyncio.AbstractEventLoop | None = None
+
+    @classmethod
+    def get(cls, name: str) -> httpx.AsyncClient:
+        """
+        :param name: Name of upstream declared in UPSTREAMS.
+        :return: Pooled async client with base_url of the upstream.
+        :raises KeyError: If upstream with given name is not declared.
+        """
+        loop = asyncio.get_running_loop()
+        if cls._loop is not loop:
+            # Clients of other (already closed) loop can't be reused
+            cls._clients = {}
+            cls._transports = {}
+            cls._loop = loop
+
+        client = cls._clients.get(name)
+        if client is None:
+            limits = UPSTREAM_LIMITS.get(name, DEFAULT_LIMITS)
+            transport = AsyncMeteredTransport(
+                PoolMetrics(limits.max_connections),
+                limits=limits,
+                http2=HTTP2_ENABLED,
+                retries=1
+            )
+            client = httpx.AsyncClient(base_url=UPSTREAMS[name], transport=transport, timeout=DEFAULT_TIMEOUT)
+            cls._transports[name] = transport
+            cls._clients[name] = client
+        return client
+
+    @classmethod
+    def metrics(cls) -> dict[str, dict[str, Any]]:
+        """
+        :return: Pool utilisation metrics for every async upstream client of current event loop.
+        """
+        return {
+            name: transport.metrics.as_dict(transport.pool_connections())
+            for name, transport in cls._transports.items()
+        }
+
+    @classmethod
+    async def close_all(cls) -> None:
+        """
+        Closes all async clients of current event loop.
+
+        :return: None
+        """
+        clients = list(cls._clients.values())
+        cls._clients = {}
+        cls._transports = {}
+        for client in clients:
+            await client.aclose()
+
+
+def upstream(name: str) -> httpx.Client:
+    """
+    Shortcut for UpstreamClients.get()
+
+    :param name: Name of upstream declared in UPSTREAMS.
+    :return: Pooled client of the upstream.
+    """
+    return UpstreamClients.get(name)
+
+
+def async_upstream(name: str) -> httpx.AsyncClient:
+    """
+    Shortcut for AsyncUpstreamClients.get()
+
+    :param name: Name of upstream declared in UPSTREAMS.
+    :return: Pooled async client of the upstream.
+    """
+    return AsyncUpstreamClients.get(name)
+
+
+atexit.register(UpstreamClients.close_all)
@@ -0,0 +1,58 @@
+from datetime import date
+from typing import Any, Callable
+
+"""
+Values of boolean form fields, compared case-insensitively. Browsers send 'on' for checked checkbox.
+"""
+TRUE_VALUES = frozenset({'true', '1', 'on', 'yes'})
+FALSE_VALUES = frozenset({'false', '0', 'off', 'no'})
+
+
+def form_bool(value: str) -> bool:
+    """
+    :param value: Value of boolean form field.
+    :return: The boolean.
+    :raises ValueError: If value is none of TRUE_VALUES and FALSE_VALUES.
+    """
+    normalized = value.strip().lower()
+    if normalized in TRUE_VALUES:
+        return True
+    if normalized in FALSE_VALUES:
+        return False
+    raise ValueError(f'{value!r} is not a boolean')
+
+
+def form_date(value: str) -> str:
+    """
+    :param value: Value of date form field.
+    :return: The date in YYYY-MM-DD format.
+    :raises ValueError: If value is not a date in ISO 8601 format.
+    """
+    return date.fromisoformat(value.strip()).isoformat()
+
+
+"""
+Types of form fields of MOT and insurance forms, the other fields are forwarded as strings
+"""
+LIABILITY_FORM_TYPES = {
+    'start_date': form_date,
+    'end_date': form_date,
+    'active': form_bool,
+}
+
+
+def typed_form(form: dict[str, str], types: dict[str, Callable[[str], Any]]) -> dict[str, Any]:
+    """
+    Converts string values of multipart form to JSON types upstream services validate bodies against, so form
+    can be forwarded as JSON.
+
+    Example usage:
+        data = typed_form({'active': 'true', 'end_date': '2024-05-31'}, LIABILITY_FORM_TYPES)
+        # {'active': True, 'end_date': '2024-05-31'}
+
+    :param form: Form fields of the request.
+    :param types: Converters of fields which aren't strings, by field name.
+    :return: Form fields with converted values.
+    :raises ValueError: If any value can't be converted.
+    """
+    return {name: types[name](value) if name in types else value for name, value in form.items()}
@@ -0,0 +1,218 @@
+import logging
+from functools import partial
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Iterable, Iterator
+
+import httpx
+from werkzeug.http import parse_options_header
+from werkzeug.sansio.multipart import Data, Epilogue, Field, File, MultipartDecoder, NeedData
+
+from app.env_variables import UPLOAD_CHUNK_SIZE, UPLOAD_MAX_FIELD_SIZE
+from app.upstream.configuration import upstream, async_upstream
+
+logger = logging.getLogger(__name__)
+
+# Same limit of form parts Flask uses when it parses multipart body itself
+MAX_PARTS = 1000
+
+
+class MultipartPassThrough:
+    """
+    Forwards multipart/form-data body to upstream chunk by chunk, without buffering uploaded file in memory or on disk.
+
+    Every chunk of incoming body is passed unchanged to the upstream and at the same time fed to incremental
+    multipart parser, which collects small form fields (registration, dates...) and name of uploaded file.
+    Memory used per request is therefore bounded by chunk size and UPLOAD_MAX_FIELD_SIZE, no matter how big
+    the file is. Form fields are complete once body was fully sent.
+
+    Form fields are validated with validate once the closing boundary was received, before the chunk holding it
+    is forwarded. Invalid form therefore aborts the upload and the upstream never receives complete file.
+
+    Example usage:
+        pass_through = MultipartPassThrough(request.content_type, request.content_length)
+        res = upstream('aws-resources').post(
+            '/file',
+            content=pass_through.iter_body(request.stream),
+            headers=pass_through.headers
+        )
+        data = pass_through.form
+
+    :param content_type: Content-Type header of incoming request, including multipart boundary.
+    :param content_length: Content-Length of incoming request, None for chunked requests.
+    :param file_field: Name of form field holding the file.
+    :param validate: Converts collected form fields, e.g. to JSON types, and raises ValueError if they are invalid.
+    :raises ValueError: If request is not multipart/form-data.
+    """
+    def __init__(self, content_type: str | None, content_length: int | None = None, file_field: str = 'file',
+                 validate: Callable[[dict[str, str]], dict[str, Any]] | None = None):
+        mimetype, options = parse_options_header(content_type)
+        if mimetype != 'multipart/form-data' or 'boundary' not in options:
+            raise ValueError('Expected multipart/form-data request')
+
+        self.content_type = content_type
+        self.content_length = content_length
+        self.file_field = file_field
+        self.validate = validate
+        self.form: dict[str, Any] = {}
+        self.filename: str | None = None
+        self.complete = False
+
+        # Decoder's max_form_memory_size limits every received chunk including file data, so size of form fields
+        # is checked separately in _receive()
+        self._decoder = MultipartDecoder(options['boundary'].encode(), max_parts=MAX_PARTS)
+        self._delimiter = b'--' + options['boundary'].encode()
+        self._held_back = b''
+        self._field_name: str | None = None
+        self._field_value = bytearray()
+
+    @property
+    def headers(self) -> dict[str, str]:
+        """
+        :return: Headers that have to be sent to the upstream together with forwarded body.
+        """
+        headers = {'Content-Type': self.content_type}
+        if self.content_length is not None:
+            headers['Content-Length'] = str(self.content_length)
+        return headers
+
+    def iter_body(self, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """
+        :param chunks: Chunks of incoming request body.
+        :return: The same chunks, parsed on the fly.
+        :raises ValueError: If body is not valid multipart/form-data.
+        """
+        for chunk in chunks:
+            if chunk:
+                self._receive(chunk)
+                yield chunk
+        self._receive(None)
+
+    async def aiter_body(self, chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+        """
+        Async counterpart of iter_body().
+
+        :param chunks: Chunks of incoming request body.
+        :return: The same chunks, parsed on the fly.
+        :raises ValueError: If body is not valid multipart/form-data.
+        """
+        async for chunk in chunks:
+            if chunk:
+                self._receive(chunk)
+                yield chunk
+        self._receive(None)
+
+    def _receive(self, chunk: bytes | None) -> None:
+        self._feed(chunk)
+        event = self._decoder.next_event()
+        while not isinstance(event, NeedData):
+            if isinstance(event, Field):
+                self._field_name = event.name
+                self._field_value.clear()
+            elif isinstance(event, File):
+                # Content of the file goes only to the upstream
+                self._field_name = None
+                if event.name == self.file_field:
+                    self.filename = event.filename
+            elif isinstance(event, Data):
+                if self._field_name is not None:
+                    self._field_value += event.data
+                    if len(self._field_value) > UPLOAD_MAX_FIELD_SIZE:
+                        raise ValueError(f'Form field {self._field_name} is too large')
+                    if not event.more_data:
+                        self.form[self._field_name] = self._field_value.decode()
+            elif isinstance(event, Epilogue):
+                if self.validate is not None:
+                    self.form = self.validate(self.form)
+                self.complete = True
+                return
+            event = self._decoder.next_event()
+        # After all events were consumed only partial boundary or headers stay in the buffer, growing buffer
+        # means body doesn't match declared boundary
+        if len(self._decoder.buffer) > UPLOAD_MAX_FIELD_SIZE:
+            raise ValueError('Invalid multipart/form-data body')
+        if chunk is None and not self.complete:
+            raise ValueError('Unexpected end of multipart/form-data body')
+
+    def _feed(self, chunk: bytes | None) -> None:
+        # Decoder returns CR before a boundary as data of the part when its buffer ends after the boundary but before
+        # the end of boundary line, so the last line is held back while it is, or still can become, such boundary
+        if chunk is None:
+            self._decoder.receive_data(self._held_back)
+            self._decoder.receive_data(None)
+            return
+        data = self._held_back + chunk if self._held_back else chunk
+        start = data.rfind(b'\n') + 1
+        line = data[start:]
+        if line and (line.startswith(self._delimiter) or self._delimiter.startswith(line)):
+            if len(line) > UPLOAD_MAX_FIELD_SIZE:
+                raise ValueError('Invalid multipart/form-data body')
+            self._held_back = line
+            data = data[:start]
+        else:
+            self._held_back = b''
+        self._decoder.receive_data(data)
+
+
+def upload_to_aws(request, validate: Callable[[dict[str, str]], dict[str, Any]] | None = None
+                  ) -> tuple[httpx.Response, dict[str, Any]]:
+    """
+    Streams multipart request with 'file' field to aws-resources service.
+
+    :param request: Flask request, which body wasn't read yet.
+    :param validate: Validator of remaining form fields, see MultipartPassThrough.
+    :return: Response of aws-resources service and remaining form fields of the request.
+    :raises ValueError: If request body is not valid multipart/form-data or its form fields are invalid.
+    """
+    pass_through = MultipartPassThrough(request.content_type, request.content_length, validate=validate)
+    chunks = iter(partial(request.stream.read, UPLOAD_CHUNK_SIZE), b'')
+    res = upstream('aws-resources').post('/file', content=pass_through.iter_body(chunks), headers=pass_through.headers)
+    return res, pass_through.form
+
+
+async def async_upload_to_aws(request, validate: Callable[[dict[str, str]], dict[str, Any]] | None = None
+                              ) -> tuple[httpx.Response, dict[str, Any]]:
+    """
+    Async counterpart of upload_to_aws().
+
+    :param request: Quart request, which body wasn't read yet.
+    :param validate: Validator of remaining form fields, see MultipartPassThrough.
+    :return: Response of aws-resources service and remaining form fields of the request.
+    :raises ValueError: If request body is not valid multipart/form-data or its form fields are invalid.
+    """
+    pass_through = MultipartPassThrough(request.content_type, request.content_length, validate=validate)
+    res = await async_upstream('aws-resources').post(
+        '/file',
+        content=pass_through.aiter_body(request.body),
+        headers=pass_through.headers
+    )
+    return res, pass_through.form
+
+
+def delete_from_aws(url: str) -> None:
+    """
+    Deletes uploaded file whose record wasn't created, so no orphaned object stays in the bucket. Failure is only
+    logged, the caller answers with the error that made the file orphaned.
+
+    :param url: Url of the file returned by aws-resources service.
+    :return: None
+    """
+    try:
+        res = upstream('aws-resources').request('DELETE', '/file', json={'file': url})
+        if res.status_code != 201:
+            logger.warning(f'Deleting orphaned file {url} failed with status {res.status_code}')
+    except httpx.HTTPError as e:
+        logger.warning(f'Deleting orphaned file {url} failed: {e!r}')
+
+
+async def async_delete_from_aws(url: str) -> None:
+    """
+    Async counterpart of delete_from_aws().
+
+    :param url: Url of the file returned by aws-resources service.
+    :return: None
+    """
+    try:
+        res = await async_upstream('aws-resources').request('DELETE', '/file', json={'file': url})
+        if res.status_code != 201:
+            logger.warning(f'Deleting orphaned file {url} failed with status {res.status_code}')
+    except httpx.HTTPError as e:
+        logger.warning(f'Deleting orphaned file {url} failed: {e!r}')
@@ -0,0 +1,73 @@
+"""
+Rendering throughput of activation mail for bulk re-activation campaigns.
+
+Compares substituting placeholders in template source on every call with MailTemplate compiled once, and shows
+cost of building the whole MIME message for the rendered html. Run from api-gateway directory:
+
+    python -m benchmarks.bench_activation_email --renders 20000
+"""
+import argparse
+import sys
+import time
+from html import escape
+
+from flask import Flask
+from flask_mail import Mail, Message
+
+from app.email.template import MailTemplate, PLACEHOLDER, TEMPLATES_DIR
+
+
+def measure(function, renders: int) -> float:
+    """
+    :return: Renders per second.
+    """
+    start = time.perf_counter()
+    for number in range(renders):
+        function(number)
+    return renders / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--renders', type=int, default=20000)
+    args = parser.parse_args()
+
+    source = (TEMPLATES_DIR / 'activation.html').read_text(encoding='utf-8')
+    template = MailTemplate.load('activation.html')
+
+    def values(number: int) -> dict[str, str]:
+        return {
+            'username': f'user{number}',
+            'activation_link': f'http://localhost/users/activate?id={number}&timestamp=1700000000000'
+        }
+
+    def substitute_per_call(number: int) -> str:
+        fields = values(number)
+        return PLACEHOLDER.sub(lambda match: escape(fields[match.group(1)]), source)
+
+    def compiled(number: int) -> str:
+        return template.render(**values(number))
+
+    def compiled_with_mime(number: int) -> str:
+        return Message(
+            subject='Activate your account',
+            sender='ds.messanger@gmail.com',
+            recipients=[f'user{number}@example.com'],
+            html=template.render(**values(number))
+        ).as_string()
+
+    app = Flask(__name__)
+    Mail(app)
+    with app.app_context():
+        results = {
+            'substitution per call': measure(substitute_per_call, args.renders),
+            'compiled template': measure(compiled, args.renders),
+            'compiled + MIME message': measure(compiled_with_mime, args.renders // 10),
+        }
+
+    for name, renders_per_second in results.items():
+        print(f'{name:<25} {renders_per_second:>12,.0f} renders/s', file=sys.stdout)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Encoding time of GET /fleet/dashboard sized responses (one car with its mot, insurance and driver per row) -
+Flask's DefaultJSONProvider used before, compared with the provider installed by configure_json() (orjson when
+it is installed). Run from api-gateway directory:
+
+    python -m benchmarks.bench_json --rows 10000
+"""
+import argparse
+import sys
+import time
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from app.json.configuration import JSON_PROVIDER_CLASS
+
+CAR = {
+    'id': 1, 'registration': 'DPL96RR', 'vin': '12AASL45J01234122', 'make': 'BMW', 'model': 'SERIES 3',
+    'first_registration_date': '2020-01-01', 'production_year': '2019', 'mileage': '150000',
+    'fuel_consumption': '6.99', 'fuel_type_id': 1, 'vehicle_status_id': 1
+}
+DOCUMENT = {
+    'id': 1, 'legal_identifier': 'DOC/2023/000001', 'start_date': '2023-01-01', 'end_date': '2024-01-01',
+    'car_registration_number': 'DPL96RR', 'img_url': 'https://bucket.s3.amazonaws.com/documents/1.png', 'active': True
+}
+DRIVER = {
+    'id': 1, 'first_name': 'Jan', 'last_name': 'Kowalski', 'phone_number': '+48123456789',
+    'email': 'jan.kowalski@example.com', 'car_registration': 'DPL96RR'
+}
+
+
+def fleet_entry(number: int) -> dict:
+    registration = f'DPL{number:05}'
+    return {
+        'registration': registration,
+        'car': {**CAR, 'id': number, 'registration': registration},
+        'mots': [{**DOCUMENT, 'id': number, 'car_registration_number': registration}],
+        'insurances': [{**DOCUMENT, 'id': number, 'car_registration_number': registration}],
+        'repairs': [],
+        'drivers': [{**DRIVER, 'id': number, 'car_registration': registration}],
+    }
+
+
+def measure(provider: DefaultJSONProvider, payload: dict, repeats: int) -> float:
+    """
+    :return: Best encoding time in milliseconds.
+    """
+    durations = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        provider.response(payload).get_data()
+        durations.append(time.perf_counter() - start)
+    return min(durations) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--repeats', type=int, default=20)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    payload = {
+        'fleet': [fleet_entry(number) for number in range(args.rows)],
+        'unmatched': {'repairs': []},
+        'upstreams': {name: {'status': 'ok', 'status_code': 200, 'latency_ms': 12.5}
+                      for name in ('cars', 'mots', 'insurances', 'repairs', 'drivers')},
+        'partial': False,
+    }
+
+    with app.app_context():
+        results = {
+            'DefaultJSONProvider': measure(DefaultJSONProvider(app), payload, args.repeats),
+            JSON_PROVIDER_CLASS.__name__: measure(JSON_PROVIDER_CLASS(app), payload, args.repeats),
+        }
+
+    print(f'rows: {args.rows:,}', file=sys.stdout)
+    for name, duration in results.items():
+        print(f'{name:<20} {duration:8.2f} ms/response', file=sys.stdout)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+"""
+Login throughput of a real gunicorn worker for different password hashing costs and worker setups.
+
+PasswordHasher computes hashes in its thread pool, but the thread that handles the request waits for the result.
+With sync worker (--threads 1) the only request thread of the process is blocked for the whole hash, so login
+burst stops every other request. With gthread worker (--threads N) other threads keep serving requests while
+hashes are computed. For every setup a single worker process is started, concurrent clients log in over HTTP and
+one more client polls cheap endpoint, to show how much login burst delays other requests. Users are stored in
+temporary sqlite. Run from api-gateway directory:
+
+    python -m benchmarks.bench_login --clients 8 --duration 5 --threads 1 8
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+os.environ.setdefault('JWT_AUTHMAXAGE', '15')
+os.environ.setdefault('JWT_REFRESHMAXAGE', '60')
+os.environ.setdefault('JWT_AUTHTYPE', 'HS256')
+os.environ.setdefault('JWT_SECRET', 'benchmark-secret-of-reasonable-length')
+
+import httpx
+from flask import Flask
+from werkzeug.security import generate_password_hash
+
+from app.db.configuration import sa
+from app.db.model import UserModel
+from app.security.configuration import configure_security
+
+METHODS = ['scrypt:32768:8:1', 'scrypt:16384:8:1', 'pbkdf2:sha256:600000']
+
+
+def create_app() -> Flask:
+    """
+    Application started by gunicorn: /login of the gateway and cheap / endpoint, users from BENCH_LOGIN_DATABASE.
+
+    :return: Flask application.
+    """
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ['BENCH_LOGIN_DATABASE']
+    sa.init_app(app)
+    configure_security(app)
+    app.add_url_rule('/', 'index', lambda: 'Index')
+    return app
+
+
+def prepare_users(database: str, method: str, clients: int) -> None:
+    """
+    :param database: Url of sqlite database.
+    :param method: Method the passwords are hashed with, the same as the one of the worker, so nothing is rehashed.
+    :param clients: Number of users, one per client.
+    :return: None
+    """
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = database
+    sa.init_app(app)
+    with app.app_context():
+        sa.drop_all()
+        sa.create_all()
+        password = generate_password_hash('secret', method)
+        for number in range(clients):
+            sa.session.execute(sa.insert(UserModel).values(
+                username=f'user{number}', password=password, email=f'user{number}@example.com', active=True
+            ))
+        sa.session.commit()
+
+
+def start_worker(port: int, threads: int, env: dict[str, str]) -> subprocess.Popen:
+    # gunicorn is started without shell, so terminate() reaches its master process
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--bind', f'127.0.0.1:{port}', '--workers', '1', '--threads', str(threads),
+         'benchmarks.bench_login:create_app()'],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    for _ in range(100):
+        if process.poll() is not None:
+            break
+        try:
+            httpx.get(f'http://127.0.0.1:{port}/', timeout=0.5)
+            return process
+        except httpx.TransportError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f'Worker with {threads} threads did not start')
+
+
+def run(url: str, clients: int, duration: float) -> dict[str, float]:
+    """
+    :param url: Base url of the worker.
+    :param clients: Number of clients logging in at the same time.
+    :param duration: Seconds of the run.
+    :return: Logins per second, rejected logins and latency of cheap request in milliseconds.
+    """
+    stop = threading.Event()
+    logins = [0] * clients
+    rejected = [0] * clients
+    latencies = []
+
+    def login(number: int) -> None:
+        with httpx.Client(base_url=url, timeout=60) as client:
+            while not stop.is_set():
+                response = client.post('/login', json={'username': f'user{number}', 'password': 'secret'})
+                if response.status_code == 201:
+                    logins[number] += 1
+                else:
+                    rejected[number] += 1
+
+    def poll() -> None:
+        with httpx.Client(base_url=url, timeout=60) as client:
+            while not stop.is_set():
+                start = time.perf_counter()
+                client.get('/')
+                latencies.append((time.perf_counter() - start) * 1000)
+                time.sleep(0.01)
+
+    threads = [threading.Thread(target=login, args=(number,)) for number in range(clients)]
+    threads.append(threading.Thread(target=poll))
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    latencies.sort()
+    return {
+        'logins_per_second': sum(logins) / duration,
+        'rejected': sum(rejected),
+        'p50_ms': statistics.median(latencies),
+        'p99_ms': latencies[int(len(latencies) * 0.99) - 1] if len(latencies) > 1 else latencies[0],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 8],
+                        help='Threads of gunicorn worker, 1 means sync worker')
+    parser.add_argument('--hash-workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--port', type=int, default=18200)
+    args = parser.parse_args()
+
+    directory = tempfile.TemporaryDirectory()
+    database = f'sqlite:///{os.path.join(directory.name, "users.db")}'
+
+    print(f'{"method":<24} {"threads":>7} {"logins/s":>9} {"rejected":>8} {"other p50":>10} {"other p99":>10}',
+          file=sys.stdout)
+    for method in METHODS:
+        prepare_users(database, method, args.clients)
+        for threads in sorted(set(args.threads)):
+            env = {
+                **os.environ,
+                'BENCH_LOGIN_DATABASE': database,
+                'PASSWORD_HASH_METHOD': method,
+                'PASSWORD_HASH_WORKERS': str(args.hash_workers),
+                'PASSWORD_HASH_MAX_PENDING': str(args.clients * 2),
+            }
+            worker = start_worker(args.port, threads, env)
+            try:
+                result = run(f'http://127.0.0.1:{args.port}', args.clients, args.duration)
+            finally:
+                worker.terminate()
+                try:
+                    worker.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    worker.kill()
+            print(f'{method:<24} {threads:>7} {result["logins_per_second"]:>9.1f} {result["rejected"]:>8} '
+                  f'{result["p50_ms"]:>7.1f} ms {result["p99_ms"]:>7.1f} ms', file=sys.stdout)
+
+    directory.cleanup()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""
+Load benchmark comparing synchronous (Flask + gunicorn sync worker) and async (ASGI + uvicorn worker) gateway modes.
+
+Both modes are started as real gunicorn processes with a single worker, proxying GET /cars/all to a fake cars
+upstream that answers after configurable latency. Run from api-gateway directory:
+
+    python -m benchmarks.bench_sync_vs_async --requests 500 --concurrency 100 --latency 0.2
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+import httpx
+import uvicorn
+
+SYNC_COMMAND = ['--workers', '1', 'app.create_app:main()']
+ASYNC_COMMAND = ['--workers', '1', '-k', 'uvicorn_worker.UvicornWorker', 'app.create_asgi_app:main()']
+
+
+def start_fake_upstream(port: int, latency: float) -> None:
+    """
+    Starts ASGI server imitating cars service in daemon thread.
+
+    :param port: Port of the fake upstream.
+    :param latency: Seconds the upstream waits before answering.
+    :return: None
+    """
+    body = json.dumps({'all_cars': [{'id': i, 'registration': f'WA{i:05}'} for i in range(50)]}).encode()
+
+    async def fake_cars_service(scope, receive, send):
+        if scope['type'] != 'http':
+            return
+        await asyncio.sleep(latency)
+        await send({'type': 'http.response.start', 'status': 200,
+                    'headers': [(b'content-type', b'application/json')]})
+        await send({'type': 'http.response.body', 'body': body})
+
+    config = uvicorn.Config(fake_cars_service, host='127.0.0.1', port=port, log_level='warning')
+    threading.Thread(target=uvicorn.Server(config).run, daemon=True).start()
+
+
+def start_gateway(command: list[str], port: int, upstream_port: int) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        'CARS_SERVICE_URL': f'http://127.0.0.1:{upstream_port}',
+        'JWT_AUTHMAXAGE': os.environ.get('JWT_AUTHMAXAGE', '15'),
+        'JWT_REFRESHMAXAGE': os.environ.get('JWT_REFRESHMAXAGE', '60'),
+    }
+    # gunicorn is started without shell, so terminate() reaches its master process
+    process = subprocess.Popen([sys.executable, '-m', 'gunicorn', '--bind', f'127.0.0.1:{port}', *command], env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    for _ in range(100):
+        if process.poll() is not None:
+            break
+        try:
+            httpx.get(f'http://127.0.0.1:{port}/', timeout=0.5)
+            return process
+        except httpx.TransportError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f'Gateway "{" ".join(command)}" did not start')
+
+
+async def run_load(url: str, requests: int, concurrency: int) -> dict[str, float]:
+    """
+    :param url: Gateway endpoint to call.
+    :param requests: Total number of requests.
+    :param concurrency: Number of requests in flight at the same time.
+    :return: Throughput and latency percentiles of the run.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def one(client: httpx.AsyncClient) -> None:
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await client.get(url)
+                if response.status_code != 200:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=120) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*[one(client) for _ in range(requests)])
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests_per_second': round(requests / elapsed, 1),
+        'p50_ms': round(statistics.median(latencies) * 1000, 1),
+        'p99_ms': round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 1),
+        'errors': errors,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=100)
+    parser.add_argument('--latency', type=float, default=0.2, help='Latency of fake upstream in seconds')
+    parser.add_argument('--upstream-port', type=int, default=18100)
+    parser.add_argument('--gateway-port', type=int, default=18000)
+    args = parser.parse_args()
+
+    start_fake_upstream(args.upstream_port, args.latency)
+
+    for port, (mode, command) in enumerate((('sync', SYNC_COMMAND), ('async', ASYNC_COMMAND)), args.gateway_port):
+        gateway = start_gateway(command, port, args.upstream_port)
+        try:
+            url = f'http://127.0.0.1:{port}/cars/all'
+            result = asyncio.run(run_load(url, args.requests, args.concurrency))
+            print(f'{mode:>5}: {result}', file=sys.stdout)
+        finally:
+            gateway.terminate()
+            try:
+                gateway.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                gateway.kill()
+
+
+if __name__ == '__main__':
+    main()
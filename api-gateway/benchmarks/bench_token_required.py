@@ -0,0 +1,74 @@
+"""
+Micro-benchmark of per-request overhead of token_required decorator with and without verified-token cache.
+
+Decorated view is called repeatedly inside one request context carrying the same access token, which is what
+polling dashboard does. Run from api-gateway directory:
+
+    python -m benchmarks.bench_token_required --calls 20000
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault('JWT_AUTHMAXAGE', '15')
+os.environ.setdefault('JWT_REFRESHMAXAGE', '60')
+os.environ.setdefault('JWT_AUTHTYPE', 'HS256')
+os.environ.setdefault('JWT_PREFIX', 'Bearer')
+os.environ.setdefault('JWT_SECRET', 'benchmark-secret-of-reasonable-length')
+
+import jwt
+from flask import Flask
+
+from app.env_variables import JWT_SECRET, JWT_AUTHTYPE, JWT_PREFIX
+from app.security.configuration import token_required
+from app.security.token_cache import token_cache
+
+
+def view() -> str:
+    return 'ok'
+
+
+def measure(function, calls: int) -> float:
+    """
+    :return: Average duration of one call in microseconds.
+    """
+    start = time.perf_counter()
+    for _ in range(calls):
+        function()
+    return (time.perf_counter() - start) / calls * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=20000)
+    args = parser.parse_args()
+
+    access_token = jwt.encode(
+        {'iat': datetime.utcnow(), 'exp': int((datetime.utcnow() + timedelta(minutes=15)).timestamp()),
+         'sub': '1', 'role': 'ADMIN'},
+        JWT_SECRET,
+        algorithm=JWT_AUTHTYPE
+    )
+    decorated = token_required(roles=['ADMIN', 'USER'])(view)
+
+    app = Flask(__name__)
+    with app.test_request_context(headers={'Authorization': f'{JWT_PREFIX} {access_token}'}):
+        assert decorated() == 'ok'
+        baseline = measure(view, args.calls)
+
+        token_cache.enabled = False
+        uncached = measure(decorated, args.calls) - baseline
+
+        token_cache.enabled = True
+        token_cache.clear()
+        cached = measure(decorated, args.calls) - baseline
+
+    print(f'auth overhead without cache: {uncached:8.2f} us/request', file=sys.stdout)
+    print(f'auth overhead with cache:    {cached:8.2f} us/request', file=sys.stdout)
+    print(f'speedup:                     {uncached / cached:8.1f}x', file=sys.stdout)
+
+
+if __name__ == '__main__':
+    main()
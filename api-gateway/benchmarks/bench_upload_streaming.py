@@ -0,0 +1,140 @@
+"""
+Throughput and memory benchmark of streaming file upload (POST /mots/) in the synchronous gateway.
+
+Multipart body is generated lazily, passed to the gateway through Flask test client and forwarded to fake
+aws-resources and mots upstreams, which only count received bytes. Peak memory allocated while handling
+request is measured with tracemalloc. Run from api-gateway directory:
+
+    python -m benchmarks.bench_upload_streaming --sizes 1 10 100
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+import httpx
+import uvicorn
+
+BOUNDARY = 'flota-benchmark-boundary'
+CHUNK = b'x' * (1024 * 1024)
+
+
+class MultipartBody(io.RawIOBase):
+    """
+    Readable stream generating multipart/form-data body with form fields and file of given size on the fly.
+    """
+    def __init__(self, file_size: int):
+        head = (
+            f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="car_id"\r\n\r\n1\r\n'
+            f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="start_date"\r\n\r\n2024-01-01\r\n'
+            f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="file"; filename="scan.pdf"\r\n'
+            f'Content-Type: application/pdf\r\n\r\n'
+        ).encode()
+        tail = f'\r\n--{BOUNDARY}--\r\n'.encode()
+        self._parts = [head, file_size, tail]
+        self.length = len(head) + file_size + len(tail)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while self._parts:
+            part = self._parts[0]
+            if isinstance(part, int):
+                size = min(part, len(buffer), len(CHUNK))
+                buffer[:size] = CHUNK[:size]
+                self._parts[0] = part - size
+            else:
+                size = min(len(part), len(buffer))
+                buffer[:size] = part[:size]
+                self._parts[0] = part[size:]
+            if not self._parts[0]:
+                self._parts.pop(0)
+            if size:
+                return size
+        return 0
+
+
+def start_fake_upstream(port: int, received: dict[str, int]) -> None:
+    """
+    Starts ASGI server imitating aws-resources and mots services in daemon thread.
+
+    :param port: Port of the fake upstream.
+    :param received: Dictionary updated with number of bytes received by every path.
+    :return: None
+    """
+    async def fake_service(scope, receive, send):
+        if scope['type'] != 'http':
+            return
+        size, more_body = 0, True
+        while more_body:
+            message = await receive()
+            size += len(message.get('body', b''))
+            more_body = message.get('more_body', False)
+        received[scope['path']] = size
+        body = json.dumps({'url': 'https://bucket/scan.pdf'}).encode()
+        await send({'type': 'http.response.start', 'status': 201,
+                    'headers': [(b'content-type', b'application/json')]})
+        await send({'type': 'http.response.body', 'body': body})
+
+    config = uvicorn.Config(fake_service, host='127.0.0.1', port=port, log_level='warning')
+    threading.Thread(target=uvicorn.Server(config).run, daemon=True).start()
+    for _ in range(50):
+        try:
+            httpx.get(f'http://127.0.0.1:{port}/')
+            return
+        except httpx.TransportError:
+            time.sleep(0.1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 10, 100], help='file sizes in MB')
+    parser.add_argument('--upstream-port', type=int, default=18100)
+    args = parser.parse_args()
+
+    upstream_url = f'http://127.0.0.1:{args.upstream_port}'
+    os.environ.setdefault('AWS_RESOURCES_SERVICE_URL', upstream_url)
+    os.environ.setdefault('MOTS_SERVICE_URL', upstream_url)
+    os.environ.setdefault('JWT_AUTHMAXAGE', '15')
+    os.environ.setdefault('JWT_REFRESHMAXAGE', '60')
+
+    from app.create_app import main as create_app
+
+    received = {}
+    start_fake_upstream(args.upstream_port, received)
+    client = create_app().test_client()
+
+    for size_mb in args.sizes:
+        body = MultipartBody(size_mb * 1024 * 1024)
+        tracemalloc.start()
+        start = time.perf_counter()
+        res = client.post(
+            '/mots/',
+            # Body is not seekable, so it is passed directly as wsgi input instead of input_stream
+            environ_overrides={
+                'wsgi.input': body,
+                'CONTENT_LENGTH': str(body.length),
+                'CONTENT_TYPE': f'multipart/form-data; boundary={BOUNDARY}'
+            }
+        )
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        result = {
+            'status': res.status_code,
+            'forwarded_mb': round(received.get('/file', 0) / 1024 / 1024, 1),
+            'seconds': round(elapsed, 3),
+            'mb_per_second': round(size_mb / elapsed, 1),
+            'peak_memory_kb': round(peak / 1024),
+        }
+        print(f'{size_mb:>4} MB: {result}', file=sys.stdout)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Sign-up lookups over a large users table with and without unique indexes on username and email.
+
+Table is filled with generated users, then the old duplicate check (find_by_username + find_by_email) and
+the single-query find_taken_fields are timed. Finally indexes are dropped to show the full-table scans the check
+used to do. Uses sqlite file by default, pass --uri to run against MySQL. Run from api-gateway directory:
+
+    python -m benchmarks.bench_user_lookup --users 1000000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from flask import Flask
+from sqlalchemy import insert
+
+from app.db.configuration import sa
+from app.db.model import UserModel
+
+BATCH = 10_000
+
+
+def measure(function, lookups: int, users: int) -> float:
+    """
+    :return: Average duration of one check in microseconds.
+    """
+    start = time.perf_counter()
+    for number in range(lookups):
+        # Spread lookups over whole table, every second one is for user that doesn't exist
+        user = number * (users // lookups) if number % 2 else users + number
+        function(f'user{user}', f'user{user}@example.com')
+    return (time.perf_counter() - start) / lookups * 1_000_000
+
+
+def read_then_write_check(username: str, email: str) -> bool:
+    return bool(UserModel.find_by_username(username) or UserModel.find_by_email(email))
+
+
+def single_query_check(username: str, email: str) -> bool:
+    return bool(UserModel.find_taken_fields(username, email))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=1_000_000)
+    parser.add_argument('--lookups', type=int, default=2000)
+    parser.add_argument('--uri', default=None, help='database uri, temporary sqlite file by default')
+    args = parser.parse_args()
+
+    directory = tempfile.TemporaryDirectory()
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = args.uri or f'sqlite:///{os.path.join(directory.name, "users.db")}'
+    sa.init_app(app)
+
+    with app.app_context():
+        sa.drop_all()
+        UserModel.__table__.create(sa.engine)
+
+        # Password hashing is skipped, it isn't part of the lookup
+        for start in range(0, args.users, BATCH):
+            sa.session.execute(insert(UserModel), [
+                {'username': f'user{number}', 'password': 'hash', 'email': f'user{number}@example.com',
+                 'role': 'USER', 'active': True}
+                for number in range(start, min(start + BATCH, args.users))
+            ])
+        sa.session.commit()
+
+        indexed_two_queries = measure(read_then_write_check, args.lookups, args.users)
+        indexed_single_query = measure(single_query_check, args.lookups, args.users)
+
+        for index in UserModel.__table__.indexes:
+            index.drop(sa.engine)
+        # Full scans are slow, fewer lookups are enough
+        scan_lookups = max(args.lookups // 100, 2)
+        scanned_two_queries = measure(read_then_write_check, scan_lookups, args.users)
+
+        sa.drop_all()
+    directory.cleanup()
+
+    print(f'users: {args.users:,}', file=sys.stdout)
+    print(f'no indexes, two queries:     {scanned_two_queries:12.1f} us/sign-up check', file=sys.stdout)
+    print(f'unique indexes, two queries: {indexed_two_queries:12.1f} us/sign-up check', file=sys.stdout)
+    print(f'unique indexes, one query:   {indexed_single_query:12.1f} us/sign-up check', file=sys.stdout)
+
+
+if __name__ == '__main__':
+    main()
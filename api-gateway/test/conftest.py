@@ -0,0 +1,90 @@
+import socket
+
+import pytest
+from aiosmtpd.controller import Controller
+from aiosmtpd.handlers import Message as MessageHandler
+from flask import Flask
+from flask.testing import FlaskClient
+from flask_mail import Mail
+from flask_restful import Api
+
+from app.env_variables import TEST_SQLALCHEMY_DATABASE_URI
+from app.db.configuration import sa
+from app.email.outbox import MailOutbox
+from app.json.configuration import configure_json
+from app.route.user import UserResource
+from app.security.configuration import configure_security
+
+
+class CollectingHandler(MessageHandler):
+    """
+    aiosmtpd handler that keeps received messages in memory.
+    """
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def handle_message(self, message):
+        self.messages.append(message)
+
+
+@pytest.fixture()
+def smtp_server():
+    """
+    Local SMTP server standing in for Gmail.
+
+    :return: Started aiosmtpd controller, received messages are in controller.handler.messages
+    """
+    with socket.socket() as free:
+        free.bind(('127.0.0.1', 0))
+        port = free.getsockname()[1]
+    controller = Controller(CollectingHandler(), hostname='127.0.0.1', port=port)
+    controller.start()
+    yield controller
+    controller.stop()
+
+
+@pytest.fixture()
+def app(smtp_server):
+    """
+    Flask application with test database and mail pointed at local SMTP server. Outbox workers aren't started,
+    so tests drain the outbox with MailOutbox.process_batch().
+
+    :return: Flask application object
+    """
+    app = Flask(__name__)
+
+    with app.app_context():
+        app.config.update({
+            'TESTING': True,
+            'SQLALCHEMY_DATABASE_URI': TEST_SQLALCHEMY_DATABASE_URI,
+            'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+            'MAIL_SERVER': smtp_server.hostname,
+            'MAIL_PORT': smtp_server.port,
+            'MAIL_USE_TLS': False,
+            'MAIL_USE_SSL': False,
+            'MAIL_SUPPRESS_SEND': False,
+            'MAIL_DEFAULT_SENDER': 'ds.messanger@gmail.com'})
+
+        sa.init_app(app)
+
+        sa.drop_all()
+        sa.create_all()
+
+        MailOutbox.init(app, Mail(app), workers=0)
+
+        api = Api(app)
+        api.add_resource(UserResource, '/users')
+        configure_json(app, api)
+        configure_security(app)
+
+        yield app
+
+
+@pytest.fixture()
+def client(app) -> FlaskClient:
+    """
+    :param app: The Flask application instance.
+    :return: A FlaskClient instance.
+    """
+    return app.test_client()
@@ -0,0 +1,99 @@
+import asyncio
+
+import httpx
+import pytest
+from asgiref.wsgi import WsgiToAsgi
+from quart import Quart
+
+from app.async_route.car import cars_blueprint
+from app.cache.configuration import response_cache
+from app.create_asgi_app import GatewayDispatcher
+from app.db.model import UserModel
+from app.upstream.configuration import AsyncUpstreamClients
+
+
+@pytest.fixture()
+def cars_upstream(monkeypatch):
+    """
+    Makes async cars client answer from memory. The client is bound to event loop of the test when it is first used.
+
+    :return: Paths requested from cars service.
+    """
+    upstream_paths = []
+
+    def cars(request: httpx.Request) -> httpx.Response:
+        upstream_paths.append(request.url.path)
+        return httpx.Response(200, json={'all_cars': [], 'next_cursor': None}, headers={'ETag': '"1"'})
+
+    def get(name: str) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if AsyncUpstreamClients._loop is not loop:
+            AsyncUpstreamClients._loop = loop
+            AsyncUpstreamClients._clients = {
+                'cars': httpx.AsyncClient(base_url='http://cars', transport=httpx.MockTransport(cars))
+            }
+        return AsyncUpstreamClients._clients[name]
+
+    monkeypatch.setattr(AsyncUpstreamClients, '_loop', None)
+    monkeypatch.setattr(AsyncUpstreamClients, '_clients', {})
+    monkeypatch.setattr(AsyncUpstreamClients, 'get', get)
+    response_cache.invalidate('cars:')
+    yield upstream_paths
+    response_cache.invalidate('cars:')
+
+
+@pytest.fixture()
+def async_app() -> Quart:
+    """
+    :return: Quart application with async cars routes.
+    """
+    async_app = Quart(__name__)
+    async_app.register_blueprint(cars_blueprint)
+    return async_app
+
+
+def test_async_route_with_quart_test_client(async_app, cars_upstream):
+    """
+    Test that async route proxies request with pooled AsyncClient and keeps ETag of the upstream response.
+
+    :return: None
+    """
+    async def get_cars():
+        response = await async_app.test_client().get('/cars/all')
+        await AsyncUpstreamClients.close_all()
+        return response, await response.get_json()
+
+    response, cars = asyncio.run(get_cars())
+
+    assert response.status_code == 200
+    assert cars == {'all_cars': [], 'next_cursor': None}
+    assert response.headers['ETag'] == '"1"'
+    assert cars_upstream == ['/cars/all']
+
+
+def test_dispatcher_forwards_other_paths_to_wsgi_app(app, async_app, cars_upstream):
+    """
+    Test that GatewayDispatcher serves /cars with async app and forwards /users to Flask application wrapped
+    with WsgiToAsgi.
+
+    :param app: Flask application of the gateway with /users resource.
+    :return: None
+    """
+    dispatcher = GatewayDispatcher(async_app, WsgiToAsgi(app))
+
+    async def send_requests():
+        transport = httpx.ASGITransport(app=dispatcher)
+        async with httpx.AsyncClient(transport=transport, base_url='http://gateway') as client:
+            cars_response = await client.get('/cars/all')
+            users_response = await client.post('/users', json={
+                'username': 'john', 'password': 'secret', 'email': 'john@example.com'
+            })
+        await AsyncUpstreamClients.close_all()
+        return cars_response, users_response
+
+    cars_response, users_response = asyncio.run(send_requests())
+
+    assert cars_response.status_code == 200
+    assert cars_upstream == ['/cars/all']
+    assert users_response.status_code == 201
+    assert UserModel.find_by_username('john').email == 'john@example.com'
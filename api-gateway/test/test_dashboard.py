@@ -0,0 +1,95 @@
+import json
+
+import app.dashboard.configuration as dashboard
+from app.cache.configuration import CachedResponse
+from app.dashboard.configuration import UpstreamResult, compose_dashboard, dashboard_status_code
+
+
+def ok(name: str, items: list[dict]) -> UpstreamResult:
+    return UpstreamResult(name, items, 'ok', 200, 1.0)
+
+
+def unavailable(name: str) -> UpstreamResult:
+    return UpstreamResult(name, None, 'unavailable', None, 1.0)
+
+
+def test_compose_dashboard_joins_by_registration():
+    """
+    Test that records of every upstream are attached to car with matching registration.
+
+    :return: None
+    """
+    results = [
+        ok('cars', [{'id': 1, 'registration': 'WA12345'}]),
+        ok('mots', [{'id': 3, 'car_registration_number': 'WA12345'}]),
+        ok('insurances', [{'id': 4, 'car_registration_number': 'WA12345'}]),
+        ok('repairs', [{'id': 5, 'car_id': 1}]),
+        ok('drivers', [{'id': 6, 'car_registration': 'WA12345'}]),
+    ]
+    dashboard = compose_dashboard(results)
+
+    assert dashboard['fleet'] == [{
+        'registration': 'WA12345',
+        'car': {'id': 1, 'registration': 'WA12345'},
+        'mots': [{'id': 3, 'car_registration_number': 'WA12345'}],
+        'insurances': [{'id': 4, 'car_registration_number': 'WA12345'}],
+        'repairs': [{'id': 5, 'car_id': 1}],
+        'drivers': [{'id': 6, 'car_registration': 'WA12345'}],
+    }]
+    assert dashboard['unmatched'] == {'repairs': []}
+    assert dashboard['partial'] is False
+    assert dashboard_status_code(results) == 200
+
+
+def test_compose_dashboard_with_unavailable_cars_upstream():
+    """
+    Test that dashboard degrades to records grouped by registration when cars upstream is unavailable.
+
+    :return: None
+    """
+    results = [
+        unavailable('cars'),
+        ok('mots', [{'id': 3, 'car_registration_number': 'WA12345'}]),
+        ok('repairs', [{'id': 5, 'car_id': 1}]),
+    ]
+    dashboard = compose_dashboard(results)
+
+    assert dashboard['fleet'][0]['car'] is None
+    assert dashboard['fleet'][0]['mots'] == [{'id': 3, 'car_registration_number': 'WA12345'}]
+    assert dashboard['unmatched'] == {'repairs': [{'id': 5, 'car_id': 1}]}
+    assert dashboard['upstreams']['cars'] == {'status': 'unavailable', 'status_code': None, 'latency_ms': 1.0}
+    assert dashboard['partial'] is True
+    assert dashboard_status_code(results) == 200
+
+
+def test_dashboard_status_code_when_all_upstreams_unavailable():
+    """
+    Test that dashboard reports bad gateway when no upstream answered.
+
+    :return: None
+    """
+    assert dashboard_status_code([unavailable('cars'), unavailable('mots')]) == 502
+
+
+def test_fetch_follows_next_cursor_of_paginated_upstream(monkeypatch):
+    """
+    Test that dashboard reads all pages of paginated cars collection.
+
+    :return: None
+    """
+    pages = {
+        '/cars/all?limit=1000': {'all_cars': [{'id': 1}], 'next_cursor': 1},
+        '/cars/all?limit=1000&cursor=1': {'all_cars': [{'id': 2}], 'next_cursor': None},
+    }
+    requested = []
+
+    def cached_get(name, path, ttl, **kwargs):
+        requested.append(path)
+        return CachedResponse(json.dumps(pages[path]).encode(), 200)
+
+    monkeypatch.setattr(dashboard, 'cached_get', cached_get)
+    result = dashboard._fetch('cars')
+
+    assert result.status == 'ok'
+    assert result.items == [{'id': 1}, {'id': 2}]
+    assert requested == list(pages)
@@ -0,0 +1,143 @@
+import json
+import os
+
+import httpx
+import pytest
+from flask import Flask
+
+from app.route.mot import mots_blueprint
+from app.upstream.configuration import UpstreamClients
+from app.upstream.forms import typed_form, LIABILITY_FORM_TYPES
+
+"""
+Fields of MOT form the way frontend sends them
+"""
+MOT_FORM = {
+    'legal_identifier': 'XXX/XXX/XXX/XXXX/XXXX',
+    'start_date': '2022-01-01',
+    'end_date': '2023-01-01',
+    'car_registration_number': 'DPL96RR',
+    'active': 'true',
+}
+
+
+def multipart_body(form: dict[str, str], file_content: bytes, boundary: str = 'gateway-boundary') -> bytes:
+    parts = [
+        f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+        for name, value in form.items()
+    ]
+    parts.append(
+        f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="mot.pdf"\r\n'
+        f'Content-Type: application/pdf\r\n\r\n'.encode() + file_content + b'\r\n'
+    )
+    return b''.join(parts) + f'--{boundary}--\r\n'.encode()
+
+
+@pytest.fixture()
+def aws_requests():
+    """
+    :return: Methods and paths of requests aws-resources service received completely.
+    """
+    return []
+
+
+@pytest.fixture()
+def forwarded(monkeypatch, aws_requests):
+    """
+    Replaces pooled clients of aws-resources and mots with clients answering from memory. Mots service rejects
+    MOT with legal identifier DUPLICATE, like it rejects duplicated entries.
+
+    :return: Bodies of requests sent to mots service.
+    """
+    forwarded = []
+
+    def aws_resources(request: httpx.Request) -> httpx.Response:
+        # Upload aborted by gateway ends with error here, before the request is recorded
+        request.read()
+        aws_requests.append((request.method, request.url.path))
+        return httpx.Response(201, json={'url': 'https://bucket.s3.amazonaws.com/mot.pdf'})
+
+    def mots(request: httpx.Request) -> httpx.Response:
+        forwarded.append(json.loads(request.content))
+        if forwarded[-1]['legal_identifier'] == 'DUPLICATE':
+            return httpx.Response(403, json={'message': "Duplicate entry 'DUPLICATE'"})
+        return httpx.Response(201, json={**forwarded[-1], 'id': 1})
+
+    monkeypatch.setattr(UpstreamClients, '_pid', os.getpid())
+    monkeypatch.setattr(UpstreamClients, '_clients', {
+        'aws-resources': httpx.Client(base_url='http://aws-resources', transport=httpx.MockTransport(aws_resources)),
+        'mots': httpx.Client(base_url='http://mots', transport=httpx.MockTransport(mots)),
+    })
+    return forwarded
+
+
+@pytest.fixture()
+def gateway_client():
+    app = Flask(__name__)
+    app.register_blueprint(mots_blueprint)
+    return app.test_client()
+
+
+def test_typed_form_converts_liability_fields():
+    """
+    Test that booleans and dates of the form are converted and other fields stay strings.
+
+    :return: None
+    """
+    assert typed_form({**MOT_FORM, 'active': 'False', 'end_date': ' 2023-01-01'}, LIABILITY_FORM_TYPES) == {
+        **MOT_FORM, 'active': False
+    }
+    assert typed_form({'active': 'on'}, LIABILITY_FORM_TYPES) == {'active': True}
+    for form in ({'active': 'maybe'}, {'end_date': '01.01.2023'}):
+        with pytest.raises(ValueError):
+            typed_form(form, LIABILITY_FORM_TYPES)
+
+
+def test_create_mot_forwards_json_types(gateway_client, forwarded):
+    """
+    Test that MOT created from multipart form is forwarded to mots service with JSON types its schema expects.
+
+    :param gateway_client: Client of gateway with mots routes.
+    :param forwarded: Bodies of requests sent to mots service.
+    :return: None
+    """
+    response = gateway_client.post('/mots/', data=multipart_body(MOT_FORM, b'%PDF-1.4'),
+                                   content_type='multipart/form-data; boundary=gateway-boundary')
+    assert response.status_code == 201
+    assert forwarded == [{**MOT_FORM, 'active': True, 'img_url': 'https://bucket.s3.amazonaws.com/mot.pdf'}]
+
+
+def test_create_mot_with_invalid_form_value(gateway_client, forwarded, aws_requests):
+    """
+    Test that form with value that isn't of the field's type is rejected by gateway before the upload of the file
+    completes, so no file is stored for it.
+
+    :param gateway_client: Client of gateway with mots routes.
+    :param forwarded: Bodies of requests sent to mots service.
+    :param aws_requests: Requests aws-resources service received completely.
+    :return: None
+    """
+    response = gateway_client.post('/mots/', data=multipart_body({**MOT_FORM, 'active': 'maybe'}, b'%PDF-1.4'),
+                                   content_type='multipart/form-data; boundary=gateway-boundary')
+    assert response.status_code == 400
+    assert response.json == {'message': 'Invalid request'}
+    assert forwarded == []
+    assert aws_requests == []
+
+
+def test_create_mot_rejected_by_mots_deletes_uploaded_file(gateway_client, forwarded, aws_requests):
+    """
+    Test that file uploaded for MOT which mots service rejected is deleted, and that the rejection reaches
+    the client.
+
+    :param gateway_client: Client of gateway with mots routes.
+    :param forwarded: Bodies of requests sent to mots service.
+    :param aws_requests: Requests aws-resources service received completely.
+    :return: None
+    """
+    response = gateway_client.post('/mots/', data=multipart_body({**MOT_FORM, 'legal_identifier': 'DUPLICATE'},
+                                                                 b'%PDF-1.4'),
+                                   content_type='multipart/form-data; boundary=gateway-boundary')
+    assert response.status_code == 403
+    assert len(forwarded) == 1
+    assert aws_requests == [('POST', '/file'), ('DELETE', '/file')]
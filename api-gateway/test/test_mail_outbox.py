@@ -0,0 +1,113 @@
+import socket
+import time
+from datetime import datetime, timedelta
+
+from flask_mail import Mail
+
+from app.db.configuration import sa
+from app.db.model import MailOutboxModel
+from app.email.outbox import MailOutbox
+from app.env_variables import MAIL_OUTBOX_MAX_ATTEMPTS, MAIL_OUTBOX_SENT_RETENTION
+
+
+def test_enqueue_only_stores_mail(app, smtp_server):
+    """
+    Test that enqueueing doesn't talk to SMTP server, mail waits in the outbox.
+
+    :return: None
+    """
+    start = time.perf_counter()
+    MailOutbox.enqueue('user@example.com', 'Activate your account', '<p>Activate</p>')
+
+    assert time.perf_counter() - start < 0.5
+    assert smtp_server.handler.messages == []
+    assert MailOutboxModel.query.one().status == 'pending'
+
+
+def test_process_batch_sends_mails_over_one_connection(app, smtp_server):
+    """
+    Test that worker delivers all pending mails and keeps the SMTP connection for reuse.
+
+    :return: None
+    """
+    for number in range(3):
+        MailOutbox.enqueue(f'user{number}@example.com', 'Activate your account', '<p>Activate</p>')
+
+    processed, connection = MailOutbox.process_batch()
+    MailOutbox.close_connection(connection)
+
+    assert processed == 3
+    assert connection is not None
+    assert sorted(message['To'] for message in smtp_server.handler.messages) == [
+        'user0@example.com', 'user1@example.com', 'user2@example.com']
+    assert all(mail.status == 'sent' for mail in MailOutboxModel.query.all())
+    assert MailOutbox.process_batch() == (0, None)
+
+
+def test_failed_mail_is_retried_with_backoff(app, smtp_server):
+    """
+    Test that mail which couldn't be sent goes back to the outbox with delayed next attempt, and is marked
+    as failed when attempts run out.
+
+    :return: None
+    """
+    mail = MailOutbox.enqueue('user@example.com', 'Activate your account', '<p>Activate</p>')
+    # Port without SMTP server behind it
+    with socket.socket() as closed:
+        closed.bind(('127.0.0.1', 0))
+        app.config['MAIL_PORT'] = closed.getsockname()[1]
+    MailOutbox.mail = Mail(app)
+
+    processed, connection = MailOutbox.process_batch()
+
+    assert processed == 1
+    assert connection is None
+    sa.session.refresh(mail)
+    assert mail.status == 'pending'
+    assert mail.attempts == 1
+    assert mail.last_error
+    assert mail.next_attempt_at > datetime.utcnow()
+    assert MailOutbox.process_batch() == (0, None)
+
+    assert MailOutbox.retry_delay(1) < MailOutbox.retry_delay(3)
+    assert MailOutbox.retry_delay(10_000) is None
+
+
+def test_mail_with_expired_lease_uses_attempts(app, smtp_server):
+    """
+    Test that mail whose worker died while sending is claimed again as a new attempt and is marked as failed,
+    not claimed forever, when its lease expires in the last attempt.
+
+    :return: None
+    """
+    mail = MailOutbox.enqueue('user@example.com', 'Activate your account', '<p>Activate</p>')
+    for attempt in range(1, MAIL_OUTBOX_MAX_ATTEMPTS + 1):
+        assert MailOutboxModel.claim_batch(10, 300, MAIL_OUTBOX_MAX_ATTEMPTS) == [mail]
+        assert (mail.status, mail.attempts) == ('sending', attempt)
+        # Worker was killed, lease of the mail expires
+        mail.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+        sa.session.commit()
+
+    assert MailOutboxModel.claim_batch(10, 300, MAIL_OUTBOX_MAX_ATTEMPTS) == []
+    sa.session.refresh(mail)
+    assert (mail.status, mail.attempts) == ('failed', MAIL_OUTBOX_MAX_ATTEMPTS)
+    assert mail.last_error
+
+
+def test_purge_sent_deletes_only_mails_sent_before_retention(app, smtp_server):
+    """
+    Test that sent mails older than the retention window are deleted and recent or unsent mails are kept.
+
+    :return: None
+    """
+    for number in range(3):
+        MailOutbox.enqueue(f'user{number}@example.com', 'Activate your account', '<p>Activate</p>')
+    MailOutbox.close_connection(MailOutbox.process_batch()[1])
+    old, recent, pending = MailOutboxModel.query.order_by(MailOutboxModel.id).all()
+    old.sent_at = datetime.utcnow() - timedelta(seconds=MAIL_OUTBOX_SENT_RETENTION + 60)
+    pending.status, pending.sent_at = 'pending', None
+    sa.session.commit()
+
+    assert MailOutbox.purge_sent() == 1
+    assert [mail.recipient for mail in MailOutboxModel.query.order_by(MailOutboxModel.id)] == [
+        'user1@example.com', 'user2@example.com']
@@ -0,0 +1,31 @@
+import pytest
+
+from app.email.template import MailTemplate
+
+
+def test_template_substitutes_escaped_values():
+    """
+    Test that placeholders are replaced by html escaped values and css braces are kept.
+
+    :return: None
+    """
+    template = MailTemplate('test', '<style>a { color: red; }</style><h2>Hello {{ username }}</h2>'
+                                    '<a href="{{link}}">{{ username }}</a>')
+
+    html = template.render(username='<john>', link='http://localhost/users/activate?id=1&timestamp=2')
+
+    assert html == ('<style>a { color: red; }</style><h2>Hello &lt;john&gt;</h2>'
+                    '<a href="http://localhost/users/activate?id=1&amp;timestamp=2">&lt;john&gt;</a>')
+    assert template.fields == {'username', 'link'}
+
+
+def test_template_requires_all_values():
+    """
+    Test that rendering without value of placeholder fails instead of sending mail with empty field.
+
+    :return: None
+    """
+    template = MailTemplate.load('activation.html')
+
+    with pytest.raises(KeyError):
+        template.render(username='john')
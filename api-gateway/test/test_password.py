@@ -0,0 +1,57 @@
+import threading
+
+import pytest
+
+from app.security.password import PasswordHasher, PasswordHasherBusy
+
+
+def test_hash_is_verified_and_rehash_detected():
+    """
+    Test that hash created with configured method verifies and hashes created with other cost need rehash.
+
+    :return: None
+    """
+    hasher = PasswordHasher('pbkdf2:sha256:1000', workers=2, max_pending=4, timeout=5)
+    password_hash = hasher.hash('secret')
+
+    assert password_hash.startswith('pbkdf2:sha256:1000$')
+    assert hasher.verify(password_hash, 'secret')
+    assert not hasher.verify(password_hash, 'wrong')
+    assert not hasher.needs_rehash(password_hash)
+
+    stronger = PasswordHasher('pbkdf2:sha256:2000', workers=1, max_pending=1, timeout=5)
+    assert stronger.needs_rehash(password_hash)
+    assert stronger.verify(password_hash, 'secret')
+
+
+def test_hasher_rejects_work_over_limit():
+    """
+    Test that hashing fails fast with PasswordHasherBusy when all pending slots are taken.
+
+    :return: None
+    """
+    hasher = PasswordHasher('pbkdf2:sha256:1000', workers=1, max_pending=1, timeout=0.1)
+    release = threading.Event()
+    errors = []
+
+    def slow(*_):
+        release.wait(1)
+        return True
+
+    def login():
+        try:
+            hasher._run(slow)
+        except PasswordHasherBusy as e:
+            errors.append(e)
+
+    blocking = threading.Thread(target=login)
+    blocking.start()
+    blocking.join()
+
+    # Caller of slow hash gave up, but its hashing still occupies the only slot
+    assert len(errors) == 1
+    with pytest.raises(PasswordHasherBusy):
+        hasher.hash('secret')
+
+    release.set()
+    assert hasher.verify(hasher.hash('secret'), 'secret')
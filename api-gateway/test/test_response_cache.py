@@ -0,0 +1,187 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+from werkzeug.datastructures import ETags
+
+import app.cache.configuration as cache_configuration
+from app.cache.configuration import CachedResponse, ResponseCache, ENTRY_OVERHEAD
+
+
+def response(body: bytes = b'{}', status_code: int = 200) -> CachedResponse:
+    return CachedResponse(body, status_code)
+
+
+def test_cache_hit_and_ttl_expiry():
+    """
+    Test that response is served from cache until its ttl passes.
+
+    :return: None
+    """
+    cache = ResponseCache(max_bytes=10_000)
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return response()
+
+    cache.get_or_fetch('cars:/cars/all', 0.05, fetch)
+    cache.get_or_fetch('cars:/cars/all', 0.05, fetch)
+    assert len(calls) == 1
+
+    time.sleep(0.06)
+    cache.get_or_fetch('cars:/cars/all', 0.05, fetch)
+    assert len(calls) == 2
+    assert cache.metrics()['hits'] == 1
+    assert cache.metrics()['misses'] == 2
+
+
+def test_cache_does_not_store_error_responses():
+    """
+    Test that only successful responses are cached.
+
+    :return: None
+    """
+    cache = ResponseCache(max_bytes=10_000)
+    cache.get_or_fetch('cars:/car/1', 10, lambda: response(b'{"message": "Car does not exist"}', 404))
+
+    assert cache.metrics()['entries'] == 0
+
+
+def test_cache_evicts_least_recently_used_entries_by_size():
+    """
+    Test that total size of cached bodies stays within max_bytes and least recently used entry goes first.
+
+    :return: None
+    """
+    cache = ResponseCache(max_bytes=2 * (100 + ENTRY_OVERHEAD))
+    for key in ('a', 'b'):
+        cache.get_or_fetch(key, 10, lambda: response(b'x' * 100))
+    cache.get_or_fetch('a', 10, lambda: pytest.fail('a should be cached'))
+    cache.get_or_fetch('c', 10, lambda: response(b'x' * 100))
+
+    metrics = cache.metrics()
+    assert metrics['entries'] == 2
+    assert metrics['evictions'] == 1
+    assert metrics['bytes'] <= metrics['max_bytes']
+    cache.get_or_fetch('a', 10, lambda: pytest.fail('a should be cached'))
+
+
+def test_concurrent_misses_are_coalesced():
+    """
+    Test that concurrent misses of the same key trigger one upstream call.
+
+    :return: None
+    """
+    cache = ResponseCache(max_bytes=10_000)
+    calls = []
+    release = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        release.wait(1)
+        return response(b'[1, 2, 3]')
+
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        futures = [executor.submit(cache.get_or_fetch, 'cars:/cars/all', 10, fetch) for _ in range(10)]
+        time.sleep(0.1)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert len(calls) == 1
+    assert all(result.content == b'[1, 2, 3]' for result in results)
+    assert cache.metrics()['coalesced'] == 9
+
+
+def test_invalidate_drops_entries_and_in_flight_results():
+    """
+    Test that invalidation removes cached entries of upstream and response fetched during invalidation isn't stored.
+
+    :return: None
+    """
+    cache = ResponseCache(max_bytes=10_000)
+    cache.get_or_fetch('cars:/cars/all', 10, response)
+    cache.get_or_fetch('mots:/mots/all', 10, response)
+
+    def fetch_during_write():
+        cache.invalidate('cars:')
+        return response(b'stale')
+
+    cache.get_or_fetch('cars:/car/1', 10, fetch_during_write)
+
+    metrics = cache.metrics()
+    assert metrics['entries'] == 1
+    assert metrics['invalidations'] == 1
+
+
+def test_async_concurrent_misses_are_coalesced():
+    """
+    Test that concurrent async misses of the same key trigger one upstream call.
+
+    :return: None
+    """
+    cache = ResponseCache(max_bytes=10_000)
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return response()
+
+    async def run():
+        return await asyncio.gather(*(cache.async_get_or_fetch('cars:/cars/all', 10, fetch) for _ in range(10)))
+
+    results = asyncio.run(run())
+
+    assert len(calls) == 1
+    assert len(results) == 10
+    assert cache.metrics()['coalesced'] == 9
+
+
+def test_response_with_etag_answers_if_none_match():
+    """
+    Test that ETag of upstream response is passed through and matching If-None-Match gets 304 without body.
+
+    :return: None
+    """
+    cached = CachedResponse(b'{"all_cars": []}', 200, etag='"cars-7"')
+
+    assert cached.as_tuple() == (b'{"all_cars": []}', 200, {'Content-Type': 'application/json', 'ETag': '"cars-7"'})
+    assert cached.as_tuple(ETags(['cars-7'])) == (b'', 304, {'ETag': '"cars-7"'})
+    assert cached.as_tuple(ETags(['cars-6']))[1] == 200
+    assert CachedResponse(b'{}', 404, etag='"cars-7"').as_tuple(ETags(['cars-7']))[1] == 404
+
+
+def test_expired_response_is_revalidated_by_etag(monkeypatch):
+    """
+    Test that expired response with ETag is revalidated with If-None-Match and kept when upstream answers 304.
+
+    :return: None
+    """
+    requests = []
+
+    class Upstream:
+        def get(self, path, headers=None, **kwargs):
+            requests.append(dict(headers or {}))
+            if headers and headers.get('If-None-Match') == '"cars-1"':
+                return httpx.Response(304, headers={'ETag': '"cars-1"'})
+            return httpx.Response(200, content=b'{"all_cars": []}', headers={'ETag': '"cars-1"'})
+
+    cache = ResponseCache(max_bytes=10_000)
+    monkeypatch.setattr(cache_configuration, 'response_cache', cache)
+    monkeypatch.setattr(cache_configuration, 'upstream', lambda name: Upstream())
+
+    first = cache_configuration.cached_get('cars', '/cars/all', 0.05)
+    time.sleep(0.06)
+    second = cache_configuration.cached_get('cars', '/cars/all', 0.05)
+    third = cache_configuration.cached_get('cars', '/cars/all', 0.05)
+
+    assert requests == [{}, {'If-None-Match': '"cars-1"'}]
+    assert second is first and third is first
+    assert second.content == b'{"all_cars": []}'
+
+    cache.invalidate('cars:')
+    assert cache.stale('cars:/cars/all') is None
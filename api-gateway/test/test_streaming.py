@@ -0,0 +1,156 @@
+import asyncio
+import os
+
+import httpx
+import pytest
+from flask import Flask, request
+
+from app.upstream.configuration import UpstreamClients
+from app.upstream.streaming import MultipartPassThrough, upload_to_aws
+
+BOUNDARY = 'gateway-boundary'
+CONTENT_TYPE = f'multipart/form-data; boundary={BOUNDARY}'
+FORM = {'legal_identifier': 'XXX/XXX/XXX/XXXX/XXXX', 'car_registration_number': 'DPL96RR', 'active': 'true'}
+# Bytes of all values, so boundary-like sequences and line breaks inside the file are covered
+FILE_CONTENT = bytes(range(256)) * 64 + b'\r\n--gateway-boundar\r\n'
+
+
+def multipart_body() -> bytes:
+    """
+    :return: Body with one form field before the file part and remaining fields after it.
+    """
+    fields = [
+        f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+        for name, value in FORM.items()
+    ]
+    file = (
+        f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="file"; filename="mot.pdf"\r\n'
+        f'Content-Type: application/pdf\r\n\r\n'.encode() + FILE_CONTENT + b'\r\n'
+    )
+    return fields[0] + file + b''.join(fields[1:]) + f'--{BOUNDARY}--\r\n'.encode()
+
+
+def split(body: bytes, sizes: list[int]) -> list[bytes]:
+    """
+    :param body: Body to split.
+    :param sizes: Sizes of chunks, repeated until the whole body is split.
+    :return: Chunks of the body.
+    """
+    chunks, start, index = [], 0, 0
+    while start < len(body):
+        chunks.append(body[start:start + sizes[index % len(sizes)]])
+        start += sizes[index % len(sizes)]
+        index += 1
+    return chunks
+
+
+@pytest.mark.parametrize('sizes', [[len(multipart_body())], [1], [7, 4096, 13], [1000]])
+def test_pass_through_forwards_body_and_collects_fields(sizes):
+    """
+    Test that every chunk is forwarded unchanged and form fields are collected, whether file part and boundaries
+    are split across chunks or not.
+
+    :param sizes: Sizes of chunks the body arrives in.
+    :return: None
+    """
+    body = multipart_body()
+    chunks = split(body, sizes)
+    # apart from single chunk body, no chunk holds the whole file
+    assert len(chunks) == 1 or not any(FILE_CONTENT in chunk for chunk in chunks)
+    pass_through = MultipartPassThrough(CONTENT_TYPE, len(body))
+
+    forwarded = list(pass_through.iter_body(iter(chunks)))
+
+    assert forwarded == chunks
+    assert pass_through.form == FORM
+    assert pass_through.filename == 'mot.pdf'
+    assert pass_through.complete
+    assert pass_through.headers == {'Content-Type': CONTENT_TYPE, 'Content-Length': str(len(body))}
+
+
+def test_pass_through_collects_fields_at_every_split_position():
+    """
+    Test that fields are the same wherever the body is split in two chunks, including split inside the closing
+    boundary line that follows the last field.
+
+    :return: None
+    """
+    body = (f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="file"; filename="mot.pdf"\r\n\r\n%PDF\r\n'
+            f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="active"\r\n\r\ntrue\r\n'
+            f'--{BOUNDARY}--\r\n').encode()
+    for position in range(1, len(body)):
+        pass_through = MultipartPassThrough(CONTENT_TYPE)
+        list(pass_through.iter_body([body[:position], body[position:]]))
+        assert (pass_through.form, pass_through.filename) == ({'active': 'true'}, 'mot.pdf'), position
+
+
+def test_async_pass_through_forwards_body_and_collects_fields():
+    """
+    Test aiter_body() with file part split across chunks.
+
+    :return: None
+    """
+    chunks = split(multipart_body(), [1000])
+
+    async def receive():
+        for chunk in chunks:
+            yield chunk
+
+    async def forward(pass_through):
+        return [chunk async for chunk in pass_through.aiter_body(receive())]
+
+    pass_through = MultipartPassThrough(CONTENT_TYPE)
+    assert asyncio.run(forward(pass_through)) == chunks
+    assert pass_through.form == FORM
+    assert pass_through.headers == {'Content-Type': CONTENT_TYPE}
+
+
+@pytest.mark.parametrize('body', [
+    multipart_body()[:-len(f'--{BOUNDARY}--\r\n')],
+    multipart_body().replace(BOUNDARY.encode(), b'other-boundary'),
+])
+def test_pass_through_rejects_incomplete_body(body):
+    """
+    Test that body which ends before the closing boundary or doesn't use the declared boundary is rejected.
+
+    :param body: Invalid multipart body.
+    :return: None
+    """
+    with pytest.raises(ValueError):
+        list(MultipartPassThrough(CONTENT_TYPE).iter_body(split(body, [1000])))
+
+
+def test_pass_through_rejects_other_content_types():
+    """
+    :return: None
+    """
+    for content_type in ('application/json', 'multipart/form-data', None):
+        with pytest.raises(ValueError):
+            MultipartPassThrough(content_type)
+
+
+def test_upload_to_aws_streams_request_body(monkeypatch):
+    """
+    Test that Flask request body is read in chunks smaller than the file and reaches aws-resources byte for byte.
+
+    :return: None
+    """
+    received = []
+
+    def aws_resources(upstream_request: httpx.Request) -> httpx.Response:
+        received.append((upstream_request.headers['Content-Type'], upstream_request.read()))
+        return httpx.Response(201, json={'url': 'https://bucket.s3.amazonaws.com/mot.pdf'})
+
+    monkeypatch.setattr('app.upstream.streaming.UPLOAD_CHUNK_SIZE', 1000)
+    monkeypatch.setattr(UpstreamClients, '_pid', os.getpid())
+    monkeypatch.setattr(UpstreamClients, '_clients', {
+        'aws-resources': httpx.Client(base_url='http://aws-resources', transport=httpx.MockTransport(aws_resources))
+    })
+    body = multipart_body()
+
+    with Flask(__name__).test_request_context('/mots/', method='POST', data=body, content_type=CONTENT_TYPE):
+        res, form = upload_to_aws(request)
+
+    assert res.status_code == 201
+    assert form == FORM
+    assert received == [(CONTENT_TYPE, body)]
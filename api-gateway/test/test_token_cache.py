@@ -0,0 +1,52 @@
+import time
+
+from app.security.token_cache import VerifiedTokenCache
+
+
+def test_verified_token_is_served_from_cache():
+    """
+    Test that token stored after successful decode is returned with lowercased role.
+
+    :return: None
+    """
+    cache = VerifiedTokenCache(max_entries=10, max_ttl=60)
+    cache.put('token', {'role': 'ADMIN', 'exp': time.time() + 60})
+
+    cached = cache.get('token')
+    assert cached is not None
+    assert cached.role == 'admin'
+    assert cache.get('other token') is None
+
+
+def test_verified_token_respects_exp_and_max_ttl():
+    """
+    Test that entry is dropped when token expires or when max_ttl passes, whichever comes first.
+
+    :return: None
+    """
+    cache = VerifiedTokenCache(max_entries=10, max_ttl=60)
+    cache.put('expired', {'role': 'ADMIN', 'exp': time.time() - 1})
+    assert cache.get('expired') is None
+
+    cache = VerifiedTokenCache(max_entries=10, max_ttl=0.01)
+    cache.put('token', {'role': 'ADMIN', 'exp': time.time() + 60})
+    time.sleep(0.02)
+    assert cache.get('token') is None
+
+
+def test_verified_token_cache_is_bounded():
+    """
+    Test that least recently used tokens are evicted when cache is full.
+
+    :return: None
+    """
+    cache = VerifiedTokenCache(max_entries=2, max_ttl=60)
+    exp = time.time() + 60
+    cache.put('a', {'role': 'ADMIN', 'exp': exp})
+    cache.put('b', {'role': 'ADMIN', 'exp': exp})
+    cache.get('a')
+    cache.put('c', {'role': 'ADMIN', 'exp': exp})
+
+    assert cache.get('a') is not None
+    assert cache.get('b') is None
+    assert cache.get('c') is not None
@@ -0,0 +1,120 @@
+import os
+
+import httpcore
+import httpx
+import pytest
+
+from app.upstream.configuration import DEFAULT_LIMITS, MeteredTransport, UpstreamClients
+
+
+@pytest.fixture()
+def clients(monkeypatch):
+    """
+    Gives every test empty registry of upstream clients, closed when the test ends.
+
+    :return: Registry of upstream clients.
+    """
+    monkeypatch.setattr(UpstreamClients, '_pid', os.getpid())
+    monkeypatch.setattr(UpstreamClients, '_clients', {})
+    monkeypatch.setattr(UpstreamClients, '_transports', {})
+    yield UpstreamClients
+    UpstreamClients.close_all()
+
+
+@pytest.fixture()
+def upstream_requests(monkeypatch):
+    """
+    Makes MeteredTransport answer from memory - its pool is replaced with MockTransport, metering stays as it is.
+    Request to path /fail ends with transport error.
+
+    :return: Requests that reached the upstream.
+    """
+    upstream_requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        upstream_requests.append(request)
+        if request.url.path == '/fail':
+            raise httpx.ConnectError('Connection refused', request=request)
+        return httpx.Response(200, json={'path': request.url.path})
+
+    mock = httpx.MockTransport(handler)
+    monkeypatch.setattr(httpx.HTTPTransport, 'handle_request', lambda self, request: mock.handle_request(request))
+    return upstream_requests
+
+
+class RefusingBackend(httpcore.NetworkBackend):
+    """
+    Network backend of connection pool which refuses every connection and counts the attempts.
+    """
+    def __init__(self):
+        self.attempts = 0
+
+    def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        self.attempts += 1
+        raise httpcore.ConnectError(f'Connection to {host}:{port} refused')
+
+    def sleep(self, seconds: float) -> None:
+        pass
+
+
+def test_one_client_is_reused_per_upstream(clients, upstream_requests):
+    """
+    Test that every call for the same upstream gets the same pooled client and that different upstreams get
+    different clients, each with its own metered transport and base url.
+
+    :return: None
+    """
+    cars = clients.get('cars')
+    assert clients.get('cars') is cars
+    assert clients.get('mots') is not cars
+    assert isinstance(cars._transport, MeteredTransport)
+    assert cars._transport is clients._transports['cars']
+
+    assert cars.get('/cars/all').json() == {'path': '/cars/all'}
+    assert clients.get('cars').get('/cars/1').json() == {'path': '/cars/1'}
+    assert [str(request.url) for request in upstream_requests] == [
+        'http://cars-service:8001/cars/all', 'http://cars-service:8001/cars/1'
+    ]
+    assert clients.metrics()['cars']['requests_total'] == 2
+    assert clients.metrics()['mots']['requests_total'] == 0
+
+
+def test_pool_counters_follow_requests(clients, upstream_requests):
+    """
+    Test that request is in flight until its body is read and that transport errors are counted as failures.
+
+    :return: None
+    """
+    cars = clients.get('cars')
+    with cars.stream('GET', '/cars/all') as response:
+        assert clients.metrics()['cars']['in_flight'] == 1
+        response.read()
+        assert clients.metrics()['cars']['in_flight'] == 0
+    with pytest.raises(httpx.ConnectError):
+        cars.get('/fail')
+
+    metrics = clients.metrics()['cars']
+    assert {name: metrics[name] for name in ('requests_total', 'failures_total', 'in_flight', 'peak_in_flight')} == {
+        'requests_total': 2, 'failures_total': 1, 'in_flight': 0, 'peak_in_flight': 1
+    }
+    assert metrics['max_connections'] == DEFAULT_LIMITS.max_connections
+    assert metrics['utilisation'] == 0.0
+
+
+def test_refused_connection_is_retried_once(clients):
+    """
+    Test that pooled client tries to connect twice (retries=1) before the error reaches the caller and that
+    the request is counted once, as a failure.
+
+    :return: None
+    """
+    cars = clients.get('cars')
+    backend = RefusingBackend()
+    cars._transport._pool._network_backend = backend
+
+    with pytest.raises(httpx.ConnectError):
+        cars.get('/cars/all')
+
+    assert backend.attempts == 2
+    metrics = clients.metrics()['cars']
+    assert (metrics['requests_total'], metrics['failures_total'], metrics['in_flight']) == (1, 1, 0)
@@ -0,0 +1,58 @@
+from werkzeug.security import generate_password_hash
+
+from app.db.configuration import sa
+from app.db.model import MailOutboxModel, UserModel
+from app.security.password import password_hasher
+
+
+def test_register_user_enqueues_activation_mail(client):
+    """
+    Test that user is created and activation mail waits in the outbox.
+
+    :return: None
+    """
+    response = client.post('/users', json={'username': 'john', 'password': 'secret', 'email': 'john@example.com'})
+
+    assert response.status_code == 201
+    assert UserModel.find_by_username('john').email == 'john@example.com'
+    assert MailOutboxModel.query.one().recipient == 'john@example.com'
+
+
+def test_register_duplicated_user_is_rejected(client):
+    """
+    Test that unique indexes reject duplicated username and email and that the reason is reported.
+
+    :return: None
+    """
+    client.post('/users', json={'username': 'john', 'password': 'secret', 'email': 'john@example.com'})
+
+    response = client.post('/users', json={'username': 'john', 'password': 'secret', 'email': 'other@example.com'})
+    assert response.status_code == 400
+    assert response.json == {'message': 'User already exists'}
+
+    response = client.post('/users', json={'username': 'other', 'password': 'secret', 'email': 'john@example.com'})
+    assert response.status_code == 400
+    assert response.json == {'message': 'Email already exists'}
+
+    assert UserModel.query.count() == 1
+    assert UserModel.find_taken_fields('john', 'john@example.com') == {'username', 'email'}
+    assert UserModel.find_taken_fields('other', 'other@example.com') == set()
+
+
+def test_login_rehashes_outdated_password(client):
+    """
+    Test that password hashed with outdated parameters is upgraded on successful login.
+
+    :return: None
+    """
+    user = UserModel('john', 'secret', 'john@example.com')
+    user.password = generate_password_hash('secret', 'pbkdf2:sha256:1000')
+    user.active = True
+    user.save_or_update()
+
+    response = client.post('/login', json={'username': 'john', 'password': 'secret'})
+    assert response.status_code == 201
+
+    sa.session.refresh(user)
+    assert not password_hasher.needs_rehash(user.password)
+    assert user.check_password('secret')
@@ -0,0 +1,66 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+import sqlalchemy as sa
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+
+MIGRATION = (Path(__file__).parent.parent / 'app' / 'migrations' / 'versions'
+             / 'a4e7c2d915b3_users_unique_username_email.py')
+
+
+@pytest.fixture
+def migration():
+    """
+    :return: Module of the migration adding unique indexes on users username and email.
+    """
+    spec = importlib.util.spec_from_file_location('users_unique_username_email', MIGRATION)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def upgrade(users: list[tuple[str, str]], migration) -> list[str]:
+    """
+    :param users: Usernames and emails of users existing before the migration.
+    :param migration: Module of the migration.
+    :return: Names of indexes of users table after the upgrade.
+    """
+    engine = sa.create_engine('sqlite://')
+    with engine.begin() as connection:
+        connection.execute(sa.text('CREATE TABLE users (id INTEGER PRIMARY KEY, username VARCHAR(255), '
+                                   'email VARCHAR(255))'))
+        for username, email in users:
+            connection.execute(sa.text('INSERT INTO users (username, email) VALUES (:username, :email)'),
+                               {'username': username, 'email': email})
+        with Operations.context(MigrationContext.configure(connection)):
+            migration.upgrade()
+    return sorted(index['name'] for index in sa.inspect(engine).get_indexes('users'))
+
+
+def test_upgrade_creates_unique_indexes(migration):
+    """
+    Test that indexes are created when every username and email is used once.
+
+    :return: None
+    """
+    assert upgrade([('jan', 'jan@fleet.com'), ('ala', 'ala@fleet.com')], migration) == [
+        'ix_users_email', 'ix_users_username'
+    ]
+
+
+def test_upgrade_reports_duplicated_usernames_and_emails(migration):
+    """
+    Test that upgrade fails before creating indexes and lists every duplicated username and email.
+
+    :return: None
+    """
+    users = [('jan', 'jan@fleet.com'), ('jan', 'jan2@fleet.com'), ('ala', 'ala@fleet.com'), ('ola', 'ala@fleet.com'),
+             ('ela', 'ala@fleet.com')]
+    with pytest.raises(RuntimeError) as error:
+        upgrade(users, migration)
+    assert str(error.value) == (
+        "Unique indexes on users username and email can't be created, resolve duplicates first: "
+        "username 'jan' is used by 2 users; email 'ala@fleet.com' is used by 3 users"
+    )
@@ -18,3 +18,7 @@ AWS_ACCESS_KEY = getenv('AWS_ACCESS_KEY', 'DEFAULT AWS_ACCESS_KEY')
 AWS_SECRET_ACCESS_KEY = getenv('AWS_SECRET_ACCESS_KEY', 'DEFAULT AWS_SECRET_ACCESS_KEY')
 BUCKET_NAME = getenv('BUCKET_NAME', 'DEFAULT BUCKET_NAME')
 BUCKET_SUBFOLDER_NAME = getenv('BUCKET_SUBFOLDER_NAME', 'DEFAULT BUCKET_SUBFOLDER_NAME')
+
+# UPLOADS
+UPLOAD_CHUNK_SIZE = int(getenv('UPLOAD_CHUNK_SIZE', str(64 * 1024)))
+UPLOAD_MAX_FIELD_SIZE = int(getenv('UPLOAD_MAX_FIELD_SIZE', str(64 * 1024)))
@@ -1,5 +1,7 @@
-from pathlib import Path
+from uuid import uuid4
 import boto3
+from werkzeug.utils import secure_filename
+from app.resources.multipart import MultipartFileStream
 from app.env_variables import (
     AWS_ACCESS_KEY,
     AWS_SECRET_ACCESS_KEY,
@@ -20,14 +22,14 @@ class FileUploadConfig:
         bucket_name (str): Name of the S3 bucket.
         bucket_subfolder_name (str): Name of the subfolder within the S3 bucket.
         s3 (boto3.client): Boto3 S3 client object.
-        file (FileStorage): File object.
-        filename (str): Name of the file.
+        file (MultipartFileStream): File part of the request body, read from request stream while it is uploaded.
+        filename (str): Unique name under which the file is stored in the bucket.
 
     Methods:
-        send_to_aws(): Saves the file locally, uploads it to S3, and returns the URL of the uploaded file.
+        send_to_aws(): Streams the file to S3 and returns the URL of the uploaded file.
 
     Raises:
-        ValueError: If no file is provided.
+        ValueError: If no file is provided or request is not multipart/form-data.
 
     """
     def __init__(self, request):
@@ -42,8 +44,11 @@ class FileUploadConfig:
             aws_secret_access_key=self.aws_secret_access_key
         )
 
-        self.file = request.files.get('file')
-        self.filename = self.file.filename
+        # Body isn't parsed with request.files, which would spool the whole file to disk before the upload starts
+        file = MultipartFileStream(request.content_type, request.stream)
+        self.file = file if file.filename is not None else None
+        # Random prefix, so files uploaded concurrently with the same name don't overwrite each other
+        self.filename = f'{uuid4().hex}-{secure_filename(self.file.filename)}' if self.file else None
 
     def send_to_aws(self):
         """
@@ -54,16 +59,13 @@ class FileUploadConfig:
         :raises ValueError: If no file is provided
         """
         if self.file:
-            self.file.save(self.filename)
-
-            s3_response = self.s3.upload_file(
-                self.filename,
+            self.s3.upload_fileobj(
+                self.file,
                 self.bucket_name,
-                f'{self.bucket_subfolder_name}/{self.filename}'
+                f'{self.bucket_subfolder_name}/{self.filename}',
+                ExtraArgs={'ContentType': self.file.content_type or 'application/octet-stream'}
             )
 
-            Path.cwd().joinpath(self.filename).unlink()
-
             url = f'https://{self.bucket_name}.s3.eu-central-1.amazonaws.com/{self.bucket_subfolder_name}/{self.filename}'
             return {
                 'url': url
@@ -0,0 +1,106 @@
+from typing import BinaryIO
+
+from werkzeug.http import parse_options_header
+from werkzeug.sansio.multipart import Data, Epilogue, Event, File, MultipartDecoder, NeedData
+
+from app.env_variables import UPLOAD_CHUNK_SIZE, UPLOAD_MAX_FIELD_SIZE
+
+# Same limit of form parts Flask uses when it parses multipart body itself
+MAX_PARTS = 1000
+
+
+class MultipartFileStream:
+    """
+    Read-only file object with content of one file part of multipart/form-data body, decoded from request
+    stream while it is being read.
+
+    request.files parses the whole body before the view runs and spools files bigger than 500KB to temporary
+    file on disk, so every upload is written to disk before it is sent to S3. This class reads request stream
+    only as fast as boto3 reads the file, so memory used per request is bounded by chunk size and size of
+    multipart part that is being decoded, and nothing is written to disk. Other form fields are skipped.
+
+    Example usage:
+        file = MultipartFileStream(request.content_type, request.stream)
+        if file.filename is not None:
+            s3.upload_fileobj(file, bucket_name, key)
+
+    :param content_type: Content-Type header of the request, including multipart boundary.
+    :param stream: Request body stream, which wasn't read yet.
+    :param file_field: Name of form field holding the file.
+    :raises ValueError: If request is not multipart/form-data or its body is malformed.
+    """
+    def __init__(self, content_type: str | None, stream: BinaryIO, file_field: str = 'file'):
+        mimetype, options = parse_options_header(content_type)
+        if mimetype != 'multipart/form-data' or 'boundary' not in options:
+            raise ValueError('Expected multipart/form-data request')
+
+        self.filename: str | None = None
+        self.content_type: str | None = None
+
+        self._decoder = MultipartDecoder(options['boundary'].encode(), max_parts=MAX_PARTS)
+        self._delimiter = b'--' + options['boundary'].encode()
+        self._held_back = b''
+        self._stream = stream
+        self._buffer = bytearray()
+        self._in_file = False
+        self._find_file(file_field)
+
+    def read(self, size: int = -1) -> bytes:
+        """
+        :param size: Maximal number of bytes to return, all remaining content of the file if negative.
+        :return: Next bytes of the file, empty bytes once the whole file was read.
+        :raises ValueError: If body ends before the file part is complete.
+        """
+        while self._in_file and (size < 0 or len(self._buffer) < size):
+            event = self._next_event()
+            if isinstance(event, Data):
+                self._buffer += event.data
+                self._in_file = event.more_data
+        if size < 0:
+            size = len(self._buffer)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+    def readable(self) -> bool:
+        return True
+
+    def _find_file(self, file_field: str) -> None:
+        event = self._next_event()
+        while not isinstance(event, Epilogue):
+            if isinstance(event, File) and event.name == file_field:
+                self.filename = event.filename
+                self.content_type = event.headers.get('Content-Type')
+                self._in_file = True
+                return
+            event = self._next_event()
+
+    def _next_event(self) -> Event:
+        event = self._decoder.next_event()
+        while isinstance(event, NeedData):
+            # Decoder buffer holds only boundary or headers here, growing buffer means body doesn't match boundary
+            if len(self._decoder.buffer) > UPLOAD_MAX_FIELD_SIZE:
+                raise ValueError('Invalid multipart/form-data body')
+            # Decoder raises ValueError when it needs data after the last chunk was received
+            self._feed(self._stream.read(UPLOAD_CHUNK_SIZE) or None)
+            event = self._decoder.next_event()
+        return event
+
+    def _feed(self, chunk: bytes | None) -> None:
+        # Decoder returns CR before a boundary as data of the part when its buffer ends after the boundary but before
+        # the end of boundary line, so the last line is held back while it is, or still can become, such boundary
+        if chunk is None:
+            self._decoder.receive_data(self._held_back)
+            self._decoder.receive_data(None)
+            return
+        data = self._held_back + chunk if self._held_back else chunk
+        start = data.rfind(b'\n') + 1
+        line = data[start:]
+        if line and (line.startswith(self._delimiter) or self._delimiter.startswith(line)):
+            if len(line) > UPLOAD_MAX_FIELD_SIZE:
+                raise ValueError('Invalid multipart/form-data body')
+            self._held_back = line
+            data = data[:start]
+        else:
+            self._held_back = b''
+        self._decoder.receive_data(data)
@@ -0,0 +1,202 @@
+import threading
+from typing import Any, NamedTuple
+
+import numpy as np
+from sqlalchemy import Select, func, select
+
+from app.db.configuration import sa
+from app.db.model import CarModel, FuelTypeModel, TableVersionModel
+
+"""
+Tables the analytics are computed from, their versions (see TableVersionModel) invalidate cached results
+"""
+ANALYTICS_TABLES = (CarModel.__tablename__, FuelTypeModel.__tablename__)
+
+"""
+Percentiles of mileage returned for every group of cars
+"""
+MILEAGE_PERCENTILES = (25, 50, 75, 90)
+
+
+class FleetColumns(NamedTuple):
+    """
+    Columns of all cars parsed into arrays, one element per car.
+    """
+    makes: np.ndarray
+    fuel_type_ids: np.ndarray
+    fuel_consumption: np.ndarray
+    mileage: np.ndarray
+    efficiency: np.ndarray
+    fuel_type_names: dict[int, str]
+
+
+class FuelAnalytics:
+    """
+    Fleet-wide fuel metrics per fuel type and per make. Mileage, fuel consumption (stored as strings) and
+    efficiency of the fuel type of every car are read with one query, parsed into NumPy arrays once and
+    aggregated with vectorised operations, so computing the metrics costs about as much as reading the rows.
+
+    Computed metrics are cached together with versions of cars and fuel_type tables and reused until any write
+    changes one of them, checking them costs one primary key lookup per request.
+
+    Metrics of a group of cars:
+        - cars: Number of cars.
+        - total_consumption, mean_consumption: Sum and mean of fuel consumption (l/100km).
+        - efficiency_weighted_cost: Fuel used over the recorded mileage (mileage * consumption / 100) divided by
+          efficiency of its fuel type, summed over the cars.
+        - mileage_percentiles: Linearly interpolated percentiles of mileage, keys p25, p50...
+
+    Example usage:
+        metrics = fuel_analytics.metrics()
+        metrics['by_fuel_type'][0]['efficiency_weighted_cost']
+    """
+    def __init__(self):
+        self._cached: tuple[dict[str, int], dict[str, Any]] | None = None
+        self._lock = threading.Lock()
+
+    def metrics(self) -> dict[str, Any]:
+        """
+        :return: Metrics of the whole fleet and lists of metrics by fuel type and by make.
+        """
+        versions = TableVersionModel.versions(ANALYTICS_TABLES)
+        cached = self._cached
+        if cached is not None and cached[0] == versions:
+            return cached[1]
+        with self._lock:
+            cached = self._cached
+            if cached is not None and cached[0] == versions:
+                return cached[1]
+            metrics = compute_metrics(load_columns())
+            self._cached = (versions, metrics)
+            return metrics
+
+    def invalidate(self) -> None:
+        """
+        Drops cached metrics, they are computed again on next request.
+        """
+        self._cached = None
+
+
+def analytics_query() -> Select:
+    """
+    :return: Select of columns of all cars needed by the analytics, in order of parse_columns() arguments.
+    """
+    # fuel consumption may be written with decimal comma, see car_schema
+    return select(CarModel.make, CarModel.fuel_type_id, func.replace(CarModel.fuel_consumption, ',', '.'),
+                  CarModel.mileage, FuelTypeModel.efficiency, FuelTypeModel.name) \
+        .join(FuelTypeModel, CarModel.fuel_type_id == FuelTypeModel.id)
+
+
+def load_columns() -> FleetColumns:
+    """
+    Reads columns of all cars needed by the analytics with one query and parses them into arrays.
+
+    :return: Parsed columns.
+    """
+    return parse_columns(sa.session.execute(analytics_query()).all())
+
+
+def parse_columns(rows: list[tuple]) -> FleetColumns:
+    """
+    :param rows: Rows selected by analytics_query().
+    :return: Columns of the rows parsed into arrays, strings of numbers are converted by NumPy in bulk.
+    """
+    makes, fuel_type_ids, fuel_consumption, mileage, efficiency, names = zip(*rows) if rows else ((),) * 6
+    fuel_type_ids = np.array(fuel_type_ids, dtype=np.int64)
+    distinct_ids, first_rows = np.unique(fuel_type_ids, return_index=True)
+    return FleetColumns(
+        makes=np.array(makes, dtype=np.str_),
+        fuel_type_ids=fuel_type_ids,
+        fuel_consumption=np.array(fuel_consumption, dtype=np.float64),
+        mileage=np.array(mileage, dtype=np.float64),
+        efficiency=np.array(efficiency, dtype=np.float64),
+        fuel_type_names={fuel_type_id: names[row] for fuel_type_id, row in zip(distinct_ids.tolist(), first_rows)}
+    )
+
+
+def compute_metrics(columns: FleetColumns) -> dict[str, Any]:
+    """
+    :param columns: Parsed columns of all cars.
+    :return: Metrics of the whole fleet and lists of metrics by fuel type and by make.
+    """
+    cost = columns.mileage * columns.fuel_consumption / 100 / columns.efficiency
+    # sorted once, groups only reorder it with stable sort of their small integer codes
+    mileage_order = np.argsort(columns.mileage)
+
+    fuel_type_ids, fuel_type_codes = np.unique(columns.fuel_type_ids, return_inverse=True)
+    makes, make_codes = np.unique(columns.makes, return_inverse=True)
+    fleet = _group_metrics(np.zeros(len(cost), dtype=np.intp), min(len(cost), 1), columns, cost, mileage_order)
+
+    by_fuel_type = _group_metrics(fuel_type_codes, len(fuel_type_ids), columns, cost, mileage_order)
+    by_make = _group_metrics(make_codes, len(makes), columns, cost, mileage_order)
+    return {
+        'fleet': fleet[0] if fleet else _empty_metrics(),
+        'by_fuel_type': [
+            {'fuel_type_id': fuel_type_id, 'fuel_type_name': columns.fuel_type_names[fuel_type_id], **metrics}
+            for fuel_type_id, metrics in zip(fuel_type_ids.tolist(), by_fuel_type)
+        ],
+        'by_make': [{'make': make, **metrics} for make, metrics in zip(makes.tolist(), by_make)]
+    }
+
+
+def _group_metrics(codes: np.ndarray, groups: int, columns: FleetColumns, cost: np.ndarray,
+                   mileage_order: np.ndarray) -> list[dict[str, Any]]:
+    """
+    :param codes: Index of the group of every car, from 0 to groups - 1.
+    :param groups: Number of groups.
+    :param columns: Parsed columns of all cars.
+    :param cost: Efficiency weighted cost of every car.
+    :param mileage_order: Indices of cars sorted by mileage.
+    :return: Metrics of every group.
+    """
+    if not groups:
+        return []
+
+    counts = np.bincount(codes, minlength=groups)
+    total_consumption = np.bincount(codes, weights=columns.fuel_consumption, minlength=groups)
+    total_cost = np.bincount(codes, weights=cost, minlength=groups)
+    percentiles = _group_percentiles(codes, counts, columns.mileage, mileage_order, MILEAGE_PERCENTILES)
+
+    metrics = zip(counts.tolist(), total_consumption.round(2).tolist(), (total_consumption / counts).round(2).tolist(),
+                  total_cost.round(2).tolist(), percentiles.round(1).tolist())
+    return [
+        {'cars': cars, 'total_consumption': total, 'mean_consumption': mean, 'efficiency_weighted_cost': group_cost,
+         'mileage_percentiles': {f'p{percentile}': value for percentile, value in zip(MILEAGE_PERCENTILES, values)}}
+        for cars, total, mean, group_cost, values in metrics
+    ]
+
+
+def _empty_metrics() -> dict[str, Any]:
+    """
+    :return: Metrics of fleet without cars.
+    """
+    return {'cars': 0, 'total_consumption': 0.0, 'mean_consumption': None, 'efficiency_weighted_cost': 0.0,
+            'mileage_percentiles': {f'p{percentile}': None for percentile in MILEAGE_PERCENTILES}}
+
+
+def _group_percentiles(codes: np.ndarray, counts: np.ndarray, values: np.ndarray, order: np.ndarray,
+                       percentiles: tuple[int, ...]) -> np.ndarray:
+    """
+    Percentiles of values in every group, interpolated like np.percentile() (method 'linear'), computed for all
+    groups at once instead of a np.percentile() call per group.
+
+    :param codes: Index of the group of every value.
+    :param counts: Number of values in every group, none of them is empty.
+    :param values: Values.
+    :param order: Indices of values in ascending order.
+    :param percentiles: Percentiles to compute, from 0 to 100.
+    :return: Array of shape (groups, len(percentiles)).
+    """
+    # stable sort by group keeps values of every group in ascending order
+    ordered = values[order[np.argsort(codes[order], kind='stable')]]
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    positions = (counts - 1)[:, None] * (np.array(percentiles) / 100)[None, :]
+    lower = np.floor(positions).astype(np.intp)
+    upper = np.minimum(lower + 1, (counts - 1)[:, None])
+    fraction = positions - lower
+    below = ordered[starts[:, None] + lower]
+    above = ordered[starts[:, None] + upper]
+    return below + (above - below) * fraction
+
+
+fuel_analytics = FuelAnalytics()
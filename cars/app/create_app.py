@@ -5,8 +5,12 @@ from flask_migrate import Migrate
 
 from app.env_variables import SQLALCHEMY_DATABASE_URI
 from app.db.configuration import sa
+from app.json.configuration import configure_json
 
-from app.route.car import AllCarsResource, CarResource, CarResourceAdd
+from app.route.car import (
+    AllCarsResource, CarsSearchResource, CarsExportResource, CarsBulkResource, CarResource, CarResourceAdd
+)
+from app.route.analytics import FuelAnalyticsResource
 
 app = Flask(__name__)
 
@@ -34,8 +38,17 @@ def main():
         # API CONFIGURATION
         api = Api(app)
         api.add_resource(AllCarsResource, '/cars/all')
+        api.add_resource(CarsSearchResource, '/cars/search')
+        api.add_resource(CarsExportResource, '/cars/export')
+        api.add_resource(CarsBulkResource, '/cars/bulk')
         api.add_resource(CarResource, '/car/<int:car_id>')
         api.add_resource(CarResourceAdd, '/car')
+        api.add_resource(FuelAnalyticsResource, '/cars/analytics/fuel')
+
+        # ----------------------------------------------------------------------
+        # JSON CONFIGURATION
+        # ----------------------------------------------------------------------
+        configure_json(app, api)
 
         # ----------------------------------------------------------------------
         # FLASK-MIGRATE CONFIGURATION
@@ -1,5 +1,48 @@
-from typing import Any, Self
+from typing import Any, Iterator, Self
+
+from sqlalchemy import insert, or_, select, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.exc import IntegrityError
+
 from app.db.configuration import sa
+from app.db.search_index import SearchCriteria, car_search_index
+from app.db.serialization import RowSerializer
+
+
+class TableVersionModel(sa.Model):
+    """
+    Change counter of a table. It is incremented in the same transaction as every write made through save(),
+    update() and delete() of the table's model, so reading it is a cheap validator of the whole table - one
+    primary key lookup instead of reading the rows. Used for ETags of GET endpoints.
+    """
+    __tablename__ = 'table_versions'
+
+    name = sa.Column(sa.String(64), primary_key=True)
+    version = sa.Column(sa.BigInteger, nullable=False, default=0)
+
+    @classmethod
+    def bump(cls, name: str) -> int:
+        """
+        Increments version of the table in current transaction, caller commits it together with the change.
+
+        :param name: Name of the table.
+        :return: Version of the table after the change, the row stays locked until commit, so it is exactly
+                 the version the change produces.
+        """
+        # Single upsert, so concurrent first writes to a table without version row don't race on its primary key
+        sa.session.execute(
+            mysql_insert(cls).values(name=name, version=1).on_duplicate_key_update(version=cls.version + 1)
+        )
+        return sa.session.execute(select(cls.version).where(cls.name == name)).scalar_one()
+
+    @classmethod
+    def versions(cls, names: tuple[str, ...]) -> dict[str, int]:
+        """
+        :param names: Names of the tables.
+        :return: Versions of the tables read with one query, 0 for tables that have never been changed.
+        """
+        versions = dict(sa.session.execute(select(cls.name, cls.version).where(cls.name.in_(names))).all())
+        return {name: versions.get(name, 0) for name in names}
 
 
 class FuelTypeModel(sa.Model):
@@ -18,6 +61,16 @@ class FuelTypeModel(sa.Model):
     name = sa.Column(sa.String(10), unique=True)
     efficiency = sa.Column(sa.Double, nullable=False)
 
+    def save(self) -> None:
+        """
+        Saves the fuel type, cached copies of the table (see ReferenceCache) reload on their next check.
+
+        :return: None
+        """
+        sa.session.add(self)
+        TableVersionModel.bump(self.__tablename__)
+        sa.session.commit()
+
 class VehicleStatusModel(sa.Model):
     """
 
@@ -36,6 +89,16 @@ class VehicleStatusModel(sa.Model):
     name = sa.Column(sa.String(20), unique=True)
     description = sa.Column(sa.String(500), nullable=False, unique=True)
 
+    def save(self) -> None:
+        """
+        Saves the vehicle status, cached copies of the table (see ReferenceCache) reload on their next check.
+
+        :return: None
+        """
+        sa.session.add(self)
+        TableVersionModel.bump(self.__tablename__)
+        sa.session.commit()
+
 
 class CarModel(sa.Model):
     """
@@ -56,6 +119,17 @@ class CarModel(sa.Model):
     :return: An instance of CarModel.
     """
     __tablename__ = 'cars'
+    # Support filters of /cars/all. InnoDB appends primary key to every index, so a page filtered with equality on
+    # all columns of an index is read in id order straight from it: make and model from ix_cars_make_model, make
+    # alone from ix_cars_make, fuel_type_id and vehicle_status_id from the indexes of their foreign keys.
+    # production_year range only narrows the rows with ix_cars_production_year, they are sorted by id afterwards,
+    # no index can return a range in id order.
+    __table_args__ = (
+        sa.Index('ix_cars_make_model', 'make', 'model'),
+        sa.Index('ix_cars_make', 'make'),
+        sa.Index('ix_cars_production_year', 'production_year'),
+    )
+
     id = sa.Column(sa.Integer, primary_key=True)
     registration = sa.Column(sa.String(10), nullable=False, unique=True)
     vin = sa.Column(sa.String(17), nullable=False, unique=True)
@@ -96,7 +170,9 @@ class CarModel(sa.Model):
         :return: None
         """
         sa.session.add(self)
+        version = TableVersionModel.bump(self.__tablename__)
         sa.session.commit()
+        car_search_index.put(self.id, self.registration, self.vin, self.make, self.model, version)
 
     def delete(self) -> None:
         """
@@ -104,8 +180,11 @@ class CarModel(sa.Model):
 
         :return: None
         """
+        car_id = self.id
         sa.session.delete(self)
+        version = TableVersionModel.bump(self.__tablename__)
         sa.session.commit()
+        car_search_index.remove(car_id, version)
 
     def update(self, data) -> Self:
         """
@@ -124,9 +203,12 @@ class CarModel(sa.Model):
         self.mileage = data.get('mileage', self.mileage)
         self.fuel_type_id = data.get('fuel_type_id', self.fuel_type_id)
         self.vehicle_status_id = data.get('vehicle_status_id', self.vehicle_status_id)
+        self.fuel_consumption = data.get('fuel_consumption', self.fuel_consumption)
 
         sa.session.add(self)
+        version = TableVersionModel.bump(self.__tablename__)
         sa.session.commit()
+        car_search_index.put(self.id, self.registration, self.vin, self.make, self.model, version)
 
     @classmethod
     def get_by_id(cls, car_id: int) -> 'CarModel':
@@ -137,10 +219,201 @@ class CarModel(sa.Model):
         return sa.session.get(cls, {"id": car_id})
 
     @classmethod
-    def get_all(cls) -> list['CarModel']:
+    def get_page(cls, limit: int, cursor: int | None = None, filters: dict[str, Any] | None = None,
+                 fields: list[str] | None = None) -> tuple[list[dict[str, Any]], int | None]:
+        """
+        Retrieve one page of cars ordered by id, using keyset pagination - page starts right after the car with
+        id equal to the cursor, so reading page is equally cheap no matter how deep in the collection it is.
+        Only requested columns are selected and rows are converted to dictionaries without creating ORM objects.
+
+        :param limit: Maximal number of cars on the page.
+        :param cursor: Id of the last car of previous page, None for the first page.
+        :param filters: Values of filters declared in CAR_FILTERS.
+        :param fields: Names of returned fields declared in CAR_FIELDS, all of them when None.
+        :return: Cars of the page and cursor of the next page, which is None when there are no more cars.
+        """
+        fields = fields or list(CAR_FIELDS)
+        # id is always selected, because it is the cursor
+        serializer = RowSerializer(cls, ['id', *(field for field in fields if field != 'id')])
+        query = serializer.select().limit(limit + 1)
+        if cursor is not None:
+            query = query.where(cls.id > cursor)
+        for name, value in (filters or {}).items():
+            query = query.where(CAR_FILTERS[name](cls, value))
+
+        rows = sa.session.execute(query).all()
+        next_cursor = rows[limit - 1].id if len(rows) > limit else None
+
+        cars = serializer.as_dicts(rows[:limit])
+        if 'id' not in fields:
+            for car in cars:
+                del car['id']
+        return cars, next_cursor
+
+    @classmethod
+    def stream_all(cls, batch_size: int) -> Iterator[dict[str, Any]]:
+        """
+        Iterate over all cars ordered by id. Rows are read with server-side cursor in batches of batch_size,
+        so memory used doesn't depend on the number of cars.
+
+        :param batch_size: Number of rows fetched from the database at once.
+        :return: Iterator of car dictionaries, same as the ones returned by as_dict().
+        """
+        query = car_serializer.select().execution_options(yield_per=batch_size)
+        for row in sa.session.execute(query):
+            yield car_serializer.as_dict(row)
+
+    @classmethod
+    def bulk_write(cls, cars: list[tuple[int, dict[str, Any]]], upsert: bool,
+                   chunk_size: int) -> list[dict[str, Any]]:
         """
-        Retrieve all the car models from the database.
+        Writes validated cars in chunks, every chunk is one multi-row INSERT (and one executemany UPDATE
+        in upsert mode). Conflicts on vin and registration, with existing cars or with earlier cars of the same
+        batch, are detected up front with one query per chunk, so they are reported per car instead of failing
+        the whole statement. Caller commits the transaction.
 
-        :return: A list of CarModel objects retrieved from the database.
+        :param cars: Pairs of index of the car in the request and its validated data.
+        :param upsert: If True, car with vin that already exists is updated, otherwise it is a conflict.
+        :param chunk_size: Number of cars written by one statement.
+        :return: Results of the cars - index, status ('created', 'updated', 'conflict') and id or message.
         """
-        return [car.as_dict() for car in sa.session.query(cls).all()]
+        results = []
+        accepted_vins, accepted_registrations = set(), set()
+
+        for start in range(0, len(cars), chunk_size):
+            chunk = cars[start:start + chunk_size]
+            existing = sa.session.execute(
+                sa.select(cls.id, cls.vin, cls.registration).where(or_(
+                    cls.vin.in_([car['vin'] for _, car in chunk]),
+                    cls.registration.in_([car['registration'] for _, car in chunk])
+                ))
+            ).all()
+            id_by_vin = {row.vin: row.id for row in existing}
+            id_by_registration = {row.registration: row.id for row in existing}
+
+            to_insert, to_update = [], []
+            for index, car in chunk:
+                car_id = id_by_vin.get(car['vin'])
+                registration_owner = id_by_registration.get(car['registration'])
+                if car['vin'] in accepted_vins or (car_id is not None and not upsert):
+                    results.append(_conflict(index, 'vin', car['vin']))
+                elif car['registration'] in accepted_registrations or registration_owner not in (None, car_id):
+                    results.append(_conflict(index, 'registration', car['registration']))
+                else:
+                    accepted_vins.add(car['vin'])
+                    accepted_registrations.add(car['registration'])
+                    if car_id is None:
+                        to_insert.append((index, car))
+                    else:
+                        to_update.append((index, {**car, 'id': car_id}))
+
+            results.extend(cls._write_chunk(to_insert, to_update))
+
+        if any(result['status'] != 'conflict' for result in results):
+            TableVersionModel.bump(cls.__tablename__)
+        return sorted(results, key=lambda result: result['index'])
+
+    @classmethod
+    def _write_chunk(cls, to_insert: list[tuple[int, dict[str, Any]]],
+                     to_update: list[tuple[int, dict[str, Any]]]) -> list[dict[str, Any]]:
+        try:
+            with sa.session.begin_nested():
+                if to_update:
+                    sa.session.execute(update(cls), [car for _, car in to_update])
+                if to_insert:
+                    sa.session.execute(insert(cls), [car for _, car in to_insert])
+        except IntegrityError:
+            # Car with the same vin or registration was created concurrently, cars are written one by one
+            # to find out which of them conflict
+            return [cls._write_one(index, car, is_update=False) for index, car in to_insert] + \
+                [cls._write_one(index, car, is_update=True) for index, car in to_update]
+
+        results = [{'index': index, 'status': 'updated', 'id': car['id']} for index, car in to_update]
+        if to_insert:
+            id_by_vin = dict(sa.session.execute(
+                sa.select(cls.vin, cls.id).where(cls.vin.in_([car['vin'] for _, car in to_insert]))
+            ).all())
+            results += [{'index': index, 'status': 'created', 'id': id_by_vin[car['vin']]} for index, car in to_insert]
+        return results
+
+    @classmethod
+    def _write_one(cls, index: int, car: dict[str, Any], is_update: bool) -> dict[str, Any]:
+        try:
+            with sa.session.begin_nested():
+                if is_update:
+                    sa.session.execute(update(cls), [car])
+                    return {'index': index, 'status': 'updated', 'id': car['id']}
+                car_id = sa.session.execute(insert(cls).values(**car)).inserted_primary_key[0]
+                return {'index': index, 'status': 'created', 'id': car_id}
+        except IntegrityError as e:
+            message = e.orig.args[1] if len(e.orig.args) > 1 else str(e.orig)
+            return {'index': index, 'status': 'conflict', 'message': message}
+
+    @classmethod
+    def search(cls, criteria: SearchCriteria, limit: int,
+               cursor: int | None = None) -> tuple[list[dict[str, Any]], int | None]:
+        """
+        Search cars with car_search_index, which is rebuilt first when it doesn't reflect current version
+        of the table. Only matching cars of the page are read from the database.
+
+        :param criteria: Search criteria.
+        :param limit: Maximal number of cars on the page.
+        :param cursor: Id of the last car of previous page, None for the first page.
+        :return: Matching cars ordered by id and cursor of the next page, which is None when there are no more cars.
+        """
+        version = TableVersionModel.versions((cls.__tablename__,))[cls.__tablename__]
+        if car_search_index.version != version:
+            # read in the same transaction as the version, so the rows are the ones of that version
+            car_search_index.rebuild(
+                sa.session.execute(select(cls.id, cls.registration, cls.vin, cls.make, cls.model)), version
+            )
+        ids = car_search_index.search(criteria, limit + 1, cursor)
+        next_cursor = ids[limit - 1] if len(ids) > limit else None
+        cars = car_serializer.all(cls.id.in_(ids[:limit])) if ids else []
+        return cars, next_cursor
+
+    @classmethod
+    def get_all(cls) -> list[dict[str, Any]]:
+        """
+        Retrieve all the car models from the database. Rows are serialized straight from selected columns,
+        without creating CarModel objects.
+
+        :return: A list of car dictionaries, same as the ones returned by as_dict().
+        """
+        return car_serializer.all()
+
+
+def _conflict(index: int, key: str, value: str) -> dict[str, Any]:
+    return {'index': index, 'status': 'conflict', 'message': f"Duplicate entry '{value}' for key 'cars.{key}'"}
+
+
+"""
+Fields of the car that can be returned by /cars/all
+"""
+CAR_FIELDS = (
+    'id',
+    'registration',
+    'vin',
+    'make',
+    'model',
+    'first_registration_date',
+    'production_year',
+    'mileage',
+    'fuel_type_id',
+    'vehicle_status_id',
+    'fuel_consumption',
+)
+
+car_serializer = RowSerializer(CarModel, CAR_FIELDS)
+
+"""
+Filters of /cars/all - name of query parameter and condition it adds to the query
+"""
+CAR_FILTERS = {
+    'make': lambda car, value: car.make == value,
+    'model': lambda car, value: car.model == value,
+    'fuel_type_id': lambda car, value: car.fuel_type_id == value,
+    'vehicle_status_id': lambda car, value: car.vehicle_status_id == value,
+    'production_year_from': lambda car, value: car.production_year >= value,
+    'production_year_to': lambda car, value: car.production_year <= value,
+}
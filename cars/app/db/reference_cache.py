@@ -0,0 +1,179 @@
+import threading
+import time
+from typing import Any, Collection, Iterable, Iterator, NamedTuple
+
+from app.db.configuration import sa
+from app.db.model import FuelTypeModel, VehicleStatusModel, TableVersionModel
+from app.env_variables import REFERENCE_CACHE_CHECK_INTERVAL
+
+"""
+Names of reference tables that can be expanded in car responses (?expand=fuel_type,vehicle_status)
+"""
+EXPANSIONS = ('fuel_type', 'vehicle_status')
+
+REFERENCE_TABLES = (FuelTypeModel.__tablename__, VehicleStatusModel.__tablename__)
+
+
+class FuelType(NamedTuple):
+    id: int
+    name: str
+    efficiency: float
+
+
+class VehicleStatus(NamedTuple):
+    id: int
+    name: str
+    description: str
+
+
+class _Snapshot(NamedTuple):
+    fuel_types: dict[int, FuelType]
+    vehicle_statuses: dict[int, VehicleStatus]
+    versions: dict[str, int]
+    checked_at: float
+
+
+class ReferenceCache:
+    """
+    In-process copy of fuel_type and vehicle_status tables, which are tiny and change almost never.
+
+    - Lookups don't query the database, validation checks ids against cached sets and car responses get names
+      of fuel type and status without JOIN.
+    - At most once per check_interval seconds versions of both tables (see TableVersionModel) are read with one
+      query and the tables are reloaded when any of them has changed.
+    - Id that isn't cached checks the versions immediately, so fuel type saved by another process is picked up
+      as soon as a car refers to it. When the versions are unchanged the tables are reloaded anyway, at most once
+      per check_interval, to pick up rows inserted without bumping the version, e.g. by a migration.
+    - Snapshot of the tables is replaced as a whole, readers never see half-reloaded cache.
+
+    Example usage:
+        if not reference_cache.has_fuel_type(car['fuel_type_id']):
+            raise ValueError('Unknown fuel type')
+        cars = list(reference_cache.expand(cars, ['fuel_type']))
+    """
+    def __init__(self, check_interval: float):
+        """
+        :param check_interval: Seconds for which cached tables are used without checking their versions.
+        """
+        self.check_interval = check_interval
+        self._snapshot: _Snapshot | None = None
+        self._missing_reloaded_at = float('-inf')
+        self._lock = threading.Lock()
+
+    def fuel_types(self) -> dict[int, FuelType]:
+        """
+        :return: Fuel types by id.
+        """
+        return self._checked_snapshot().fuel_types
+
+    def vehicle_statuses(self) -> dict[int, VehicleStatus]:
+        """
+        :return: Vehicle statuses by id.
+        """
+        return self._checked_snapshot().vehicle_statuses
+
+    def fuel_type(self, fuel_type_id: int) -> FuelType | None:
+        """
+        :param fuel_type_id: Id of the fuel type.
+        :return: Fuel type with its name and efficiency, None if it doesn't exist.
+        """
+        fuel_type = self.fuel_types().get(fuel_type_id)
+        if fuel_type is None and self._reload_missing():
+            fuel_type = self.fuel_types().get(fuel_type_id)
+        return fuel_type
+
+    def vehicle_status(self, vehicle_status_id: int) -> VehicleStatus | None:
+        """
+        :param vehicle_status_id: Id of the vehicle status.
+        :return: Vehicle status with its name and description, None if it doesn't exist.
+        """
+        vehicle_status = self.vehicle_statuses().get(vehicle_status_id)
+        if vehicle_status is None and self._reload_missing():
+            vehicle_status = self.vehicle_statuses().get(vehicle_status_id)
+        return vehicle_status
+
+    def has_fuel_type(self, fuel_type_id: int) -> bool:
+        return self.fuel_type(fuel_type_id) is not None
+
+    def has_vehicle_status(self, vehicle_status_id: int) -> bool:
+        return self.vehicle_status(vehicle_status_id) is not None
+
+    def expand(self, cars: Iterable[dict[str, Any]], expansions: Collection[str]) -> Iterator[dict[str, Any]]:
+        """
+        Adds fuel_type_name and vehicle_status_name to cars which have fuel_type_id and vehicle_status_id,
+        names are taken from one snapshot of the cache.
+
+        :param cars: Serialized cars, they are modified in place.
+        :param expansions: Names from EXPANSIONS.
+        :return: The same cars, lazily, so it can be used with streamed export as well.
+        """
+        snapshot = self._checked_snapshot()
+        expand_fuel_type = 'fuel_type' in expansions
+        expand_vehicle_status = 'vehicle_status' in expansions
+        for car in cars:
+            if expand_fuel_type and 'fuel_type_id' in car:
+                fuel_type = snapshot.fuel_types.get(car['fuel_type_id'])
+                car['fuel_type_name'] = fuel_type.name if fuel_type else None
+            if expand_vehicle_status and 'vehicle_status_id' in car:
+                vehicle_status = snapshot.vehicle_statuses.get(car['vehicle_status_id'])
+                car['vehicle_status_name'] = vehicle_status.name if vehicle_status else None
+            yield car
+
+    def invalidate(self) -> None:
+        """
+        Drops cached tables, they are loaded again on next lookup.
+        """
+        with self._lock:
+            self._snapshot = None
+            self._missing_reloaded_at = float('-inf')
+
+    def _checked_snapshot(self) -> _Snapshot:
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - snapshot.checked_at < self.check_interval:
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshot
+            now = time.monotonic()
+            if snapshot is not None and now - snapshot.checked_at < self.check_interval:
+                return snapshot
+            versions = TableVersionModel.versions(REFERENCE_TABLES)
+            if snapshot is not None and snapshot.versions == versions:
+                self._snapshot = snapshot._replace(checked_at=now)
+            else:
+                self._snapshot = self._load(versions, now)
+            return self._snapshot
+
+    def _reload_missing(self) -> bool:
+        """
+        Reloads the tables because of id that isn't cached. Changed versions of the tables are checked every time,
+        reload of tables with unchanged versions happens at most once per check_interval.
+
+        :return: True if tables were reloaded.
+        """
+        with self._lock:
+            now = time.monotonic()
+            versions = TableVersionModel.versions(REFERENCE_TABLES)
+            if self._snapshot is None or self._snapshot.versions != versions:
+                self._snapshot = self._load(versions, now)
+                return True
+            if now - self._missing_reloaded_at < self.check_interval:
+                return False
+            self._missing_reloaded_at = now
+            self._snapshot = self._load(versions, now)
+            return True
+
+    @staticmethod
+    def _load(versions: dict[str, int], now: float) -> _Snapshot:
+        fuel_types = sa.session.execute(sa.select(FuelTypeModel.id, FuelTypeModel.name, FuelTypeModel.efficiency))
+        vehicle_statuses = sa.session.execute(
+            sa.select(VehicleStatusModel.id, VehicleStatusModel.name, VehicleStatusModel.description)
+        )
+        return _Snapshot(
+            {row.id: FuelType(*row) for row in fuel_types},
+            {row.id: VehicleStatus(*row) for row in vehicle_statuses},
+            versions,
+            now
+        )
+
+
+reference_cache = ReferenceCache(REFERENCE_CACHE_CHECK_INTERVAL)
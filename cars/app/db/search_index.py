@@ -0,0 +1,238 @@
+import heapq
+import threading
+from bisect import bisect_left, bisect_right, insort
+from itertools import accumulate
+from typing import Iterable, NamedTuple
+
+"""
+Joins values of a column for substring search, it can't be a part of registration or vin
+"""
+SEPARATOR = '\n'
+
+
+class SearchCriteria(NamedTuple):
+    """
+    Criteria of car search, all given ones have to match.
+
+    - registration, vin: Prefix of the value, or its substring when contains is True.
+    - tokens: Prefixes of words of make or model, every one of them has to match some word.
+    """
+    registration: str | None = None
+    vin: str | None = None
+    contains: bool = False
+    tokens: tuple[str, ...] = ()
+
+
+class _Car(NamedTuple):
+    registration: str
+    vin: str
+    tokens: frozenset[str]
+
+
+class _TextIndex:
+    """
+    Values of one column. Sorted (value, id) pairs answer prefix queries with bisect. Substring queries scan
+    all values joined into one string with str.find(), which runs at memory speed, so there are no n-gram
+    postings to build and maintain - the joined string is rebuilt only for the first substring query after
+    a change.
+    """
+    def __init__(self, values: dict[int, str] | None = None):
+        """
+        :param values: Initial values by id, sorted once instead of being inserted one by one.
+        """
+        self.values: dict[int, str] = values or {}
+        self.sorted: list[tuple[str, int]] = sorted((value, car_id) for car_id, value in self.values.items())
+        self._joined: tuple[str, list[int], list[int]] | None = None
+
+    def add(self, car_id: int, value: str) -> None:
+        self.values[car_id] = value
+        insort(self.sorted, (value, car_id))
+        self._joined = None
+
+    def remove(self, car_id: int) -> None:
+        value = self.values.pop(car_id)
+        del self.sorted[bisect_left(self.sorted, (value, car_id))]
+        self._joined = None
+
+    def prefixed(self, prefix: str) -> set[int]:
+        start = bisect_left(self.sorted, (prefix,))
+        end = bisect_left(self.sorted, (prefix + '\uffff',), start)
+        return {car_id for _, car_id in self.sorted[start:end]}
+
+    def containing(self, text: str) -> set[int]:
+        if SEPARATOR in text:
+            return set()
+        joined, starts, ids = self._joined_values()
+        found = set()
+        position = joined.find(text)
+        while position != -1:
+            index = bisect_right(starts, position) - 1
+            found.add(ids[index])
+            # next match can't be in the same value
+            position = joined.find(text, starts[index + 1])
+        return found
+
+    def _joined_values(self) -> tuple[str, list[int], list[int]]:
+        """
+        :return: Values joined with SEPARATOR, offsets where the values start (followed by offset past the end)
+                 and ids of the values.
+        """
+        if self._joined is None:
+            ids = list(self.values)
+            values = list(self.values.values())
+            starts = list(accumulate((len(value) + 1 for value in values), initial=0))
+            self._joined = (SEPARATOR.join(values), starts, ids)
+        return self._joined
+
+
+class CarSearchIndex:
+    """
+    In-process index of registration, vin, make and model of all cars, answering search queries without
+    scanning the cars table (substring search can't use the database indexes).
+
+    The index reflects one version of cars table (see TableVersionModel). CarModel.save(), update() and delete()
+    apply their change together with the version their write produced - when it directly follows the version
+    of the index, the change is applied incrementally, otherwise some other write happened in between (another
+    process, bulk write) and the index is marked stale. Stale index is rebuilt by CarModel.search() from the
+    database before it is used.
+
+    Example usage:
+        if car_search_index.version != current_version:
+            car_search_index.rebuild(rows, current_version)
+        ids = car_search_index.search(SearchCriteria(registration='WX'), limit=20)
+    """
+    def __init__(self):
+        self.version: int | None = None
+        self._cars: dict[int, _Car] = {}
+        self._registrations = _TextIndex()
+        self._vins = _TextIndex()
+        self._tokens: dict[str, set[int]] = {}
+        self._vocabulary: list[str] = []
+        self._lock = threading.RLock()
+
+    def rebuild(self, rows: Iterable[tuple[int, str, str, str, str]], version: int) -> None:
+        """
+        Replaces content of the index.
+
+        :param rows: Id, registration, vin, make and model of all cars.
+        :param version: Version of cars table the rows were read at.
+        :return: None
+        """
+        cars = {car_id: _Car(registration, vin, frozenset(tokenize(f'{make} {model}')))
+                for car_id, registration, vin, make, model in rows}
+        tokens = {}
+        for car_id, car in cars.items():
+            for token in car.tokens:
+                tokens.setdefault(token, set()).add(car_id)
+        registrations = _TextIndex({car_id: car.registration for car_id, car in cars.items()})
+        vins = _TextIndex({car_id: car.vin for car_id, car in cars.items()})
+        with self._lock:
+            self._cars, self._registrations, self._vins = cars, registrations, vins
+            self._tokens, self._vocabulary = tokens, sorted(tokens)
+            self.version = version
+
+    def put(self, car_id: int, registration: str, vin: str, make: str, model: str, version: int) -> None:
+        """
+        Adds created car or replaces updated one.
+
+        :param version: Version of cars table produced by the write.
+        :return: None
+        """
+        with self._lock:
+            if self._follows(version):
+                if car_id in self._cars:
+                    self._remove(car_id)
+                self._add(car_id, registration, vin, make, model)
+
+    def remove(self, car_id: int, version: int) -> None:
+        """
+        Removes deleted car.
+
+        :param version: Version of cars table produced by the delete.
+        :return: None
+        """
+        with self._lock:
+            if self._follows(version) and car_id in self._cars:
+                self._remove(car_id)
+
+    def invalidate(self) -> None:
+        """
+        Marks the index stale, it is rebuilt before next search.
+        """
+        with self._lock:
+            self.version = None
+
+    def search(self, criteria: SearchCriteria, limit: int, cursor: int | None = None) -> list[int]:
+        """
+        :param criteria: Search criteria, at least one of them has to be given.
+        :param limit: Maximal number of returned ids.
+        :param cursor: Only ids greater than the cursor are returned.
+        :return: Ascending ids of matching cars.
+        """
+        with self._lock:
+            matches = []
+            if criteria.registration:
+                matches.append(self._match(self._registrations, criteria.registration, criteria.contains))
+            if criteria.vin:
+                matches.append(self._match(self._vins, criteria.vin, criteria.contains))
+            for token in criteria.tokens:
+                matches.append(self._token_matches(token))
+        if not matches:
+            return []
+        matches.sort(key=len)
+        ids = matches[0].intersection(*matches[1:])
+        if cursor is not None:
+            ids = (car_id for car_id in ids if car_id > cursor)
+        return heapq.nsmallest(limit, ids)
+
+    def _follows(self, version: int) -> bool:
+        if self.version is not None and version == self.version + 1:
+            self.version = version
+            return True
+        self.version = None
+        return False
+
+    @staticmethod
+    def _match(index: _TextIndex, text: str, contains: bool) -> set[int]:
+        return index.containing(text) if contains else index.prefixed(text)
+
+    def _token_matches(self, prefix: str) -> set[int]:
+        start = bisect_left(self._vocabulary, prefix)
+        end = bisect_left(self._vocabulary, prefix + '\uffff', start)
+        ids = set()
+        for token in self._vocabulary[start:end]:
+            ids.update(self._tokens[token])
+        return ids
+
+    def _add(self, car_id: int, registration: str, vin: str, make: str, model: str) -> None:
+        car = _Car(registration, vin, frozenset(tokenize(f'{make} {model}')))
+        self._cars[car_id] = car
+        self._registrations.add(car_id, registration)
+        self._vins.add(car_id, vin)
+        for token in car.tokens:
+            if token not in self._tokens:
+                self._tokens[token] = set()
+                insort(self._vocabulary, token)
+            self._tokens[token].add(car_id)
+
+    def _remove(self, car_id: int) -> None:
+        car = self._cars.pop(car_id)
+        self._registrations.remove(car_id)
+        self._vins.remove(car_id)
+        for token in car.tokens:
+            ids = self._tokens[token]
+            ids.discard(car_id)
+            if not ids:
+                del self._tokens[token]
+                del self._vocabulary[bisect_left(self._vocabulary, token)]
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    :param text: Make, model or search query.
+    :return: Upper case words of the text, the same way make and model are stored.
+    """
+    return text.upper().split()
+
+
+car_search_index = CarSearchIndex()
@@ -0,0 +1,66 @@
+from typing import Any, Iterable
+
+from sqlalchemy import Date, DateTime, Select, select
+
+from app.db.configuration import sa
+
+
+class RowSerializer:
+    """
+    Serializes rows of a model without creating ORM objects. Columns are selected with Core and every row
+    (a plain tuple) is zipped with field names, date and datetime values are converted with isoformat(), so the
+    result is identical to as_dict() of the model, at a fraction of its cost for long lists.
+
+    Example usage:
+        serializer = RowSerializer(CarModel, ('id', 'registration', 'first_registration_date'))
+        cars = serializer.all(CarModel.make == 'BMW')
+    """
+    def __init__(self, model: type[sa.Model], fields: tuple[str, ...] | list[str]):
+        """
+        :param model: Model which columns are serialized.
+        :param fields: Names of mapped columns in order of keys of returned dictionaries.
+        """
+        self.model = model
+        self.fields = tuple(fields)
+        self.columns = [getattr(model, field) for field in self.fields]
+        columns = model.__mapper__.columns
+        self._date_fields = [field for field in self.fields if isinstance(columns[field].type, (Date, DateTime))]
+
+    def select(self) -> Select:
+        """
+        :return: Select of serialized columns ordered by primary key, can be extended with where(), limit()...
+        """
+        return select(*self.columns).order_by(*self.model.__mapper__.primary_key)
+
+    def as_dict(self, row: Iterable[Any]) -> dict[str, Any]:
+        """
+        :param row: Values of serialized columns in order of fields.
+        :return: Dictionary of the row.
+        """
+        data = dict(zip(self.fields, row))
+        for field in self._date_fields:
+            if data[field] is not None:
+                data[field] = data[field].isoformat()
+        return data
+
+    def as_dicts(self, rows: Iterable[Iterable[Any]]) -> list[dict[str, Any]]:
+        """
+        :param rows: Rows with values of serialized columns in order of fields.
+        :return: Dictionaries of the rows.
+        """
+        fields, date_fields = self.fields, self._date_fields
+        result = []
+        for row in rows:
+            data = dict(zip(fields, row))
+            for field in date_fields:
+                if data[field] is not None:
+                    data[field] = data[field].isoformat()
+            result.append(data)
+        return result
+
+    def all(self, *criteria: Any) -> list[dict[str, Any]]:
+        """
+        :param criteria: Optional where() criteria.
+        :return: Dictionaries of all matching rows ordered by primary key.
+        """
+        return self.as_dicts(sa.session.execute(self.select().where(*criteria)))
@@ -22,3 +22,17 @@ TEST_DB_PORT = getenv('TEST_DB_PORT', '3306')
 TEST_DB_NAME = getenv('TEST_DB_NAME', 'db_1')
 TEST_DB_CONTAINER = getenv('TEST_DB_CONTAINER', 'mysql')
 TEST_SQLALCHEMY_DATABASE_URI = f'mysql://{TEST_DB_USERNAME}:{TEST_DB_PASSWORD}@{TEST_DB_CONTAINER}:{TEST_DB_PORT}/{TEST_DB_NAME}'
+
+# Keyset pagination of /cars/all
+CARS_PAGE_SIZE = int(getenv('CARS_PAGE_SIZE', '100'))
+CARS_PAGE_MAX_SIZE = int(getenv('CARS_PAGE_MAX_SIZE', '1000'))
+
+# Streaming export of cars
+CARS_EXPORT_BATCH_SIZE = int(getenv('CARS_EXPORT_BATCH_SIZE', '1000'))
+
+# Bulk create/update of cars
+CARS_BULK_CHUNK_SIZE = int(getenv('CARS_BULK_CHUNK_SIZE', '500'))
+CARS_BULK_MAX_ROWS = int(getenv('CARS_BULK_MAX_ROWS', '10000'))
+
+# In-process cache of fuel_type and vehicle_status tables, seconds between checks of their versions
+REFERENCE_CACHE_CHECK_INTERVAL = float(getenv('REFERENCE_CACHE_CHECK_INTERVAL', '5.0'))
@@ -0,0 +1,26 @@
+from flask_restful import Resource
+from flask import Response
+
+from app.analytics.fuel import fuel_analytics, ANALYTICS_TABLES
+from app.route.conditional import conditional
+
+
+class FuelAnalyticsResource(Resource):
+    """
+    A class representing the resource for fleet-wide fuel metrics.
+
+    Methods:
+        - get: Returns fuel metrics of the whole fleet, by fuel type and by make.
+
+    """
+    @conditional(*ANALYTICS_TABLES)
+    def get(self) -> Response:
+        """
+        Get fuel metrics of all cars, see FuelAnalytics for their meaning. Metrics are computed once per change
+        of cars or fuel_type table.
+
+        :return: Response object
+            - 200: {"fleet": {...}, "by_fuel_type": [{"fuel_type_id": ..., "fuel_type_name": ..., ...}],
+                    "by_make": [{"make": ..., ...}]}
+        """
+        return fuel_analytics.metrics(), 200
@@ -1,36 +1,205 @@
-from flask_restful import Resource, reqparse
-from flask import Response, make_response, request
+import json
+from datetime import date
+
+from flask_restful import Resource
+from flask import Response, make_response, request, stream_with_context
 from sqlalchemy.exc import IntegrityError
 
 from app.db.configuration import sa
-from app.db.model import CarModel
-from app.validator.car import car_schema
+from app.db.model import CarModel, CAR_FIELDS
+from app.db.search_index import SearchCriteria, tokenize
+from app.db.reference_cache import reference_cache, EXPANSIONS, REFERENCE_TABLES
+from app.route.conditional import conditional
+from app.env_variables import (
+    CARS_PAGE_SIZE,
+    CARS_PAGE_MAX_SIZE,
+    CARS_EXPORT_BATCH_SIZE,
+    CARS_BULK_CHUNK_SIZE,
+    CARS_BULK_MAX_ROWS
+)
+from app.validator.car import car_schema, validate_references
+from app.validator.configuration import FieldError, ValidationError, invalid_request
 
 import logging
 
 logging.basicConfig(level=logging.DEBUG)
 
+# Serialized rows are sent in chunks of roughly this size instead of one write per row
+EXPORT_CHUNK_SIZE = 64 * 1024
+
 
 class AllCarsResource(Resource):
     """
     A class representing the resource for retrieving all cars.
 
     Methods:
-        - get: Retrieves all cars and returns a JSON response.
+        - get: Retrieves one page of cars and returns a JSON response.
 
     """
+    @conditional(CarModel.__tablename__, *REFERENCE_TABLES)
     def get(self) -> Response:
         """
-        Get all cars.
-
-        :return: Response object with a JSON containing all cars.
+        Get page of cars ordered by id.
+
+        Query parameters:
+            - limit: Number of cars on the page, CARS_PAGE_SIZE by default, at most CARS_PAGE_MAX_SIZE.
+            - cursor: next_cursor of the previous page.
+            - make, model, fuel_type_id, vehicle_status_id: Exact match filters.
+            - production_year_from, production_year_to: Inclusive range of production year.
+            - fields: Comma separated names of returned fields, all fields by default.
+            - expand: Comma separated 'fuel_type', 'vehicle_status' - adds fuel_type_name and vehicle_status_name
+              of cars which fields include fuel_type_id and vehicle_status_id.
+
+        :return: Response object with a JSON containing cars of the page under 'all_cars' and 'next_cursor', which
+                 is None on the last page. 400 if any of query parameters is invalid.
         """
-        cars = CarModel.get_all()
-        response = make_response({'all_cars': cars})
+        try:
+            args = request.args
+            limit = int(args.get('limit', CARS_PAGE_SIZE))
+            if not 1 <= limit <= CARS_PAGE_MAX_SIZE:
+                raise ValueError(f'limit has to be between 1 and {CARS_PAGE_MAX_SIZE}')
+            cursor = int(args['cursor']) if args.get('cursor') else None
+
+            filters = {}
+            for name in ('make', 'model'):
+                if args.get(name):
+                    filters[name] = args[name]
+            for name in ('fuel_type_id', 'vehicle_status_id'):
+                if args.get(name):
+                    filters[name] = int(args[name])
+            for name in ('production_year_from', 'production_year_to'):
+                if args.get(name):
+                    filters[name] = f'{int(args[name]):04}'
+
+            fields = [field.strip() for field in args['fields'].split(',')] if args.get('fields') else None
+            if fields and not set(fields) <= set(CAR_FIELDS):
+                raise ValueError(f'Unknown fields: {set(fields) - set(CAR_FIELDS)}')
+            expansions = _parse_expand(args)
+        except ValueError as e:
+            logging.info(e)
+            return invalid_request(e), 400
+
+        cars, next_cursor = CarModel.get_page(limit, cursor, filters, fields)
+        if expansions:
+            cars = list(reference_cache.expand(cars, expansions))
+        response = make_response({'all_cars': cars, 'next_cursor': next_cursor})
         response.headers['Content-Type'] = 'application/json'
         response.status = 200
         return response
 
+class CarsSearchResource(Resource):
+    """
+    A class representing the resource for searching cars by registration, vin, make and model.
+
+    Methods:
+        - get: Retrieves one page of matching cars and returns a JSON response.
+
+    """
+    @conditional(CarModel.__tablename__, *REFERENCE_TABLES)
+    def get(self) -> Response:
+        """
+        Search cars, all given criteria have to match. Cars are found with in-process index (see CarSearchIndex),
+        only the cars of returned page are read from the database.
+
+        Query parameters:
+            - registration, vin: Prefix of registration or vin, case insensitive.
+            - match: 'prefix' (default) or 'contains' - registration and vin match anywhere in the value.
+            - q: Words matched against words of make and model, 'BMW SER' matches BMW SERIES 3.
+            - limit: Number of cars on the page, CARS_PAGE_SIZE by default, at most CARS_PAGE_MAX_SIZE.
+            - cursor: next_cursor of the previous page.
+            - expand: The same as in /cars/all.
+
+        :return: Response object with a JSON containing matching cars of the page ordered by id under 'cars' and
+                 'next_cursor', which is None on the last page. 400 if no criteria is given or any of query
+                 parameters is invalid.
+        """
+        try:
+            args = request.args
+            limit = int(args.get('limit', CARS_PAGE_SIZE))
+            if not 1 <= limit <= CARS_PAGE_MAX_SIZE:
+                raise ValueError(f'limit has to be between 1 and {CARS_PAGE_MAX_SIZE}')
+            cursor = int(args['cursor']) if args.get('cursor') else None
+            match = args.get('match', 'prefix')
+            if match not in ('prefix', 'contains'):
+                raise ValueError(f'Unknown match {match}')
+            criteria = SearchCriteria(
+                registration=args.get('registration', '').strip().upper() or None,
+                vin=args.get('vin', '').strip().upper() or None,
+                contains=match == 'contains',
+                tokens=tuple(tokenize(args.get('q', '')))
+            )
+            if not (criteria.registration or criteria.vin or criteria.tokens):
+                raise ValueError('At least one of registration, vin and q is required')
+            expansions = _parse_expand(args)
+        except ValueError as e:
+            logging.info(e)
+            return invalid_request(e), 400
+
+        cars, next_cursor = CarModel.search(criteria, limit, cursor)
+        if expansions:
+            cars = list(reference_cache.expand(cars, expansions))
+        return {'cars': cars, 'next_cursor': next_cursor}, 200
+
+
+class CarsExportResource(Resource):
+    """
+    A class representing the resource for exporting all cars in one streamed response.
+
+    Methods:
+        - get: Streams all cars as NDJSON (default) or as JSON document in the shape of /cars/all.
+
+    """
+    @conditional(CarModel.__tablename__, *REFERENCE_TABLES)
+    def get(self) -> Response:
+        """
+        Export all cars ordered by id. Cars are read from the database in batches and written to the response
+        as they come, so memory used by the worker stays the same for any number of cars.
+
+        Query parameters:
+            - format: 'ndjson' (one car per line, default) or 'json' ({"all_cars": [...]}).
+            - expand: Comma separated 'fuel_type', 'vehicle_status' - adds fuel_type_name and vehicle_status_name.
+
+        :return: Streamed response with all cars, 400 if format or expand is unknown.
+        """
+        export_format = request.args.get('format', 'ndjson')
+        try:
+            if export_format not in ('ndjson', 'json'):
+                raise ValueError(f'Unknown format {export_format}')
+            expansions = _parse_expand(request.args)
+        except ValueError as e:
+            logging.info(e)
+            return invalid_request(e), 400
+
+        def generate():
+            cars = CarModel.stream_all(CARS_EXPORT_BATCH_SIZE)
+            if expansions:
+                cars = reference_cache.expand(cars, expansions)
+            if export_format == 'ndjson':
+                parts = (json.dumps(car) + '\n' for car in cars)
+            else:
+                parts = _json_array_parts(cars)
+
+            chunk, size = [], 0
+            for part in parts:
+                chunk.append(part)
+                size += len(part)
+                if size >= EXPORT_CHUNK_SIZE:
+                    yield ''.join(chunk)
+                    chunk, size = [], 0
+            if chunk:
+                yield ''.join(chunk)
+
+        mimetype = 'application/x-ndjson' if export_format == 'ndjson' else 'application/json'
+        return Response(stream_with_context(generate()), mimetype=mimetype)
+
+
+def _json_array_parts(cars):
+    yield '{"all_cars": ['
+    for number, car in enumerate(cars):
+        yield (',' if number else '') + json.dumps(car)
+    yield ']}'
+
+
 class CarResource(Resource):
     """
 
@@ -52,18 +221,25 @@ class CarResource(Resource):
     * invalid.
 
     """
+    @conditional(CarModel.__tablename__, *REFERENCE_TABLES)
     def get(self, car_id) -> Response:
         """
-        Retrieve a car by its ID.
+        Retrieve a car by its ID. Query parameter expand works as in /cars/all.
 
         :param car_id: The ID of the car to retrieve.
         :return: A tuple consisting of the car dictionary and HTTP status code.
                  If the car is found, the car dictionary will be returned with a status code of 200 (OK).
                  If the car is not found, a dictionary with an error message will be returned with a status code of 404 (Not Found).
         """
+        try:
+            expansions = _parse_expand(request.args)
+        except ValueError as e:
+            logging.info(e)
+            return invalid_request(e), 400
+
         car = CarModel.get_by_id(car_id)
         if car:
-            return car.as_dict(), 200
+            return next(reference_cache.expand([car.as_dict()], expansions)), 200
         return {"message": "Car does not exist"}, 404
 
     def delete(self, car_id) -> Response:
@@ -96,14 +272,15 @@ class CarResource(Resource):
         """
         try:
             data = request.get_json()
-            car_schema.validate(data)
+            car_schema.validate(data, partial=True)
+            validate_references(data)
             car = CarModel.get_by_id(car_id)
             if car:
                 car.update(data)
                 return car.as_dict(), 200
             return {"message": "Car does not exist"}, 404
-        except ValueError or TypeError:
-            return {"message": "Invalid request"}, 400
+        except ValueError or TypeError as e:
+            return invalid_request(e), 400
 
 
 class CarResourceAdd(Resource):
@@ -112,26 +289,10 @@ class CarResourceAdd(Resource):
 
     The class inherits from the `Resource` class.
 
-    Attributes:
-        parser (RequestParser): An instance of the `RequestParser` class used for parsing and validating request data.
-
     Methods:
-        post(): Processes a POST request to add a car to the system.
-
-    """
-    parser = reqparse.RequestParser()
-    parser.add_argument('registration', type=str, required=True, help='Registration of the car is required')
-    parser.add_argument('vin', type=str, required=True, help='Vin of the car is required')
-    parser.add_argument('make', type=str, required=True, help='Make of the car is required')
-    parser.add_argument('model', type=str, required=True, help='Model of the car is required')
-    parser.add_argument('first_registration_date', type=str, required=True,
-                        help='First Registration Date of the car is required')
-    parser.add_argument('production_year', type=str, required=True, help='Production year of the car is required')
-    parser.add_argument('mileage', type=str, required=True, help='Mileage of the car is required')
-    parser.add_argument('fuel_consumption', type=str, required=True, help='Fuel consumption of the car is required')
-    parser.add_argument('fuel_type_id', type=int, required=True, help='Fuel type id of the car is required')
-    parser.add_argument('vehicle_status_id', type=int, required=True, help='Vehicle status id of the car is required')
+        post(): Processes a POST request to add a car to the system, request body is validated with car_schema.
 
+    """
     def post(self) -> Response:
         """
         Post method to create a new car record.
@@ -140,10 +301,11 @@ class CarResourceAdd(Resource):
         :rtype: Response
         """
 
-        data = self.parser.parse_args()
+        data = request.get_json(silent=True)
 
         try:
             car_schema.validate(data)
+            validate_references(data)
             car = CarModel(**data)
             car.save()
             return car.as_dict(), 201, {'Content-Type': "application/json"}
@@ -152,4 +314,90 @@ class CarResourceAdd(Resource):
             return {"message": e.orig.args[1]}, 403
         except ValueError or TypeError as e:
             logging.info(e)
-            return {"message": "Invalid request"}, 400
+            return invalid_request(e), 400
+
+
+class CarsBulkResource(Resource):
+    """
+    A class representing the resource for creating (or updating) many cars with one request.
+
+    Methods:
+        post(): Validates all cars of the request and writes the valid ones in one transaction.
+
+    """
+    def post(self) -> Response:
+        """
+        Create many cars. Body is JSON array of cars or NDJSON (Content-Type: application/x-ndjson) with one car
+        per line, every car has the same fields as in POST /car. Valid cars are written even if some of the cars
+        are invalid or conflicting, result of every car is returned under its index.
+
+        Query parameters:
+            - mode: 'insert' (default) or 'upsert' - car with vin that already exists is updated instead of being
+              reported as conflict.
+
+        :return: Results of all cars and counts of created, updated and failed ones. 400 if body isn't an array
+                 of at most CARS_BULK_MAX_ROWS cars or mode is unknown.
+        """
+        mode = request.args.get('mode', 'insert')
+        try:
+            if mode not in ('insert', 'upsert'):
+                raise ValueError(f'Unknown mode {mode}')
+            if request.mimetype == 'application/x-ndjson':
+                cars = [json.loads(line) for line in request.get_data(as_text=True).splitlines() if line.strip()]
+            else:
+                cars = request.get_json()
+            if not isinstance(cars, list) or len(cars) > CARS_BULK_MAX_ROWS:
+                raise ValueError('Body has to be an array of at most CARS_BULK_MAX_ROWS cars')
+        except ValueError as e:
+            logging.info(e)
+            return invalid_request(e), 400
+
+        results, valid_cars = [], []
+        for index, (car, errors) in enumerate(zip(cars, car_schema.validate_many(cars))):
+            try:
+                if errors:
+                    raise ValidationError(errors)
+                valid_cars.append((index, _prepare_bulk_car(car)))
+            except ValueError as e:
+                logging.info(e)
+                results.append({'index': index, 'status': 'invalid', **invalid_request(e)})
+
+        results += CarModel.bulk_write(valid_cars, mode == 'upsert', CARS_BULK_CHUNK_SIZE)
+        sa.session.commit()
+
+        results.sort(key=lambda result: result['index'])
+        return {
+            'results': results,
+            'created': sum(result['status'] == 'created' for result in results),
+            'updated': sum(result['status'] == 'updated' for result in results),
+            'failed': sum(result['status'] in ('invalid', 'conflict') for result in results)
+        }, 200
+
+
+def _prepare_bulk_car(car: dict) -> dict:
+    """
+    :param car: Car from bulk request, already validated with car_schema.
+    :return: Car ready to be written, with first_registration_date converted to date.
+    :raises ValidationError: If car refers to fuel type or vehicle status that doesn't exist or its
+        first_registration_date isn't a date.
+    """
+    validate_references(car)
+    try:
+        first_registration_date = date.fromisoformat(car['first_registration_date'])
+    except ValueError:
+        raise ValidationError([
+            FieldError('first_registration_date', 'date', 'has to be a date in format YYYY-MM-DD')
+        ]) from None
+    return {**car, 'first_registration_date': first_registration_date}
+
+
+def _parse_expand(args) -> list[str]:
+    """
+    :param args: Query parameters of the request.
+    :return: Reference tables which names should be added to cars.
+    :raises ValueError: If expand contains unknown name.
+    """
+    expansions = [name.strip() for name in args['expand'].split(',')] if args.get('expand') else []
+    if not set(expansions) <= set(EXPANSIONS):
+        raise ValueError(f'Unknown expansions: {set(expansions) - set(EXPANSIONS)}')
+    return expansions
@@ -0,0 +1,58 @@
+from functools import wraps
+from typing import Any, Callable
+
+from flask import Response, request
+from werkzeug.http import quote_etag
+
+from app.db.model import TableVersionModel
+
+
+def table_etag(*table_names: str) -> str:
+    """
+    :param table_names: Names of the tables the response is built from.
+    :return: Strong entity tag (without quotes) of responses built from current versions of the tables.
+    """
+    versions = TableVersionModel.versions(table_names)
+    return '.'.join(f'{name}-{versions[name]}' for name in table_names)
+
+
+def conditional(*table_names: str) -> Callable:
+    """
+    Decorator of GET views which responses are built only from rows of given tables. Successful responses carry
+    ETag derived from versions of the tables, and request with matching If-None-Match gets 304 Not Modified
+    without reading any rows.
+
+    Version is read before the rows, so write committed in between can only make the ETag older than the body,
+    which costs client one more full response but never hides the change.
+
+    Example usage:
+        @conditional(CarModel.__tablename__)
+        def get(self, car_id):
+            ...
+
+    :param table_names: Names of the tables the responses are built from.
+    :return: Decorator of the view.
+    """
+    def decorator(view: Callable) -> Callable:
+        @wraps(view)
+        def wrapper(*args, **kwargs) -> Any:
+            etag = table_etag(*table_names)
+            if request.if_none_match.contains_weak(etag):
+                response = Response(status=304)
+                response.set_etag(etag)
+                return response
+            return _with_etag(view(*args, **kwargs), etag)
+        return wrapper
+    return decorator
+
+
+def _with_etag(result: Any, etag: str) -> Any:
+    if isinstance(result, Response):
+        if result.status_code == 200:
+            result.set_etag(etag)
+        return result
+
+    data, status, headers = (result + (None, None))[:3] if isinstance(result, tuple) else (result, None, None)
+    if status in (None, 200):
+        headers = {**(headers or {}), 'ETag': quote_etag(etag)}
+    return data, status or 200, headers
@@ -1,9 +1,11 @@
-from schemadict import schemadict
+from app.db.reference_cache import reference_cache
+from app.validator.configuration import FieldError, Schema, ValidationError
 
 """
-car_schema implements .validate() method which will return error if any of dict keys won't meet declared constraints
+car_schema is built once, its .validate() raises ValidationError (ValueError) listing every key that doesn't
+meet declared constraints
 """
-car_schema = schemadict({
+car_schema = Schema({
     'registration': {
         'type': str,
         'min_len': 7,
@@ -49,14 +51,29 @@ car_schema = schemadict({
     },
     'fuel_type_id': {
         'type': int,
-        '>=': 1,
-        '<=': 3,
+        '>=': 1
     },
     'vehicle_status_id': {
         'type': int,
-        '>=': 1,
-        '<=': 3
+        '>=': 1
     }
 })
 
 
+def validate_references(car: dict) -> None:
+    """
+    Checks fuel_type_id and vehicle_status_id of the car (if present) against cached reference tables, so car
+    with unknown id is rejected without a query and before its insert fails on foreign key.
+
+    :param car: Car data already validated with car_schema.
+    :raises ValidationError: If fuel type or vehicle status doesn't exist.
+    """
+    errors = []
+    if 'fuel_type_id' in car and not reference_cache.has_fuel_type(car['fuel_type_id']):
+        errors.append(FieldError('fuel_type_id', 'exists', f"Fuel type {car['fuel_type_id']} doesn't exist"))
+    if 'vehicle_status_id' in car and not reference_cache.has_vehicle_status(car['vehicle_status_id']):
+        errors.append(
+            FieldError('vehicle_status_id', 'exists', f"Vehicle status {car['vehicle_status_id']} doesn't exist")
+        )
+    if errors:
+        raise ValidationError(errors)
@@ -0,0 +1,177 @@
+import re
+from typing import Any, Callable, Iterable, NamedTuple
+
+
+class FieldError(NamedTuple):
+    """
+    One violated rule - name of the field ('$' for the whole object), name of the rule and readable message.
+    """
+    field: str
+    rule: str
+    message: str
+
+
+class ValidationError(ValueError):
+    """
+    Raised by Schema.validate(), carries all violated rules of the object, not only the first one. It is
+    a ValueError, so routes answer it with 400 like any other invalid request.
+    """
+    def __init__(self, errors: list[FieldError]):
+        super().__init__(errors)
+        self.errors = errors
+
+    def __str__(self) -> str:
+        # formatted only when logged, bulk requests can reject thousands of rows
+        return '; '.join(f'{error.field}: {error.message}' for error in self.errors)
+
+    def as_list(self) -> list[dict[str, str]]:
+        """
+        :return: Errors as JSON serializable dictionaries.
+        """
+        return [error._asdict() for error in self.errors]
+
+
+def invalid_request(error: Exception) -> dict[str, Any]:
+    """
+    :param error: Error raised while the request was parsed or validated.
+    :return: Body of 400 response, with violated rules under 'errors' if error is ValidationError.
+    """
+    if isinstance(error, ValidationError):
+        return {'message': 'Invalid request', 'errors': error.as_list()}
+    return {'message': 'Invalid request'}
+
+
+def _one_of(allowed: Any) -> Callable[[Any], bool]:
+    allowed = frozenset(allowed)
+    return lambda value: value not in allowed
+
+
+def _regex(pattern: str) -> Callable[[Any], bool]:
+    match = re.compile(pattern).match
+    return lambda value: match(value) is None
+
+
+"""
+For every rule function creating its check from value of the rule and message of the violation. Check gets value
+which already has the type of the field and returns True when the rule is violated.
+"""
+_RULES: dict[str, tuple[Callable[[Any], Callable[[Any], bool]], str]] = {
+    'min_len': (lambda limit: lambda value: len(value) < limit, 'length has to be at least {limit}'),
+    'max_len': (lambda limit: lambda value: len(value) > limit, 'length has to be at most {limit}'),
+    '>=': (lambda limit: lambda value: value < limit, 'has to be >= {limit}'),
+    '<=': (lambda limit: lambda value: value > limit, 'has to be <= {limit}'),
+    '>': (lambda limit: lambda value: value <= limit, 'has to be > {limit}'),
+    '<': (lambda limit: lambda value: value >= limit, 'has to be < {limit}'),
+    'one_of': (_one_of, 'has to be one of {limit}'),
+    'regex': (_regex, 'has to match {limit}'),
+}
+
+"""
+Supported types of fields, checked exactly - bool is a subclass of int in Python but it isn't accepted where int
+is expected
+"""
+_TYPES = (str, int, float, bool)
+
+
+class _Field(NamedTuple):
+    name: str
+    type: type
+    required_error: FieldError
+    type_error: FieldError
+    checks: tuple[tuple[Callable[[Any], bool], FieldError], ...]
+
+
+class Schema:
+    """
+    Validator of flat dictionaries, built once from rules in the format of schemadict - for every field its
+    'type' and optional 'min_len', 'max_len', 'regex', '>=', '<=', '>', '<' and 'one_of'. Every rule is turned
+    into a check function when the schema is created (regular expressions are compiled and matched with
+    re.match() like schemadict does), so validation only calls prepared checks instead of interpreting the rule
+    dictionary on every call.
+
+    - Full object (partial=False, for create and bulk) has to have all fields of the schema and nothing else.
+    - Partial object (partial=True, for update) is checked only in fields it has, other keys are ignored.
+    - None value is treated as missing field.
+
+    Example usage:
+        car_schema = Schema({'registration': {'type': str, 'regex': r'^[A-Z0-9]{7}$'}})
+        car_schema.validate(request.get_json(silent=True))   # raises ValidationError
+        errors = car_schema.errors(car, partial=True)       # [] when car is valid
+    """
+    def __init__(self, rules: dict[str, dict[str, Any]]):
+        """
+        :param rules: Rules of every field.
+        :raises ValueError: If a rule or a type is not supported.
+        """
+        self.rules = rules
+        self.fields = frozenset(rules)
+        self._fields = tuple(_field(name, field_rules) for name, field_rules in rules.items())
+
+    def errors(self, data: Any, partial: bool = False) -> list[FieldError]:
+        """
+        :param data: Object to check, usually parsed JSON.
+        :param partial: If True, data is checked only in fields it has.
+        :return: All violated rules, empty list if data is valid.
+        """
+        if type(data) is not dict:
+            return [FieldError('$', 'type', 'has to be an object')]
+        errors = []
+        for field in self._fields:
+            value = data.get(field.name)
+            if value is None:
+                if not partial:
+                    errors.append(field.required_error)
+            elif type(value) is not field.type:
+                errors.append(field.type_error)
+            else:
+                errors.extend(error for violated, error in field.checks if violated(value))
+        if not partial and data.keys() != self.fields:
+            errors += [FieldError(name, 'unknown', 'is not allowed') for name in data.keys() - self.fields]
+        return errors
+
+    def validate(self, data: Any, partial: bool = False) -> None:
+        """
+        :param data: Object to check, usually parsed JSON.
+        :param partial: If True, data is checked only in fields it has.
+        :return: None
+        :raises ValidationError: If data violates any rule.
+        """
+        errors = self.errors(data, partial)
+        if errors:
+            raise ValidationError(errors)
+
+    def validate_many(self, items: Iterable[Any], partial: bool = False) -> list[list[FieldError]]:
+        """
+        :param items: Objects to check, e.g. rows of a bulk request.
+        :param partial: If True, objects are checked only in fields they have.
+        :return: Violated rules of every object, in order of the objects.
+        """
+        errors = self.errors
+        return [errors(item, partial) for item in items]
+
+
+def _field(name: str, rules: dict[str, Any]) -> _Field:
+    """
+    :param name: Name of the field.
+    :param rules: Rules of the field.
+    :return: Type and prepared checks of the field.
+    :raises ValueError: If a rule or the type is not supported.
+    """
+    field_type = rules.get('type')
+    if field_type not in _TYPES:
+        raise ValueError(f'Type {field_type!r} of {name!r} is not supported')
+    checks = []
+    for rule, limit in rules.items():
+        if rule == 'type':
+            continue
+        if rule not in _RULES:
+            raise ValueError(f'Rule {rule!r} of {name!r} is not supported')
+        check, message = _RULES[rule]
+        checks.append((check(limit), FieldError(name, rule, message.format(limit=limit))))
+    return _Field(
+        name,
+        field_type,
+        FieldError(name, 'required', 'is required'),
+        FieldError(name, 'type', f'has to be {field_type.__name__}'),
+        tuple(checks)
+    )
@@ -0,0 +1,116 @@
+"""
+Fuel metrics of GET /cars/analytics/fuel - aggregating rows car by car in Python (dictionaries of groups and
+statistics.quantiles), compared with parsing the columns into NumPy arrays and aggregating them with
+compute_metrics(). Both get the same rows, the query is measured separately. Uses sqlite file by default, pass
+--uri to run against MySQL. Run from cars directory:
+
+    python -m benchmarks.bench_analytics --cars 100000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import date
+
+from flask import Flask
+from sqlalchemy import insert
+
+from app.analytics.fuel import MILEAGE_PERCENTILES, analytics_query, compute_metrics, parse_columns
+from app.db.configuration import sa
+from app.db.model import CarModel, FuelTypeModel, VehicleStatusModel
+
+BATCH = 10_000
+MAKES = ('AUDI', 'BMW', 'FORD', 'KIA', 'OPEL', 'SKODA', 'TOYOTA', 'VOLVO')
+
+
+def measure(function, repeats: int) -> float:
+    """
+    :return: Best duration of the function in seconds.
+    """
+    durations = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+def python_metrics(rows: list[tuple]) -> dict:
+    """
+    :param rows: Tuples of make, fuel type id, fuel consumption, mileage, efficiency and fuel type name.
+    :return: Total consumption, cost and mileage percentiles by fuel type and by make, computed car by car.
+    """
+    groups = {'by_fuel_type': defaultdict(list), 'by_make': defaultdict(list)}
+    for make, fuel_type_id, consumption, mileage, efficiency, _ in rows:
+        car = (float(consumption.replace(',', '.')), float(mileage), efficiency)
+        groups['by_fuel_type'][fuel_type_id].append(car)
+        groups['by_make'][make].append(car)
+    return {
+        name: {
+            key: (sum(consumption for consumption, _, _ in cars),
+                  sum(mileage * consumption / 100 / efficiency for consumption, mileage, efficiency in cars),
+                  [statistics.quantiles([mileage for _, mileage, _ in cars], n=100, method='inclusive')[p - 1]
+                   for p in MILEAGE_PERCENTILES])
+            for key, cars in grouped.items()
+        }
+        for name, grouped in groups.items()
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cars', type=int, default=100_000)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--uri', default=None, help='database uri, temporary sqlite file by default')
+    args = parser.parse_args()
+
+    directory = tempfile.TemporaryDirectory()
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = args.uri or f'sqlite:///{os.path.join(directory.name, "cars.db")}'
+    sa.init_app(app)
+
+    randomizer = random.Random(0)
+    with app.app_context():
+        sa.drop_all()
+        sa.create_all()
+        sa.session.add_all([FuelTypeModel(name='petrol', efficiency=0.89),
+                            FuelTypeModel(name='diesel', efficiency=0.95),
+                            FuelTypeModel(name='electric', efficiency=0.7),
+                            VehicleStatusModel(name='ready', description='Ready')])
+        for start in range(0, args.cars, BATCH):
+            sa.session.execute(insert(CarModel), [
+                {'registration': f'{number:07}', 'vin': f'{number:017}', 'make': randomizer.choice(MAKES),
+                 'model': 'MODEL', 'first_registration_date': date(2020, 1, 1), 'production_year': '2019',
+                 'mileage': str(randomizer.randrange(1000, 400_000)),
+                 'fuel_consumption': f'{randomizer.uniform(3, 15):.2f}', 'fuel_type_id': randomizer.randint(1, 3),
+                 'vehicle_status_id': 1}
+                for number in range(start, min(start + BATCH, args.cars))
+            ])
+        sa.session.commit()
+
+        rows = sa.session.execute(analytics_query()).all()
+
+        fetch = measure(lambda: sa.session.execute(analytics_query()).all(), args.repeats)
+        python = measure(lambda: python_metrics(rows), args.repeats)
+        numpy = measure(lambda: compute_metrics(parse_columns(rows)), args.repeats)
+
+        expected = python_metrics(rows)['by_fuel_type']
+        for group in compute_metrics(parse_columns(rows))['by_fuel_type']:
+            total, cost, percentiles = expected[group['fuel_type_id']]
+            assert abs(group['efficiency_weighted_cost'] - cost) < 0.01 * len(rows)
+            assert abs(group['mileage_percentiles']['p50'] - percentiles[1]) < 0.1
+
+        sa.drop_all()
+    directory.cleanup()
+
+    print(f'cars: {args.cars:,}, query: {fetch:.3f} s', file=sys.stdout)
+    print(f'Python, car by car: {python:8.3f} s ({args.cars / python:12,.0f} cars/s)', file=sys.stdout)
+    print(f'NumPy arrays:       {numpy:8.3f} s ({args.cars / numpy:12,.0f} cars/s)', file=sys.stdout)
+
+
+if __name__ == '__main__':
+    main()
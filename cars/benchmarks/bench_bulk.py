@@ -0,0 +1,71 @@
+"""
+Import of a lease batch of cars - one CarModel.save() (one commit) per car, as POST /car does, compared with
+one POST /cars/bulk request. HTTP round trips of the single-car import aren't included, so the real difference
+is bigger. Uses sqlite file by default, pass --uri to run against MySQL. Run from cars directory:
+
+    python -m benchmarks.bench_bulk --cars 5000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+from flask import Flask
+from flask_restful import Api
+
+from app.db.configuration import sa
+from app.db.model import CarModel, FuelTypeModel, VehicleStatusModel
+from app.route.car import CarsBulkResource
+
+
+def generate(cars: int, offset: int) -> list[dict]:
+    return [
+        {'registration': f'{number:07}', 'vin': f'{number:017}', 'make': 'BMW', 'model': 'SERIES 3',
+         'first_registration_date': '2020-01-01', 'production_year': '2019', 'mileage': '150000',
+         'fuel_consumption': '6.99', 'fuel_type_id': 1, 'vehicle_status_id': 1}
+        for number in range(offset, offset + cars)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cars', type=int, default=5000)
+    parser.add_argument('--uri', default=None, help='database uri, temporary sqlite file by default')
+    args = parser.parse_args()
+
+    directory = tempfile.TemporaryDirectory()
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = args.uri or f'sqlite:///{os.path.join(directory.name, "cars.db")}'
+    sa.init_app(app)
+    Api(app).add_resource(CarsBulkResource, '/cars/bulk')
+
+    with app.app_context():
+        sa.drop_all()
+        sa.create_all()
+        sa.session.add_all([FuelTypeModel(name='petrol', efficiency=0.89),
+                            VehicleStatusModel(name='ready', description='Ready')])
+        sa.session.commit()
+
+        start = time.perf_counter()
+        for car in generate(args.cars, 0):
+            CarModel(**{**car, 'first_registration_date': date.fromisoformat(car['first_registration_date'])}).save()
+        one_by_one = time.perf_counter() - start
+
+    client = app.test_client()
+    start = time.perf_counter()
+    response = client.post('/cars/bulk', json=generate(args.cars, args.cars))
+    bulk = time.perf_counter() - start
+    assert response.json['created'] == args.cars, response.json
+
+    with app.app_context():
+        sa.drop_all()
+    directory.cleanup()
+
+    print(f'one commit per car: {one_by_one:8.2f} s ({args.cars / one_by_one:10,.0f} cars/s)', file=sys.stdout)
+    print(f'POST /cars/bulk:    {bulk:8.2f} s ({args.cars / bulk:10,.0f} cars/s)', file=sys.stdout)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+Throughput and peak memory of /cars/export compared with loading all cars at once (CarModel.get_all()).
+
+Cars are generated into sqlite file for every size, then each measurement runs in fresh process, so peak RSS
+(ru_maxrss) of one run doesn't affect the others. Loading all cars is skipped for sizes above --max-get-all,
+because it needs gigabytes of memory. Run from cars directory:
+
+    python -m benchmarks.bench_export --sizes 10000 100000 1000000
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date
+
+from flask import Flask, make_response
+from flask_restful import Api
+from sqlalchemy import insert
+
+from app.db.configuration import sa
+from app.db.model import CarModel, FuelTypeModel, VehicleStatusModel
+from app.route.car import CarsExportResource
+
+BATCH = 10_000
+
+
+def create_app(database: str) -> Flask:
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{database}'
+    sa.init_app(app)
+    Api(app).add_resource(CarsExportResource, '/cars/export')
+    app.add_url_rule('/cars/get_all', 'get_all', lambda: make_response({'all_cars': CarModel.get_all()}))
+    return app
+
+
+def populate(database: str, size: int) -> None:
+    with create_app(database).app_context():
+        sa.create_all()
+        sa.session.add_all([FuelTypeModel(name='petrol', efficiency=0.89), VehicleStatusModel(name='ready',
+                                                                                              description='Ready')])
+        for start in range(0, size, BATCH):
+            sa.session.execute(insert(CarModel), [
+                {'registration': f'{number:07}', 'vin': f'{number:017}', 'make': 'BMW', 'model': 'SERIES 3',
+                 'first_registration_date': date(2020, 1, 1), 'production_year': '2019', 'mileage': '150000',
+                 'fuel_consumption': '6.99', 'fuel_type_id': 1, 'vehicle_status_id': 1}
+                for number in range(start, min(start + BATCH, size))
+            ])
+        sa.session.commit()
+
+
+def measure(database: str, path: str) -> None:
+    """
+    Runs in child process, prints duration, size of the body and growth of peak RSS as JSON.
+    """
+    app = create_app(database)
+    client = app.test_client()
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    response = client.get(path, buffered=False)
+    body_size = sum(len(chunk) for chunk in response.response)
+    response.close()
+    seconds = time.perf_counter() - start
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({'seconds': seconds, 'bytes': body_size, 'rss_growth_kb': peak - baseline, 'rss_kb': peak}))
+
+
+def run(database: str, path: str) -> dict:
+    output = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.bench_export', '--measure', database, path],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--max-get-all', type=int, default=100_000)
+    parser.add_argument('--measure', nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        measure(*args.measure)
+        return
+
+    print(f'{"rows":>9} {"endpoint":<26} {"rows/s":>10} {"MB/s":>7} {"peak RSS":>10} {"growth":>10}',
+          file=sys.stdout)
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            database = os.path.join(directory, f'cars_{size}.db')
+            populate(database, size)
+
+            paths = ['/cars/export', '/cars/export?format=json']
+            if size <= args.max_get_all:
+                paths.append('/cars/get_all')
+            for path in paths:
+                result = run(database, path)
+                print(f'{size:>9} {path:<26} {size / result["seconds"]:>10,.0f} '
+                      f'{result["bytes"] / result["seconds"] / 1024 / 1024:>7.1f} '
+                      f'{result["rss_kb"] / 1024:>7.1f} MB {result["rss_growth_kb"] / 1024:>7.1f} MB', file=sys.stdout)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""
+Latency of GET /cars/search at fleet size, with p99 checked against a target - the command fails when any kind
+of query is slower. Requests go through the whole Flask stack and read the page of matching cars from the
+database, LIKE queries of the same substrings (what the search would cost without the index) are measured for
+comparison. Uses sqlite file by default, pass --uri to run against MySQL. Run from cars directory:
+
+    python -m benchmarks.bench_search --cars 100000 --p99-ms 10
+"""
+import argparse
+import os
+import random
+import statistics
+import string
+import sys
+import tempfile
+import time
+from datetime import date
+
+from flask import Flask
+from flask_restful import Api
+from sqlalchemy import insert
+
+from app.db.configuration import sa
+from app.db.model import CarModel, FuelTypeModel, VehicleStatusModel, TableVersionModel, car_serializer
+from app.db.search_index import car_search_index
+from app.route.car import CarsSearchResource
+
+BATCH = 10_000
+MAKES = {'AUDI': ('A3', 'A4', 'Q5'), 'BMW': ('SERIES 3', 'SERIES 5', 'X5'), 'FORD': ('FOCUS', 'MONDEO'),
+         'ALFA ROMEO': ('GIULIA', 'STELVIO'), 'TOYOTA': ('COROLLA', 'YARIS'), 'SKODA': ('OCTAVIA', 'SUPERB')}
+
+
+def percentiles(durations: list[float]) -> tuple[float, float]:
+    """
+    :return: p50 and p99 of durations in milliseconds.
+    """
+    cuts = statistics.quantiles(durations, n=100, method='inclusive')
+    return cuts[49] * 1000, cuts[98] * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cars', type=int, default=100_000)
+    parser.add_argument('--queries', type=int, default=500, help='queries of every kind')
+    parser.add_argument('--p99-ms', type=float, default=10.0, help='target p99 latency of every kind of query')
+    parser.add_argument('--uri', default=None, help='database uri, temporary sqlite file by default')
+    args = parser.parse_args()
+
+    directory = tempfile.TemporaryDirectory()
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = args.uri or f'sqlite:///{os.path.join(directory.name, "cars.db")}'
+    sa.init_app(app)
+    Api(app).add_resource(CarsSearchResource, '/cars/search')
+
+    randomizer = random.Random(0)
+    alphabet = string.ascii_uppercase + string.digits
+    with app.app_context():
+        sa.drop_all()
+        sa.create_all()
+        sa.session.add_all([FuelTypeModel(name='petrol', efficiency=0.89),
+                            VehicleStatusModel(name='ready', description='Ready')])
+        cars = []
+        for number in range(args.cars):
+            make = randomizer.choice(list(MAKES))
+            cars.append({'registration': ''.join(randomizer.choices(alphabet, k=7)),
+                         'vin': ''.join(randomizer.choices(alphabet, k=12)) + f'{number:05}', 'make': make,
+                         'model': randomizer.choice(MAKES[make]), 'first_registration_date': date(2020, 1, 1),
+                         'production_year': '2019', 'mileage': '150000', 'fuel_consumption': '6.99',
+                         'fuel_type_id': 1, 'vehicle_status_id': 1})
+        cars = list({car['registration']: car for car in cars}.values())
+        for start in range(0, len(cars), BATCH):
+            sa.session.execute(insert(CarModel), cars[start:start + BATCH])
+        TableVersionModel.bump(CarModel.__tablename__)
+        sa.session.commit()
+
+    def sample(field: str, length: int, contains: bool) -> str:
+        value = randomizer.choice(cars)[field]
+        start = randomizer.randrange(len(value) - length + 1) if contains else 0
+        return value[start:start + length]
+
+    queries = {
+        'registration prefix (3)': lambda: f'registration={sample("registration", 3, False)}',
+        'registration contains (4)': lambda: f'registration={sample("registration", 4, True)}&match=contains',
+        'vin contains (6)': lambda: f'vin={sample("vin", 6, True)}&match=contains',
+        'make/model words': lambda: 'q=' + randomizer.choice(['BMW SER', 'ALFA', 'TOYOTA YAR', 'A4', 'SKODA']),
+    }
+
+    client = app.test_client()
+    start = time.perf_counter()
+    client.get('/cars/search?registration=A')
+    rebuild = time.perf_counter() - start
+
+    results, failed = {}, False
+    for kind, query in queries.items():
+        durations = []
+        for _ in range(args.queries):
+            url = f'/cars/search?limit=20&{query()}'
+            start = time.perf_counter()
+            response = client.get(url)
+            durations.append(time.perf_counter() - start)
+            assert response.status_code == 200 and response.json['cars'], (url, response.json)
+        results[kind] = percentiles(durations)
+
+    with app.app_context():
+        like = []
+        for _ in range(min(args.queries, 50)):
+            text = sample('registration', 4, True)
+            start = time.perf_counter()
+            car_serializer.as_dicts(sa.session.execute(
+                car_serializer.select().where(CarModel.registration.contains(text)).limit(21)
+            ))
+            like.append(time.perf_counter() - start)
+        car_search_index.invalidate()
+        sa.drop_all()
+    directory.cleanup()
+
+    print(f'cars: {len(cars):,}, index built by the first search in {rebuild:.2f} s', file=sys.stdout)
+    for kind, (p50, p99) in results.items():
+        verdict = 'ok' if p99 <= args.p99_ms else 'SLOWER THAN TARGET'
+        failed = failed or p99 > args.p99_ms
+        print(f'{kind:26} p50 {p50:7.2f} ms   p99 {p99:7.2f} ms   {verdict}', file=sys.stdout)
+    p50, p99 = percentiles(like)
+    print(f'{"LIKE %...% without index":26} p50 {p50:7.2f} ms   p99 {p99:7.2f} ms', file=sys.stdout)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
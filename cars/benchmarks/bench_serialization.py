@@ -0,0 +1,77 @@
+"""
+Serialization of GET /cars/all sized lists - loading CarModel objects and calling as_dict() on each of them,
+compared with RowSerializer building dictionaries straight from Core rows. Uses sqlite file by default, pass
+--uri to run against MySQL. Run from cars directory:
+
+    python -m benchmarks.bench_serialization --cars 100000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+from flask import Flask
+from sqlalchemy import insert
+
+from app.db.configuration import sa
+from app.db.model import CarModel, FuelTypeModel, VehicleStatusModel, car_serializer
+
+BATCH = 10_000
+
+
+def measure(function, repeats: int) -> float:
+    """
+    :return: Best duration of the function in seconds.
+    """
+    durations = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+        sa.session.expunge_all()
+    return min(durations)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cars', type=int, default=100_000)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--uri', default=None, help='database uri, temporary sqlite file by default')
+    args = parser.parse_args()
+
+    directory = tempfile.TemporaryDirectory()
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = args.uri or f'sqlite:///{os.path.join(directory.name, "cars.db")}'
+    sa.init_app(app)
+
+    with app.app_context():
+        sa.drop_all()
+        sa.create_all()
+        sa.session.add_all([FuelTypeModel(name='petrol', efficiency=0.89),
+                            VehicleStatusModel(name='ready', description='Ready')])
+        for start in range(0, args.cars, BATCH):
+            sa.session.execute(insert(CarModel), [
+                {'registration': f'{number:07}', 'vin': f'{number:017}', 'make': 'BMW', 'model': 'SERIES 3',
+                 'first_registration_date': date(2020, 1, 1), 'production_year': '2019', 'mileage': '150000',
+                 'fuel_consumption': '6.99', 'fuel_type_id': 1, 'vehicle_status_id': 1}
+                for number in range(start, min(start + BATCH, args.cars))
+            ])
+        sa.session.commit()
+
+        orm = measure(lambda: [car.as_dict() for car in sa.session.query(CarModel).order_by(CarModel.id)],
+                      args.repeats)
+        rows = measure(car_serializer.all, args.repeats)
+        assert car_serializer.all()[:100] == [car.as_dict() for car in CarModel.query.order_by(CarModel.id).limit(100)]
+
+        sa.drop_all()
+    directory.cleanup()
+
+    print(f'cars: {args.cars:,}', file=sys.stdout)
+    print(f'ORM objects + as_dict(): {orm:8.2f} s ({args.cars / orm:10,.0f} cars/s)', file=sys.stdout)
+    print(f'RowSerializer:           {rows:8.2f} s ({args.cars / rows:10,.0f} cars/s)', file=sys.stdout)
+
+
+if __name__ == '__main__':
+    main()
@@ -7,8 +7,15 @@ from flask_restful import Api
 
 from app.env_variables import TEST_SQLALCHEMY_DATABASE_URI, SQLALCHEMY_DATABASE_URI
 from app.db.configuration import sa
+from app.json.configuration import configure_json
 from app.db.model import FuelTypeModel, VehicleStatusModel
-from app.route.car import AllCarsResource, CarResource, CarResourceAdd
+from app.db.reference_cache import reference_cache
+from app.db.search_index import car_search_index
+from app.analytics.fuel import fuel_analytics
+from app.route.car import (
+    AllCarsResource, CarsSearchResource, CarsExportResource, CarsBulkResource, CarResource, CarResourceAdd
+)
+from app.route.analytics import FuelAnalyticsResource
 
 
 logging.basicConfig(level=logging.INFO)
@@ -43,11 +50,19 @@ def app():
             VehicleStatusModel(name='not_legal', description='Waiting for mot or insurance')
         ])
         sa.session.commit()
+        reference_cache.invalidate()
+        fuel_analytics.invalidate()
+        car_search_index.invalidate()
 
         api = Api(app)
         api.add_resource(AllCarsResource, '/cars/all')
+        api.add_resource(CarsSearchResource, '/cars/search')
+        api.add_resource(CarsExportResource, '/cars/export')
+        api.add_resource(CarsBulkResource, '/cars/bulk')
         api.add_resource(CarResource, '/car/<int:car_id>')
         api.add_resource(CarResourceAdd, '/car')
+        api.add_resource(FuelAnalyticsResource, '/cars/analytics/fuel')
+        configure_json(app, api)
 
     yield app
 
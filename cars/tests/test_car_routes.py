@@ -1,5 +1,8 @@
+import json
 import logging
 
+from app.db.model import FuelTypeModel, TableVersionModel, VehicleStatusModel
+
 logging.basicConfig(level=logging.INFO)
 
 def test_create_car_with_valid_data(client, car_data):
@@ -43,13 +46,16 @@ def test_crate_car_with_invalid_data(client, car_data):
      field to an invalid value.
 
     The method then asserts that the response status code is 400 (Bad Request) and
-    the response JSON is `{'message': "Invalid request"}`.
+    the response JSON is `{'message': "Invalid request"}` with every violated rule under `errors`.
     """
     invalid_car_data = {**car_data}
     invalid_car_data.update({"registration": "DPL96RR R"})
     response = client.post("/car", json=invalid_car_data)
     assert response.status_code == 400
-    assert response.json == {'message': "Invalid request"}
+    assert response.json == {'message': "Invalid request", 'errors': [
+        {'field': 'registration', 'rule': 'max_len', 'message': 'length has to be at most 7'},
+        {'field': 'registration', 'rule': 'regex', 'message': 'has to match ^[A-Z0-9]{7}$'}
+    ]}
 
 
 def test_get_one_by_id(client, car_data, desired_response_data):
@@ -118,7 +124,63 @@ def test_get_all_cars(client, car_data, desired_response_data):
     client.post("/car", json=car_data)
     response = client.get("/cars/all")
     assert response.status_code == 200
-    assert response.json == {"all_cars": [desired_response_data]}
+    assert response.json == {"all_cars": [desired_response_data], "next_cursor": None}
+
+
+def test_get_all_cars_is_paginated_by_cursor(client, car_data):
+    """
+    Test that /cars/all returns pages of requested size and next_cursor leads to the following page.
+
+    :param client: The test client for making HTTP requests.
+    :param car_data: The JSON data of the car to be posted.
+    :return: None
+    """
+    for number in range(5):
+        client.post("/car", json={**car_data, "registration": f"DPL96R{number}", "vin": f"12AASL45J0123412{number}"})
+
+    first_page = client.get("/cars/all?limit=2&fields=id")
+    assert first_page.json == {"all_cars": [{"id": 1}, {"id": 2}], "next_cursor": 2}
+
+    second_page = client.get(f"/cars/all?limit=2&fields=id&cursor={first_page.json['next_cursor']}")
+    assert second_page.json == {"all_cars": [{"id": 3}, {"id": 4}], "next_cursor": 4}
+
+    last_page = client.get("/cars/all?limit=2&fields=id&cursor=4")
+    assert last_page.json == {"all_cars": [{"id": 5}], "next_cursor": None}
+
+
+def test_get_all_cars_with_filters_and_fields(client, car_data):
+    """
+    Test that /cars/all filters cars on the server side and returns only requested fields.
+
+    :param client: The test client for making HTTP requests.
+    :param car_data: The JSON data of the car to be posted.
+    :return: None
+    """
+    client.post("/car", json=car_data)
+    client.post("/car", json={**car_data, "registration": "DPL00AA", "vin": "12AASL45J01234000", "make": "AUDI",
+                              "production_year": "2015", "fuel_type_id": 2})
+
+    response = client.get("/cars/all?make=BMW&fields=registration,make")
+    assert response.json == {"all_cars": [{"registration": "DPL96RR", "make": "BMW"}], "next_cursor": None}
+
+    response = client.get("/cars/all?production_year_from=2010&production_year_to=2020&fields=registration")
+    assert response.json == {"all_cars": [{"registration": "DPL00AA"}], "next_cursor": None}
+
+    response = client.get("/cars/all?fuel_type_id=1&vehicle_status_id=2&fields=registration")
+    assert response.json == {"all_cars": [{"registration": "DPL96RR"}], "next_cursor": None}
+
+
+def test_get_all_cars_with_invalid_query(client):
+    """
+    Test that invalid limit, cursor or unknown field are rejected.
+
+    :param client: The test client for making HTTP requests.
+    :return: None
+    """
+    for query in ("limit=0", "limit=100000", "cursor=abc", "fields=id,password", "fuel_type_id=diesel"):
+        response = client.get(f"/cars/all?{query}")
+        assert response.status_code == 400
+        assert response.json == {"message": "Invalid request"}
 
 
 def test_update_car_by_id(client, car_data, desired_response_data):
@@ -149,7 +211,10 @@ def test_update_car_by_id_with_bad_data(client, car_data):
     client.post('/car/1', json=car_data)
     response = client.patch("/car/1", json={**car_data, 'registration': 'DDD0000 0'}) # regex won't match
     assert response.status_code == 400
-    assert response.json == {"message": "Invalid request"}
+    assert response.json == {"message": "Invalid request", "errors": [
+        {'field': 'registration', 'rule': 'max_len', 'message': 'length has to be at most 7'},
+        {'field': 'registration', 'rule': 'regex', 'message': 'has to match ^[A-Z0-9]{7}$'}
+    ]}
 
 
 def test_update_car_by_id_when_not_exists(client, car_data):
@@ -167,3 +232,274 @@ def test_update_car_by_id_when_not_exists(client, car_data):
     response = client.patch("/car/1", json=car_data)
     assert response.status_code == 404
     assert response.json == {"message": "Car does not exist"}
+
+
+def test_export_cars_as_ndjson(client, car_data, desired_response_data):
+    """
+    Test that /cars/export streams one JSON document per car.
+
+    :param client: The test client for making HTTP requests.
+    :param car_data: The JSON data of the car to be posted.
+    :param desired_response_data: The expected JSON data of the desired car response.
+    :return: None
+    """
+    client.post("/car", json=car_data)
+    client.post("/car", json={**car_data, "registration": "DPL00AA", "vin": "12AASL45J01234000"})
+
+    response = client.get("/cars/export")
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    assert response.is_streamed
+    assert [json.loads(line) for line in response.data.decode().splitlines()] == [
+        desired_response_data,
+        {**desired_response_data, "id": 2, "registration": "DPL00AA", "vin": "12AASL45J01234000"}
+    ]
+
+
+def test_export_cars_as_json(client, car_data, desired_response_data):
+    """
+    Test that /cars/export?format=json streams document in the shape of /cars/all.
+
+    :param client: The test client for making HTTP requests.
+    :param car_data: The JSON data of the car to be posted.
+    :param desired_response_data: The expected JSON data of the desired car response.
+    :return: None
+    """
+    assert client.get("/cars/export?format=json").json == {"all_cars": []}
+
+    client.post("/car", json=car_data)
+    assert client.get("/cars/export?format=json").json == {"all_cars": [desired_response_data]}
+    assert client.get("/cars/export?format=xml").status_code == 400
+
+
+def test_bulk_create_cars(client, car_data):
+    """
+    Test that /cars/bulk creates valid cars and reports invalid and conflicting ones under their index.
+
+    :param client: The test client for making HTTP requests.
+    :param car_data: The JSON data of the car to be posted.
+    :return: None
+    """
+    client.post("/car", json=car_data)
+    cars = [
+        {**car_data, "registration": "DPL00AA", "vin": "12AASL45J01234000"},
+        {**car_data, "registration": "DPL00AB"},
+        {**car_data, "registration": "dpl00ac", "vin": "12AASL45J01234002"},
+        {**car_data, "registration": "DPL00AA", "vin": "12AASL45J01234003"},
+        {**car_data, "registration": "DPL00AD", "vin": "12AASL45J01234004"},
+    ]
+
+    response = client.post("/cars/bulk", json=cars)
+
+    assert response.status_code == 200
+    assert response.json == {
+        "results": [
+            {"index": 0, "status": "created", "id": 2},
+            {"index": 1, "status": "conflict", "message": "Duplicate entry '12AASL45J01234122' for key 'cars.vin'"},
+            {"index": 2, "status": "invalid", "message": "Invalid request", "errors": [
+                {"field": "registration", "rule": "regex", "message": "has to match ^[A-Z0-9]{7}$"}
+            ]},
+            {"index": 3, "status": "conflict", "message": "Duplicate entry 'DPL00AA' for key 'cars.registration'"},
+            {"index": 4, "status": "created", "id": 3},
+        ],
+        "created": 2,
+        "updated": 0,
+        "failed": 3
+    }
+    assert client.get("/car/3").json["registration"] == "DPL00AD"
+
+
+def test_bulk_create_cars_reports_errors_of_invalid_cars(client, car_data):
+    """
+    Test that every invalid car of /cars/bulk gets its own violated rules, whether it isn't an object, doesn't meet
+    car_schema, refers to unknown fuel type or has first_registration_date which isn't a date.
+
+    :param client: The test client for making HTTP requests.
+    :param car_data: The JSON data of the car to be posted.
+    :return: None
+    """
+    cars = [
+        "DPL96RR",
+        {**car_data, "mileage": 15000},
+        {**car_data, "fuel_type_id": 4},
+        {**car_data, "first_registration_date": "2024-13-01"},
+    ]
+
+    response = client.post("/cars/bulk", json=cars)
+
+    assert response.status_code == 200
+    assert [result["errors"] for result in response.json["results"]] == [
+        [{"field": "$", "rule": "type", "message": "has to be an object"}],
+        [{"field": "mileage", "rule": "type", "message": "has to be str"}],
+        [{"field": "fuel_type_id", "rule": "exists", "message": "Fuel type 4 doesn't exist"}],
+        [{"field": "first_registration_date", "rule": "date", "message": "has to be a date in format YYYY-MM-DD"}],
+    ]
+    assert response.json["failed"] == 4
+
+
+def test_bulk_upsert_cars_from_ndjson(client, car_data):
+    """
+    Test that in upsert mode car with existing vin is updated and new car is created.
+
+    :param client: The test client for making HTTP requests.
+    :param car_data: The JSON data of the car to be posted.
+    :return: None
+    """
+    client.post("/car", json=car_data)
+    cars = [
+        {**car_data, "mileage": "20000"},
+        {**car_data, "registration": "DPL00AA", "vin": "12AASL45J01234000"},
+    ]
+    body = "\n".join(json.dumps(car) for car in cars)
+
+    response = client.post("/cars/bulk?mode=upsert", data=body, content_type="application/x-ndjson")
+
+    assert response.json["results"] == [
+        {"index": 0, "status": "updated", "id": 1},
+        {"index": 1, "status": "created", "id": 2},
+    ]
+    assert client.get("/car/1").json["mileage"] == "20000"
+    assert client.post("/cars/bulk?mode=merge", json=cars).status_code == 400
+    assert client.post("/cars/bulk", json={"cars": cars}).status_code == 400
+
+
+def test_get_all_cars_matches_single_car_serialization(client, car_data):
+    """
+    Test that cars listed from plain rows are serialized the same way as a single car loaded as ORM object.
+
+    :param client: The test client for making HTTP requests.
+    :param car_data: The JSON data of the car to be posted.
+    :return: None
+    """
+    client.post("/car", json=car_data)
+    client.post("/car", json={**car_data, "registration": "DPL00AA", "vin": "12AASL45J01234000"})
+
+    all_cars = client.get("/cars/all").json["all_cars"]
+
+    assert all_cars == [client.get(f"/car/{car['id']}").json for car in all_cars]
+
+
+def test_get_all_cars_is_conditional(client, car_data):
+    """
+    Test that list of cars carries ETag, which answers If-None-Match with 304 until cars table changes.
+
+    :param client: The test client for making HTTP requests.
+    :param car_data: The JSON data of the car to be posted.
+    :return: None
+    """
+    client.post("/car", json=car_data)
+    response = client.get("/cars/all")
+    etag = response.headers["ETag"]
+
+    not_modified = client.get("/cars/all", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.headers["ETag"] == etag
+    assert not_modified.data == b""
+
+    client.patch("/car/1", json={"mileage": "20000"})
+    modified = client.get("/cars/all", headers={"If-None-Match": etag})
+    assert modified.status_code == 200
+    assert modified.headers["ETag"] != etag
+    assert modified.json["all_cars"][0]["mileage"] == "20000"
+
+
+def test_get_car_is_conditional(client, car_data):
+    """
+    Test that car carries ETag shared with the rest of cars table and that missing car has none.
+
+    :param client: The test client for making HTTP requests.
+    :param car_data: The JSON data of the car to be posted.
+    :return: None
+    """
+    client.post("/car", json=car_data)
+    etag = client.get("/car/1").headers["ETag"]
+
+    assert client.get("/car/1", headers={"If-None-Match": etag}).status_code == 304
+    assert "ETag" not in client.get("/car/2").headers
+
+    client.post("/cars/bulk", json=[{**car_data, "registration": "DPL00AA", "vin": "12AASL45J01234000"}])
+    assert client.get("/car/1", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_table_version_row_is_created_by_first_write(app):
+    """
+    Test that the first write to a table without version row creates it and that following writes increment it.
+
+    :param app: The Flask application instance.
+    :return: None
+    """
+    with app.app_context():
+        assert TableVersionModel.versions(("fuel_type", "vehicle_status")) == {"fuel_type": 0, "vehicle_status": 0}
+
+        FuelTypeModel(name="lpg", efficiency=0.8).save()
+        FuelTypeModel(name="hydrogen", efficiency=0.6).save()
+        VehicleStatusModel(name="sold", description="Sold to another owner").save()
+
+        assert TableVersionModel.versions(("fuel_type", "vehicle_status")) == {"fuel_type": 2, "vehicle_status": 1}
+
+
+def test_get_cars_with_expanded_references(client, car_data):
+    """
+    Test that expand adds names of fuel type and vehicle status to car, list of cars and export.
+
+    :param client: The test client for making HTTP requests.
+    :param car_data: The JSON data of the car to be posted.
+    :return: None
+    """
+    client.post("/car", json=car_data)
+    names = {"fuel_type_name": "petrol", "vehicle_status_name": "repair"}
+
+    car = client.get("/car/1?expand=fuel_type,vehicle_status").json
+    assert {key: car[key] for key in names} == names
+    assert client.get("/cars/all?expand=fuel_type,vehicle_status").json["all_cars"] == [car]
+    assert json.loads(client.get("/cars/export?expand=fuel_type,vehicle_status").data) == car
+
+    only_fuel_type = client.get("/cars/all?expand=fuel_type&fields=fuel_type_id").json["all_cars"]
+    assert only_fuel_type == [{"fuel_type_id": 1, "fuel_type_name": "petrol"}]
+    assert client.get("/cars/all?expand=owner").status_code == 400
+
+
+def test_create_car_with_unknown_references(client, car_data):
+    """
+    Test that car referring to fuel type or vehicle status that doesn't exist is rejected, and that fuel type
+    added later is accepted without waiting for the reference cache to expire.
+
+    :param client: The test client for making HTTP requests.
+    :param car_data: The JSON data of the car to be posted.
+    :return: None
+    """
+    for reference, message in (({"fuel_type_id": 4}, "Fuel type 4 doesn't exist"),
+                               ({"vehicle_status_id": 4}, "Vehicle status 4 doesn't exist")):
+        response = client.post("/car", json={**car_data, **reference})
+        assert response.status_code == 400
+        field, = reference
+        assert response.json == {"message": "Invalid request", "errors": [
+            {"field": field, "rule": "exists", "message": message}
+        ]}
+
+    etag = client.get("/cars/all").headers["ETag"]
+    with client.application.app_context():
+        FuelTypeModel(name="lpg", efficiency=0.8).save()
+
+    assert client.post("/car", json={**car_data, "fuel_type_id": 4}).status_code == 201
+    assert client.get("/car/1?expand=fuel_type").json["fuel_type_name"] == "lpg"
+    assert client.get("/cars/all", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_create_car_with_missing_or_unknown_fields(client, car_data):
+    """
+    Test that car without one of its fields, with a field the car doesn't have or without JSON body is rejected.
+
+    :param client: The test client for making HTTP requests.
+    :param car_data: The JSON data of the car to be posted.
+    :return: None
+    """
+    missing_vin = {key: value for key, value in car_data.items() if key != "vin"}
+    for response, error in (
+            (client.post("/car", json=missing_vin), {"field": "vin", "rule": "required", "message": "is required"}),
+            (client.post("/car", json={**car_data, "owner": "Jan"}),
+             {"field": "owner", "rule": "unknown", "message": "is not allowed"}),
+            (client.post("/car", data="registration=DPL96RR"),
+             {"field": "$", "rule": "type", "message": "has to be an object"})):
+        assert response.status_code == 400
+        assert response.json == {"message": "Invalid request", "errors": [error]}
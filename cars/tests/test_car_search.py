@@ -0,0 +1,87 @@
+def _car(car_data, registration, vin, make="BMW", model="SERIES 3"):
+    return {**car_data, "registration": registration, "vin": vin, "make": make, "model": model}
+
+
+def _registrations(response):
+    return [car["registration"] for car in response.json["cars"]]
+
+
+def test_search_cars_by_registration_and_vin(client, car_data):
+    """
+    Test prefix and substring search of registration and vin.
+
+    :param client: The test client for making HTTP requests.
+    :param car_data: The JSON data of the car to be posted.
+    :return: None
+    """
+    client.post("/car", json=_car(car_data, "WX12345", "WAUZZZ8K9BA000001"))
+    client.post("/car", json=_car(car_data, "WX99123", "WBA3A5C50DF000002"))
+    client.post("/car", json=_car(car_data, "KR12300", "VF1RFB00000000003"))
+
+    assert _registrations(client.get("/cars/search?registration=wx")) == ["WX12345", "WX99123"]
+    assert _registrations(client.get("/cars/search?registration=123&match=contains")) == \
+           ["WX12345", "WX99123", "KR12300"]
+    assert _registrations(client.get("/cars/search?registration=12&match=contains")) == \
+           ["WX12345", "WX99123", "KR12300"]
+    assert _registrations(client.get("/cars/search?registration=123&match=contains&vin=WB")) == ["WX99123"]
+    assert _registrations(client.get("/cars/search?vin=00003&match=contains")) == ["KR12300"]
+    assert _registrations(client.get("/cars/search?registration=123")) == []
+
+
+def test_search_cars_by_make_and_model_tokens(client, car_data):
+    """
+    Test that every word of q has to prefix some word of make or model, and that results are paginated.
+
+    :param client: The test client for making HTTP requests.
+    :param car_data: The JSON data of the car to be posted.
+    :return: None
+    """
+    client.post("/car", json=_car(car_data, "AAA0001", "AAAAAAAAAAAAAAA01", "BMW", "SERIES 3"))
+    client.post("/car", json=_car(car_data, "AAA0002", "AAAAAAAAAAAAAAA02", "BMW", "X5"))
+    client.post("/car", json=_car(car_data, "AAA0003", "AAAAAAAAAAAAAAA03", "ALFA ROMEO", "GIULIA"))
+
+    assert _registrations(client.get("/cars/search?q=bmw")) == ["AAA0001", "AAA0002"]
+    assert _registrations(client.get("/cars/search?q=bmw ser")) == ["AAA0001"]
+    assert _registrations(client.get("/cars/search?q=romeo")) == ["AAA0003"]
+
+    first_page = client.get("/cars/search?q=bmw&limit=1").json
+    assert [car["id"] for car in first_page["cars"]] == [1]
+    assert first_page["next_cursor"] == 1
+    last_page = client.get(f"/cars/search?q=bmw&limit=1&cursor={first_page['next_cursor']}").json
+    assert [car["id"] for car in last_page["cars"]] == [2]
+    assert last_page["next_cursor"] is None
+
+
+def test_search_index_follows_writes(client, car_data):
+    """
+    Test that updated, deleted and bulk created cars are found the same way as with fresh index.
+
+    :param client: The test client for making HTTP requests.
+    :param car_data: The JSON data of the car to be posted.
+    :return: None
+    """
+    client.post("/car", json=_car(car_data, "WX12345", "WAUZZZ8K9BA000001"))
+    assert _registrations(client.get("/cars/search?registration=WX")) == ["WX12345"]
+
+    client.patch("/car/1", json={"registration": "KR54321"})
+    assert _registrations(client.get("/cars/search?registration=WX")) == []
+    assert _registrations(client.get("/cars/search?registration=KR")) == ["KR54321"]
+
+    client.post("/cars/bulk", json=[_car(car_data, "KR00001", "WAUZZZ8K9BA000002")])
+    assert _registrations(client.get("/cars/search?registration=KR")) == ["KR54321", "KR00001"]
+
+    client.delete("/car/1")
+    assert _registrations(client.get("/cars/search?registration=KR")) == ["KR00001"]
+
+
+def test_search_cars_with_invalid_query(client):
+    """
+    Test that search without criteria or with invalid parameters returns 400.
+
+    :param client: The test client for making HTTP requests.
+    :return: None
+    """
+    for query in ("", "q=%20", "registration=WX&match=regex", "registration=WX&limit=0", "vin=W&cursor=abc"):
+        response = client.get(f"/cars/search?{query}")
+        assert response.status_code == 400
+        assert response.json == {"message": "Invalid request"}
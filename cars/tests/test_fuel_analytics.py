@@ -0,0 +1,74 @@
+import numpy as np
+
+
+def _car(car_data, number, **fields):
+    return {**car_data, "registration": f"DPL{number:04}", "vin": f"12AASL45J0123{number:04}", **fields}
+
+
+def test_fuel_analytics_of_empty_fleet(client):
+    """
+    Test that fleet without cars has zeroed metrics and no groups.
+
+    :param client: The test client for making HTTP requests.
+    :return: None
+    """
+    response = client.get("/cars/analytics/fuel")
+    assert response.status_code == 200
+    assert response.json["fleet"]["cars"] == 0
+    assert response.json["by_fuel_type"] == []
+    assert response.json["by_make"] == []
+
+
+def test_fuel_analytics_by_fuel_type_and_make(client, car_data):
+    """
+    Test metrics of groups against values computed car by car.
+
+    :param client: The test client for making HTTP requests.
+    :param car_data: The JSON data of the car to be posted.
+    :return: None
+    """
+    cars = [
+        _car(car_data, 1, make="BMW", fuel_type_id=1, mileage="10000", fuel_consumption="6.5"),
+        _car(car_data, 2, make="BMW", fuel_type_id=2, mileage="20000", fuel_consumption="5,5"),
+        _car(car_data, 3, make="AUDI", fuel_type_id=1, mileage="30000", fuel_consumption="8"),
+        _car(car_data, 4, make="AUDI", fuel_type_id=1, mileage="50000", fuel_consumption="7.25"),
+    ]
+    assert client.post("/cars/bulk", json=cars).status_code == 200
+
+    metrics = client.get("/cars/analytics/fuel").json
+    assert metrics["fleet"]["cars"] == 4
+    assert metrics["fleet"]["total_consumption"] == 27.25
+
+    petrol, diesel = metrics["by_fuel_type"]
+    assert (petrol["fuel_type_name"], petrol["cars"], diesel["fuel_type_name"], diesel["cars"]) == \
+           ("petrol", 3, "diesel", 1)
+    assert petrol["mean_consumption"] == round((6.5 + 8 + 7.25) / 3, 2)
+    assert petrol["efficiency_weighted_cost"] == round((100 * 6.5 + 300 * 8 + 500 * 7.25) / 0.89, 2)
+    assert diesel["efficiency_weighted_cost"] == round(200 * 5.5 / 0.95, 2)
+    assert petrol["mileage_percentiles"] == {
+        f"p{percentile}": round(float(np.percentile([10000, 30000, 50000], percentile)), 1)
+        for percentile in (25, 50, 75, 90)
+    }
+
+    assert [(make["make"], make["cars"], make["total_consumption"]) for make in metrics["by_make"]] == \
+           [("AUDI", 2, 15.25), ("BMW", 2, 12.0)]
+
+
+def test_fuel_analytics_are_recomputed_after_write(client, car_data):
+    """
+    Test that cached metrics change together with ETag after a car is updated.
+
+    :param client: The test client for making HTTP requests.
+    :param car_data: The JSON data of the car to be posted.
+    :return: None
+    """
+    client.post("/car", json=car_data)
+    response = client.get("/cars/analytics/fuel")
+    etag = response.headers["ETag"]
+    assert response.json["fleet"]["total_consumption"] == 6.99
+    assert client.get("/cars/analytics/fuel", headers={"If-None-Match": etag}).status_code == 304
+
+    client.patch("/car/1", json={"fuel_consumption": "7.5"})
+    response = client.get("/cars/analytics/fuel", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json["fleet"]["total_consumption"] == 7.5
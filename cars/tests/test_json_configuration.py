@@ -0,0 +1,64 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from flask import Flask
+
+from app.json.configuration import JSON_PROVIDER_CLASS, ORJSON_AVAILABLE, OrjsonProvider, StdlibJSONProvider
+
+PAYLOAD = {
+    'all_cars': [{'id': 1, 'first_registration_date': date(2020, 1, 2), 'fuel_consumption': Decimal('6.99')}],
+    'generated_at': datetime(2024, 5, 6, 7, 8, 9)
+}
+
+
+def test_configured_provider(app):
+    """
+    Test that the app uses orjson provider when orjson is installed.
+
+    :param app: The Flask application instance.
+    :return: None
+    """
+    assert isinstance(app.json, JSON_PROVIDER_CLASS)
+    assert JSON_PROVIDER_CLASS is (OrjsonProvider if ORJSON_AVAILABLE else StdlibJSONProvider)
+
+
+@pytest.mark.parametrize('provider_class', [
+    StdlibJSONProvider,
+    pytest.param(OrjsonProvider, marks=pytest.mark.skipif(not ORJSON_AVAILABLE, reason='orjson is not installed'))
+])
+def test_providers_encode_the_same_way(provider_class):
+    """
+    Test that both providers encode dates in ISO format and produce the same document.
+
+    :param provider_class: Tested provider.
+    :return: None
+    """
+    app = Flask(__name__)
+    provider = provider_class(app)
+
+    response = provider.response(PAYLOAD)
+
+    assert response.mimetype == 'application/json'
+    assert json.loads(response.get_data()) == {
+        'all_cars': [{'id': 1, 'first_registration_date': '2020-01-02', 'fuel_consumption': '6.99'}],
+        'generated_at': '2024-05-06T07:08:09'
+    }
+    assert provider.loads(provider.dumps(PAYLOAD)) == json.loads(response.get_data())
+
+
+def test_resource_results_are_encoded_by_provider(client, car_data):
+    """
+    Test that results of Flask-RESTful resources go through the app JSON provider, with status code kept.
+
+    :param client: The test client for making HTTP requests.
+    :param car_data: The JSON data of the car to be posted.
+    :return: None
+    """
+    response = client.post("/car", json=car_data)
+
+    assert response.status_code == 201
+    assert response.mimetype == 'application/json'
+    assert response.get_data(as_text=True).endswith('}\n')
+    assert response.json == {**car_data, 'id': 1}
@@ -0,0 +1,145 @@
+import pytest
+
+from app.validator.car import car_schema
+from app.validator.configuration import FieldError, Schema, ValidationError
+
+SCHEMA = Schema({
+    'registration': {'type': str, 'min_len': 7, 'max_len': 7, 'regex': r'^[A-Z0-9]{7}$'},
+    'status': {'type': int, '>=': 1, '<=': 3},
+    'active': {'type': bool},
+})
+
+
+def test_schema_reports_all_violated_rules():
+    """
+    Test that full object is checked for every rule, missing and unknown field, not only up to the first error.
+
+    :return: None
+    """
+    assert SCHEMA.errors({'registration': 'DPL96RR', 'status': 2, 'active': True}) == []
+    assert SCHEMA.errors({'registration': 'dpl96', 'status': True, 'owner': 'Jan'}) == [
+        FieldError('registration', 'min_len', 'length has to be at least 7'),
+        FieldError('registration', 'regex', 'has to match ^[A-Z0-9]{7}$'),
+        FieldError('status', 'type', 'has to be int'),
+        FieldError('active', 'required', 'is required'),
+        FieldError('owner', 'unknown', 'is not allowed'),
+    ]
+    assert SCHEMA.errors(['DPL96RR']) == [FieldError('$', 'type', 'has to be an object')]
+
+
+def test_schema_validates_partial_object():
+    """
+    Test that partial object is checked only in fields it has and that errors are raised as ValueError.
+
+    :return: None
+    """
+    SCHEMA.validate({'status': 3, 'owner': 'Jan'}, partial=True)
+    with pytest.raises(ValueError) as error:
+        SCHEMA.validate({'status': 4}, partial=True)
+    assert isinstance(error.value, ValidationError)
+    assert error.value.as_list() == [{'field': 'status', 'rule': '<=', 'message': 'has to be <= 3'}]
+    assert str(error.value) == 'status: has to be <= 3'
+
+
+def test_schema_rejects_unsupported_rules():
+    """
+    Test that schema with rule or type it doesn't support fails when it is created.
+
+    :return: None
+    """
+    with pytest.raises(ValueError):
+        Schema({'registration': {'type': str, 'starts_with': 'D'}})
+    with pytest.raises(ValueError):
+        Schema({'registration': {'type': list}})
+
+
+def test_schema_regex_is_matched_from_start_of_value():
+    """
+    Test that value of the right length is still rejected when regex doesn't match it.
+
+    :return: None
+    """
+    assert SCHEMA.errors({'registration': 'dpl96rr'}, partial=True) == [
+        FieldError('registration', 'regex', 'has to match ^[A-Z0-9]{7}$')
+    ]
+    assert Schema({'code': {'type': str, 'regex': r'[0-9]+'}}).errors({'code': '12ab'}) == []
+    assert Schema({'code': {'type': str, 'regex': r'[0-9]+'}}).errors({'code': 'ab12'}) == [
+        FieldError('code', 'regex', 'has to match [0-9]+')
+    ]
+
+
+def test_schema_checks_exact_types():
+    """
+    Test that values are not converted - bool is not int, int is not float, nested objects and strings are not
+    accepted in place of other types - and that other rules are skipped for a value of wrong type.
+
+    :return: None
+    """
+    schema = Schema({'count': {'type': int, '>': 0}, 'price': {'type': float, '<': 100.0}, 'active': {'type': bool}})
+    assert schema.errors({'count': 1, 'price': 9.99, 'active': False}) == []
+    assert schema.errors({'count': False, 'price': 10, 'active': 'true'}) == [
+        FieldError('count', 'type', 'has to be int'),
+        FieldError('price', 'type', 'has to be float'),
+        FieldError('active', 'type', 'has to be bool'),
+    ]
+    assert schema.errors({'count': {'value': 1}, 'price': [1.0], 'active': 1}) == [
+        FieldError('count', 'type', 'has to be int'),
+        FieldError('price', 'type', 'has to be float'),
+        FieldError('active', 'type', 'has to be bool'),
+    ]
+
+
+def test_schema_checks_comparisons_and_allowed_values():
+    """
+    Test boundaries of strict comparisons and one_of rule.
+
+    :return: None
+    """
+    schema = Schema({'count': {'type': int, '>': 0, '<': 10}, 'fuel': {'type': str, 'one_of': ['diesel', 'petrol']}})
+    assert schema.errors({'count': 9, 'fuel': 'diesel'}) == []
+    assert schema.errors({'count': 0, 'fuel': 'gas'}) == [
+        FieldError('count', '>', 'has to be > 0'),
+        FieldError('fuel', 'one_of', "has to be one of ['diesel', 'petrol']"),
+    ]
+    assert schema.errors({'count': 10}, partial=True) == [FieldError('count', '<', 'has to be < 10')]
+
+
+def test_schema_treats_none_as_missing_field():
+    """
+    Test that None is required error in full object and is skipped in partial object.
+
+    :return: None
+    """
+    assert SCHEMA.errors({'registration': None, 'status': 1, 'active': True}) == [
+        FieldError('registration', 'required', 'is required')
+    ]
+    assert SCHEMA.errors({'registration': None}, partial=True) == []
+    assert SCHEMA.errors({}, partial=True) == []
+
+
+def test_schema_validates_many_objects():
+    """
+    Test that errors of every object are returned in order of the objects.
+
+    :return: None
+    """
+    assert SCHEMA.validate_many([
+        {'registration': 'DPL96RR', 'status': 1, 'active': True},
+        {'registration': 'DPL96RR', 'status': 5, 'active': True},
+        None,
+    ]) == [
+        [],
+        [FieldError('status', '<=', 'has to be <= 3')],
+        [FieldError('$', 'type', 'has to be an object')],
+    ]
+
+
+def test_car_schema(car_data):
+    """
+    Test that car from fixture is valid and that fuel_type_id is the type declared in car_schema.
+
+    :param car_data: The JSON data of a car.
+    :return: None
+    """
+    car_schema.validate(car_data)
+    assert [error.rule for error in car_schema.errors({**car_data, 'fuel_type_id': '1'})] == ['type']
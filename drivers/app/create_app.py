@@ -5,6 +5,7 @@ from flask_restful import Api
 
 from app.env_variables import SQLALCHEMY_DATABASE_URI
 from app.db.configuration import sa
+from app.json.configuration import configure_json
 from app.routes.driver import DriverEndPointsMapper
 
 app = Flask(__name__)
@@ -47,6 +48,7 @@ def main() -> Flask:
     # -------------------------------------------------------------
     api = Api(app)
     DriverEndPointsMapper(api).init_endpoints()
+    configure_json(app, api)
 
     # -------------------------------------------------------------
     # MIGRATION CONFIGURATION
@@ -1,5 +1,40 @@
 from typing import Self, Any
+from sqlalchemy import select, update
+
 from app.db.configuration import sa
+from app.db.serialization import RowSerializer
+
+
+class TableVersionModel(sa.Model):
+    """
+    Change counter of a table. It is incremented in the same transaction as every write made through save(),
+    update() and delete() of the table's model, so reading it is a cheap validator of the whole table - one
+    primary key lookup instead of reading the rows. Used for ETags of GET endpoints.
+    """
+    __tablename__ = 'table_versions'
+
+    name = sa.Column(sa.String(64), primary_key=True)
+    version = sa.Column(sa.BigInteger, nullable=False, default=0)
+
+    @classmethod
+    def bump(cls, name: str) -> None:
+        """
+        Increments version of the table in current transaction, caller commits it together with the change.
+
+        :param name: Name of the table.
+        :return: None
+        """
+        bumped = sa.session.execute(update(cls).where(cls.name == name).values(version=cls.version + 1))
+        if not bumped.rowcount:
+            sa.session.add(cls(name=name, version=1))
+
+    @classmethod
+    def current(cls, name: str) -> int:
+        """
+        :param name: Name of the table.
+        :return: Version of the table, 0 if it has never been changed.
+        """
+        return sa.session.execute(select(cls.version).where(cls.name == name)).scalar() or 0
 
 
 class DriverModel(sa.Model):
@@ -24,7 +59,7 @@ class DriverModel(sa.Model):
         - `delete() -> None`: Deletes the current driver instance from the database.
         - `update(data: dict[str, Any]) -> None`: Updates the driver's attributes with the provided data dictionary and saves the changes to the database.
         - `get_by_id(driver_id: int) -> Self`: Returns the driver instance with the specified ID.
-        - `get_all() -> list[Self]`: Returns a list of all drivers in the database.
+        - `get_all() -> list[dict[str, Any]]`: Returns a list of all drivers in the database as dictionaries.
 
     """
     __tablename__ = 'drivers'
@@ -65,6 +100,7 @@ class DriverModel(sa.Model):
         :return: None
         """
         sa.session.add(self)
+        TableVersionModel.bump(self.__tablename__)
         sa.session.commit()
 
     def delete(self) -> None:
@@ -75,6 +111,7 @@ class DriverModel(sa.Model):
 
         """
         sa.session.delete(self)
+        TableVersionModel.bump(self.__tablename__)
         sa.session.commit()
 
     def update(self, data: dict[str, Any]) -> None:
@@ -91,6 +128,7 @@ class DriverModel(sa.Model):
         self.car_registration = data.get('car_registration', self.car_registration)
 
         sa.session.add(self)
+        TableVersionModel.bump(self.__tablename__)
         sa.session.commit()
 
     @classmethod
@@ -106,11 +144,26 @@ class DriverModel(sa.Model):
         return sa.session.get(cls, {"id": driver_id})
 
     @classmethod
-    def get_all(cls) -> list[Self]:
+    def get_all(cls) -> list[dict[str, Any]]:
         """
-        Retrieve all instances of the class.
+        Retrieve all instances of the class. Rows are serialized straight from selected columns, without
+        creating DriverModel objects.
 
-        :return: A list containing all instances of the class.
-        :rtype: list
+        :return: A list of driver dictionaries, same as the ones returned by as_dict().
         """
-        return [driver.as_dict() for driver in sa.session.query(cls).all()]
+        return driver_serializer.all()
+
+
+"""
+Fields of driver in order of keys of as_dict()
+"""
+DRIVER_FIELDS = (
+    'id',
+    'first_name',
+    'last_name',
+    'phone_number',
+    'email',
+    'car_registration',
+)
+
+driver_serializer = RowSerializer(DriverModel, DRIVER_FIELDS)
@@ -1,10 +1,12 @@
 import logging
 
 from flask import Response, make_response, request
-from flask_restful import Resource, reqparse, Api
+from flask_restful import Resource, Api
 from sqlalchemy.exc import IntegrityError
 from app.validator.driver import driver_schema
+from app.validator.configuration import invalid_request
 from app.db.model import DriverModel
+from app.routes.conditional import conditional
 from app.db.configuration import sa
 
 logging.basicConfig(level=logging.INFO)
@@ -17,17 +19,7 @@ class AddDriverResource(Resource):
     :param Resource: The base resource class.
     :type Resource: class
 
-    :ivar parser: RequestParser instance for parsing request data.
-    :vartype parser: RequestParser
-
     """
-    parser = reqparse.RequestParser()
-    parser.add_argument('first_name', type=str, required=True)
-    parser.add_argument('last_name', type=str, required=True)
-    parser.add_argument('phone_number', type=str, required=True)
-    parser.add_argument('email', type=str, required=True)
-    parser.add_argument('car_registration', type=str, required=True)
-
     def post(self) -> Response:
         """
         :post: Endpoint to create a new driver.
@@ -42,7 +34,7 @@ class AddDriverResource(Resource):
                  A dictionary containing the error message and the status code 400, if the
                  request is invalid or contains incorrect data types.
         """
-        request_data = self.parser.parse_args()
+        request_data = request.get_json(silent=True)
 
         try:
             driver_schema.validate(request_data)
@@ -54,8 +46,8 @@ class AddDriverResource(Resource):
             sa.session.rollback()
             return {"message": e.orig.args[1]}, 403
 
-        except ValueError or TypeError:
-            return {"message": "Invalid request"}, 400
+        except ValueError or TypeError as e:
+            return invalid_request(e), 400
 
 
 class AllDriversResource(Resource):
@@ -65,6 +57,7 @@ class AllDriversResource(Resource):
     Methods:
         get() -> Response: Retrieve all drivers and return a response with the data.
     """
+    @conditional(DriverModel.__tablename__)
     def get(self) -> Response:
         """
         Get all drivers.
@@ -88,6 +81,7 @@ class DriversResource(Resource):
     - patch(driver_id: int) -> Response: Updates information for a specific driver.
 
     """
+    @conditional(DriverModel.__tablename__)
     def get(self, driver_id: int) -> Response:
         """
         Get driver information by driver ID.
@@ -128,14 +122,14 @@ class DriversResource(Resource):
         """
         try:
             data = request.get_json()
-            driver_schema.validate(data)
+            driver_schema.validate(data, partial=True)
             driver = DriverModel.get_by_id(driver_id)
             if driver:
                 driver.update(data)
                 return driver.as_dict(), 200
             return {"message": "Driver does not exist"}, 404
-        except ValueError or TypeError:
-            return {"message": "Invalid request"}, 400
+        except ValueError or TypeError as e:
+            return invalid_request(e), 400
 
 
 class DriverEndPointsMapper:
@@ -1,10 +1,11 @@
-from schemadict import schemadict
+from app.validator.configuration import Schema
 
 """
-driver_schema implements .validate() method which will return error if any of dict keys won't meet declared constraints
+driver_schema is built once, its .validate() raises ValidationError (ValueError) listing every key that doesn't
+meet declared constraints
 """
 
-driver_schema = schemadict({
+driver_schema = Schema({
     'first_name': {
         'type': str,
         'max_len': 50
@@ -0,0 +1,53 @@
+"""
+Validation of POST /drivers bodies with driver_schema - rules interpreted by schemadict on every call, as before,
+compared with the compiled Schema, for a valid body and for an invalid one
+(schemadict stops at the first violated rule, Schema reports all of them). Run from drivers directory:
+
+    python -m benchmarks.bench_validation --rows 100000
+"""
+import argparse
+import sys
+import time
+
+from schemadict import schemadict
+
+from app.validator.driver import driver_schema
+
+VALID = {
+    'first_name': 'Jan', 'last_name': 'Kowalski', 'phone_number': '600100200', 'email': 'jan.kowalski@example.com',
+    'car_registration': 'DPL96RR'
+}
+
+INVALID = {'phone_number': '0048600100200', 'email': 'jan.kowalski', 'car_registration': 'dpl96rr'}
+
+
+def measure(validate, row: dict, rows: int) -> float:
+    """
+    :return: Time of validating the row rows times, in seconds.
+    """
+    start = time.perf_counter()
+    for _ in range(rows):
+        try:
+            validate(row)
+        except (ValueError, TypeError):
+            pass
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000)
+    args = parser.parse_args()
+
+    interpreted = schemadict(driver_schema.rules)
+    assert driver_schema.errors(VALID) == [] and driver_schema.errors(INVALID)
+
+    for name, row in (('valid', VALID), ('invalid', INVALID)):
+        before = measure(interpreted.validate, row, args.rows)
+        after = measure(driver_schema.validate, row, args.rows)
+        print(f'{name:8} schemadict: {args.rows / before:10,.0f} rows/s   Schema: {args.rows / after:10,.0f} rows/s'
+              f'   ({before / after:.1f}x)', file=sys.stdout)
+
+
+if __name__ == '__main__':
+    main()
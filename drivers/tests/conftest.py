@@ -7,6 +7,7 @@ from flask_restful import Api
 
 from app.env_variables import TEST_SQLALCHEMY_DATABASE_URI, SQLALCHEMY_DATABASE_URI
 from app.db.configuration import sa
+from app.json.configuration import configure_json
 from app.routes.driver import DriverEndPointsMapper
 
 
@@ -37,6 +38,7 @@ def app():
 
         api = Api(app)
         DriverEndPointsMapper(api).init_endpoints()
+        configure_json(app, api)
 
     yield app
 
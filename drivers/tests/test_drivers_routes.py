@@ -144,3 +144,21 @@ class TestCRUDDriversRoutes:
         response = client.patch('/driver/1', json={'email': 'd.smolczynski@o2.pl'})
         assert response.status_code == 200
         assert response.json == {**desired_response_data, 'email': 'd.smolczynski@o2.pl'}
+
+    def test_get_all_drivers_is_conditional(self, client, driver_data) -> None:
+        """
+        :param client: the client object used to send requests to the API
+        :param driver_data: the data of the driver to be created
+
+        :return: None
+
+        Test that list of drivers answers matching If-None-Match with 304 until a driver is deleted.
+        """
+        client.post('/driver', json=driver_data)
+        etag = client.get('/drivers/all').headers['ETag']
+        assert client.get('/drivers/all', headers={'If-None-Match': etag}).status_code == 304
+
+        client.delete('/driver/1')
+        response = client.get('/drivers/all', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
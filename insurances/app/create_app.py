@@ -4,8 +4,12 @@ from flask_migrate import Migrate
 from flask_restful import Api
 from app.env_variables import SQLALCHEMY_DATABASE_URI
 from app.db.configuration import sa
+from app.json.configuration import configure_json
 from app.db.model import InsuranceModel  # Unused import to make flask_migrate work
-from app.route.insurance import AllInsurancesResource, InsurancesResource, InsuranceResourceAdd
+from app.route.insurance import (
+    AllInsurancesResource, ExpiringInsurancesResource, LatestActiveInsurancesResource,
+    InsurancesByRegistrationsResource, DeactivateExpiredInsurancesResource, InsurancesResource, InsuranceResourceAdd
+)
 
 app = Flask(__name__)
 
@@ -54,7 +58,12 @@ def main():
         # ----------------------------------------------------------------------
         api = Api(app)
         api.add_resource(AllInsurancesResource, '/insurances/all')
+        api.add_resource(ExpiringInsurancesResource, '/insurances/expiring')
+        api.add_resource(LatestActiveInsurancesResource, '/insurances/latest_active')
+        api.add_resource(InsurancesByRegistrationsResource, '/insurances/by_registrations')
+        api.add_resource(DeactivateExpiredInsurancesResource, '/insurances/deactivate_expired')
         api.add_resource(InsurancesResource, '/insurances/<int:insurance_id>')
         api.add_resource(InsuranceResourceAdd, '/insurances')
+        configure_json(app, api)
 
     return app
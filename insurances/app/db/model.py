@@ -1,5 +1,41 @@
+from datetime import date
 from typing import Any, Self
+from sqlalchemy import and_, func, or_, select, true, update
+
 from app.db.configuration import sa
+from app.db.serialization import RowSerializer
+
+
+class TableVersionModel(sa.Model):
+    """
+    Change counter of a table. It is incremented in the same transaction as every write made through save(),
+    update() and delete() of the table's model, so reading it is a cheap validator of the whole table - one
+    primary key lookup instead of reading the rows. Used for ETags of GET endpoints.
+    """
+    __tablename__ = 'table_versions'
+
+    name = sa.Column(sa.String(64), primary_key=True)
+    version = sa.Column(sa.BigInteger, nullable=False, default=0)
+
+    @classmethod
+    def bump(cls, name: str) -> None:
+        """
+        Increments version of the table in current transaction, caller commits it together with the change.
+
+        :param name: Name of the table.
+        :return: None
+        """
+        bumped = sa.session.execute(update(cls).where(cls.name == name).values(version=cls.version + 1))
+        if not bumped.rowcount:
+            sa.session.add(cls(name=name, version=1))
+
+    @classmethod
+    def current(cls, name: str) -> int:
+        """
+        :param name: Name of the table.
+        :return: Version of the table, 0 if it has never been changed.
+        """
+        return sa.session.execute(select(cls.version).where(cls.name == name)).scalar() or 0
 
 
 class InsuranceModel(sa.Model):
@@ -24,7 +60,7 @@ class InsuranceModel(sa.Model):
         - delete(self) -> None: Deletes the current instance from the session and commits the changes.
         - update(self, data: dict[str, Any]) -> None: Updates the object attributes with the provided data.
         - get_by_id(cls, insurance_id: int) -> Self: Retrieves the object with the specified ID.
-        - get_all(cls) -> list[Self]: Retrieves all objects of the class.
+        - get_all(cls) -> list[dict[str, Any]]: Retrieves all objects of the class as dictionaries.
 
     Usage:
         insurance = InsuranceModel()
@@ -37,6 +73,12 @@ class InsuranceModel(sa.Model):
 
     """
     __tablename__ = 'insurances'
+    __table_args__ = (
+        # expiring insurances are read as a range of end_date of active ones
+        sa.Index('ix_insurances_active_end_date', 'active', 'end_date'),
+        # latest active insurance of a car is the last entry of its range
+        sa.Index('ix_insurances_registration_active_end_date', 'car_registration_number', 'active', 'end_date'),
+    )
     id = sa.Column(sa.Integer, primary_key=True)
     legal_identifier = sa.Column(sa.String(25), nullable=False,
                                  unique=True)  # Approx length that I managed to find using web sources was 23
@@ -70,6 +112,7 @@ class InsuranceModel(sa.Model):
         :return: None
         """
         sa.session.add(self)
+        TableVersionModel.bump(self.__tablename__)
         sa.session.commit()
 
     def delete(self) -> None:
@@ -79,6 +122,7 @@ class InsuranceModel(sa.Model):
         :return: None
         """
         sa.session.delete(self)
+        TableVersionModel.bump(self.__tablename__)
         sa.session.commit()
 
     def update(self, data: dict[str, Any]) -> None:
@@ -112,6 +156,7 @@ class InsuranceModel(sa.Model):
         self.active = data.get('active', self.active)
 
         sa.session.add(self)
+        TableVersionModel.bump(self.__tablename__)
         sa.session.commit()
 
     @classmethod
@@ -123,12 +168,148 @@ class InsuranceModel(sa.Model):
         return sa.session.get(cls, {"id": insurance_id})
 
     @classmethod
-    def get_all(cls) -> list[Self]:
+    def get_all(cls) -> list[dict[str, Any]]:
+        """
+        Retrieve all objects of the class. Rows are serialized straight from selected columns, without
+        creating InsuranceModel objects.
+
+        :return: A list of insurance dictionaries, same as the ones returned by as_dict().
+        """
+        return insurance_serializer.all()
+
+    @classmethod
+    def get_expiring(cls, date_from: date, date_to: date, limit: int, cursor: tuple[date, int] | None = None,
+                     fields: list[str] | None = None, active: bool | None = True
+                     ) -> tuple[list[dict[str, Any]], tuple[date, int] | None]:
+        """
+        Retrieve one page of insurances which end_date is between date_from and date_to (both inclusive), ordered
+        by end_date and id. The query is a range scan of ix_insurances_active_end_date and pages use keyset
+        pagination on (end_date, id), so only rows of the page are read no matter how many insurances there are
+        in the table.
+
+        :param date_from: First end date of returned insurances.
+        :param date_to: Last end date of returned insurances.
+        :param limit: Maximal number of insurances on the page.
+        :param cursor: End date and id of the last insurance of previous page, None for the first page.
+        :param fields: Names of returned fields declared in INSURANCE_FIELDS, all of them when None.
+        :param active: Active status of returned insurances, None returns both active and inactive insurances.
+        :return: Insurances of the page and cursor of the next page, which is None when there are no more
+                 insurances.
+        """
+        fields = fields or list(INSURANCE_FIELDS)
+        # end_date and id are always selected, because they are the cursor
+        selected = ['id', 'end_date', *(field for field in fields if field not in ('id', 'end_date'))]
+        serializer = RowSerializer(cls, selected)
+        query = (
+            select(*serializer.columns)
+            # Without condition on active the index can't serve end_date range, IN of both statuses is two range scans
+            .where(cls.active.in_((True, False)) if active is None else cls.active == active,
+                   cls.end_date.between(date_from, date_to))
+            .order_by(cls.end_date, cls.id)
+            .limit(limit + 1)
+        )
+        if cursor is not None:
+            end_date, insurance_id = cursor
+            query = query.where(or_(cls.end_date > end_date, and_(cls.end_date == end_date, cls.id > insurance_id)))
+
+        rows = sa.session.execute(query).all()
+        next_cursor = (rows[limit - 1].end_date, rows[limit - 1].id) if len(rows) > limit else None
+
+        insurances = serializer.as_dicts(rows[:limit])
+        for field in {'id', 'end_date'} - set(fields):
+            for insurance in insurances:
+                del insurance[field]
+        return insurances, next_cursor
+
+    @classmethod
+    def get_latest_active(cls, registrations: list[str]) -> dict[str, dict[str, Any] | None]:
+        """
+        Retrieve the latest (with the greatest end_date) active insurance of every given car with one query.
+        Insurances of each car are numbered with ROW_NUMBER() window ordered by end_date, so the database
+        returns only the first one per car instead of all of them or a query per car.
+
+        :param registrations: Registration numbers of the cars.
+        :return: Insurance dictionaries, same as the ones returned by as_dict(), by registration number. None for
+                 cars which don't have any active insurance.
+        """
+        row_number = func.row_number().over(
+            partition_by=cls.car_registration_number,
+            order_by=(cls.end_date.desc(), cls.id.desc())
+        ).label('row_number')
+        ranked = (
+            select(*insurance_serializer.columns, row_number)
+            .where(cls.car_registration_number.in_(registrations), cls.active == true())
+            .subquery()
+        )
+        query = select(*(ranked.c[field] for field in INSURANCE_FIELDS)).where(ranked.c.row_number == 1)
+
+        latest = dict.fromkeys(registrations)
+        for insurance in insurance_serializer.as_dicts(sa.session.execute(query)):
+            latest[insurance['car_registration_number']] = insurance
+        return latest
+
+    @classmethod
+    def get_by_registrations(cls, registrations: list[str]) -> dict[str, list[dict[str, Any]]]:
+        """
+        Retrieve insurances of many cars with one query - registration numbers are sent as IN list, which the
+        database resolves with lookups of the index starting with car_registration_number.
+
+        :param registrations: Registration numbers of the cars.
+        :return: Insurance dictionaries, same as the ones returned by as_dict(), ordered by end_date and id, by
+                 registration number. Cars without insurances have empty list.
+        """
+        query = (
+            select(*insurance_serializer.columns)
+            .where(cls.car_registration_number.in_(registrations))
+            .order_by(cls.car_registration_number, cls.end_date, cls.id)
+        )
+        by_registration = {registration: [] for registration in registrations}
+        for insurance in insurance_serializer.as_dicts(sa.session.execute(query)):
+            by_registration[insurance['car_registration_number']].append(insurance)
+        return by_registration
+
+    @classmethod
+    def deactivate_expired(cls, today: date, batch_size: int) -> int:
         """
-        Retrieve all objects of the class.
+        Sets active to False for all active insurances which end_date is before today. Insurances are deactivated
+        in batches - ids of a batch are read with a range scan of ix_insurances_active_end_date and deactivated with
+        one UPDATE, which is committed together with version of the table, so locks are held only for one batch.
+        Version is bumped only by batches which changed some rows, so running it again when nothing has expired
+        changes nothing and keeps ETags valid.
 
-        :return: A list of objects of the class.
+        :param today: Insurances ending before this date are deactivated.
+        :param batch_size: Maximal number of insurances deactivated by one UPDATE.
+        :return: Number of deactivated insurances.
         """
-        return [insurance.as_dict() for insurance in sa.session.query(cls).all()]
+        expired = (
+            select(cls.id)
+            .where(cls.active == true(), cls.end_date < today)
+            .order_by(cls.end_date)
+            .limit(batch_size)
+        )
+        deactivated = 0
+        while ids := sa.session.execute(expired).scalars().all():
+            changed = sa.session.execute(
+                update(cls).where(cls.id.in_(ids), cls.active == true()).values(active=False)
+            ).rowcount
+            if changed:
+                TableVersionModel.bump(cls.__tablename__)
+            sa.session.commit()
+            deactivated += changed
+        return deactivated
+
 
+"""
+Fields of insurance in order of keys of as_dict()
+"""
+INSURANCE_FIELDS = (
+    'id',
+    'legal_identifier',
+    'start_date',
+    'end_date',
+    'car_registration_number',
+    'img_url',
+    'active',
+)
 
+insurance_serializer = RowSerializer(InsuranceModel, INSURANCE_FIELDS)
@@ -29,6 +29,16 @@ TEST_DB_NAME = getenv('TEST_DB_NAME', 'db_1')
 TEST_DB_CONTAINER = getenv('TEST_DB_CONTAINER', 'mysql')
 TEST_SQLALCHEMY_DATABASE_URI = f'mysql://{TEST_DB_USERNAME}:{TEST_DB_PASSWORD}@{TEST_DB_CONTAINER}:{TEST_DB_PORT}/{TEST_DB_NAME}'
 
+# Keyset pagination of /insurances/expiring
+INSURANCES_PAGE_SIZE = int(getenv('INSURANCES_PAGE_SIZE', '100'))
+INSURANCES_PAGE_MAX_SIZE = int(getenv('INSURANCES_PAGE_MAX_SIZE', '1000'))
+
+# Registration numbers accepted by one batch lookup request
+INSURANCES_MAX_REGISTRATIONS = int(getenv('INSURANCES_MAX_REGISTRATIONS', '5000'))
+
+# Expired insurances deactivated by one UPDATE of deactivate_expired
+INSURANCES_DEACTIVATE_BATCH_SIZE = int(getenv('INSURANCES_DEACTIVATE_BATCH_SIZE', '1000'))
+
 logging.info('-------------[1]-----------------------')
 logging.info(DB_CONTAINER)
 logging.info('-------------[1]-----------------------')
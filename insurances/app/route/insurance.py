@@ -1,11 +1,20 @@
+import logging
+from datetime import date
+from typing import Any
+
 from flask import request, Response, make_response
-from flask_restful import Resource, reqparse
+from flask_restful import Resource
 from sqlalchemy.exc import IntegrityError
 
 
 from app.db.configuration import sa
-from app.db.model import InsuranceModel
+from app.db.model import InsuranceModel, INSURANCE_FIELDS
+from app.env_variables import (
+    INSURANCES_PAGE_SIZE, INSURANCES_PAGE_MAX_SIZE, INSURANCES_MAX_REGISTRATIONS, INSURANCES_DEACTIVATE_BATCH_SIZE
+)
+from app.route.conditional import conditional
 from app.validator.insurance import insurance_schema
+from app.validator.configuration import invalid_request
 
 
 class AllInsurancesResource(Resource):
@@ -17,6 +26,7 @@ class AllInsurancesResource(Resource):
         - get: Retrieves all insurances.
 
     """
+    @conditional(InsuranceModel.__tablename__)
     def get(self) -> Response:
         """
         Retrieve all insurances.
@@ -31,6 +41,103 @@ class AllInsurancesResource(Resource):
         return response
 
 
+class ExpiringInsurancesResource(Resource):
+    """
+    Resource class for retrieving insurances ending between two dates, e.g. to notify about insurances ending
+    soon without downloading all of them.
+    """
+    @conditional(InsuranceModel.__tablename__)
+    def get(self) -> Response:
+        """
+        Get page of insurances which end_date is between given dates, ordered by end_date and id.
+
+        Query parameters:
+            - from, to: Inclusive range of end_date in YYYY-MM-DD format, both are required.
+            - active: 'true' (default) or 'false', active status of returned insurances, 'all' for both.
+            - limit: Number of insurances on the page, INSURANCES_PAGE_SIZE by default, at most
+              INSURANCES_PAGE_MAX_SIZE.
+            - cursor: next_cursor of the previous page.
+            - fields: Comma separated names of returned fields, all fields by default.
+
+        :return: Response object with a JSON containing insurances of the page under 'insurances' and
+                 'next_cursor', which is None on the last page. 400 if any of query parameters is invalid.
+        """
+        try:
+            args = request.args
+            date_from = date.fromisoformat(args['from'])
+            date_to = date.fromisoformat(args['to'])
+            active = {'true': True, 'false': False, 'all': None}[args.get('active', 'true')]
+            limit = int(args.get('limit', INSURANCES_PAGE_SIZE))
+            if not 1 <= limit <= INSURANCES_PAGE_MAX_SIZE:
+                raise ValueError(f'limit has to be between 1 and {INSURANCES_PAGE_MAX_SIZE}')
+            cursor = _parse_cursor(args['cursor']) if args.get('cursor') else None
+            fields = [field.strip() for field in args['fields'].split(',')] if args.get('fields') else None
+            if fields and not set(fields) <= set(INSURANCE_FIELDS):
+                raise ValueError(f'Unknown fields: {set(fields) - set(INSURANCE_FIELDS)}')
+        except (KeyError, ValueError) as e:
+            logging.info(e)
+            return invalid_request(e), 400
+
+        insurances, next_cursor = InsuranceModel.get_expiring(date_from, date_to, limit, cursor, fields, active)
+        return {'insurances': insurances, 'next_cursor': _format_cursor(next_cursor)}, 200
+
+
+class LatestActiveInsurancesResource(Resource):
+    """
+    Resource class for retrieving the latest active insurance of many cars at once.
+    """
+    def post(self) -> Response:
+        """
+        Get the latest active insurance of every car from JSON body {"car_registration_numbers": [...]}, which
+        has at most INSURANCES_MAX_REGISTRATIONS registration numbers.
+
+        :return: Response object with a JSON containing insurances by registration number under 'insurances',
+                 None for cars without active insurance. 400 if the body is invalid.
+        """
+        try:
+            registrations = _parse_registrations(request.get_json(silent=True))
+        except ValueError as e:
+            logging.info(e)
+            return invalid_request(e), 400
+        return {'insurances': InsuranceModel.get_latest_active(registrations)}, 200
+
+
+class InsurancesByRegistrationsResource(Resource):
+    """
+    Resource class for retrieving insurances of many cars at once.
+    """
+    def post(self) -> Response:
+        """
+        Get insurances of every car from JSON body {"car_registration_numbers": [...]}, which has at most
+        INSURANCES_MAX_REGISTRATIONS registration numbers.
+
+        :return: Response object with a JSON containing lists of insurances by registration number under
+                 'insurances'. 400 if the body is invalid.
+        """
+        try:
+            registrations = _parse_registrations(request.get_json(silent=True))
+        except ValueError as e:
+            logging.info(e)
+            return invalid_request(e), 400
+        return {'insurances': InsuranceModel.get_by_registrations(registrations)}, 200
+
+
+class DeactivateExpiredInsurancesResource(Resource):
+    """
+    Resource class for deactivating insurances which have already ended, called daily by the scheduler.
+    """
+    def post(self) -> Response:
+        """
+        Deactivate all active insurances which end_date is before today. It is idempotent, repeated call deactivates
+        only insurances which have expired since the previous one.
+
+        :return: Response object with a JSON containing number of deactivated insurances under 'deactivated'.
+        """
+        deactivated = InsuranceModel.deactivate_expired(date.today(), INSURANCES_DEACTIVATE_BATCH_SIZE)
+        logging.info(f'Deactivated {deactivated} expired insurances')
+        return {'deactivated': deactivated}, 200
+
+
 class InsurancesResource(Resource):
     """
 
@@ -74,6 +181,7 @@ class InsurancesResource(Resource):
 
 
     """
+    @conditional(InsuranceModel.__tablename__)
     def get(self, insurance_id: int) -> Response:
         """
         :param insurance_id: The ID of the insurance to retrieve.
@@ -108,33 +216,21 @@ class InsurancesResource(Resource):
         """
         try:
             data = request.get_json()
-            insurance_schema.validate(data)
+            insurance_schema.validate(data, partial=True)
             insurance = InsuranceModel.get_by_id(insurance_id)
             if insurance:
                 insurance.update(data)
                 return insurance.as_dict(), 200
             return {"message": "Insurance does not exist"}, 404
-        except ValueError or TypeError:
-            return {"message": "Invalid request"}, 400
+        except ValueError or TypeError as e:
+            return invalid_request(e), 400
 
 
 class InsuranceResourceAdd(Resource):
     """
     Resource class to handle adding insurance data.
 
-    :ivar parser: RequestParser object to parse and validate request arguments.
-    :vartype parser: RequestParser
-
     """
-    parser = reqparse.RequestParser()
-    parser.add_argument('legal_identifier', type=str, required=True, help='Legal identifier of insurance is required')
-    parser.add_argument('start_date', type=str, required=True, help='Start date of insurance is required')
-    parser.add_argument('end_date', type=str, required=True, help='End date of insurance is required')
-    parser.add_argument('car_registration_number', type=str, required=True, help='Car registration number of insurance is required')
-    parser.add_argument('img_url', type=str, required=True,
-                        help='Image url of the insurance is required')
-    parser.add_argument('active', type=bool, required=True, help='Active flag of insurance is required')
-
     def post(self) -> Response:
         """
         Process a POST request to create a new insurance entry.
@@ -151,7 +247,7 @@ class InsuranceResourceAdd(Resource):
                 - A JSON object with a message indicating an invalid request.
                 - Status code 400 indicating bad request.
         """
-        data = self.parser.parse_args()
+        data = request.get_json(silent=True)
 
         try:
             insurance_schema.validate(data)
@@ -161,5 +257,43 @@ class InsuranceResourceAdd(Resource):
         except IntegrityError as e:
             sa.session.rollback()
             return {"message": e.orig.args[1]}, 403
-        except ValueError or TypeError:
-            return {"message": "Invalid request"}, 400
+        except ValueError or TypeError as e:
+            return invalid_request(e), 400
+
+
+def _parse_cursor(cursor: str) -> tuple[date, int]:
+    """
+    :param cursor: Cursor in format returned by _format_cursor().
+    :return: End date and id of the last insurance of previous page.
+    :raises ValueError: If cursor is malformed.
+    """
+    end_date, _, insurance_id = cursor.partition('_')
+    return date.fromisoformat(end_date), int(insurance_id)
+
+
+def _format_cursor(cursor: tuple[date, int] | None) -> str | None:
+    """
+    :param cursor: End date and id of the last insurance of the page, None on the last page.
+    :return: Opaque cursor of the next page, e.g. '2024-05-31_42'.
+    """
+    if cursor is None:
+        return None
+    end_date, insurance_id = cursor
+    return f'{end_date.isoformat()}_{insurance_id}'
+
+
+def _parse_registrations(data: Any) -> list[str]:
+    """
+    :param data: JSON body of batch lookup request.
+    :return: Unique registration numbers from the body, in order of their first occurrence.
+    :raises ValueError: If the body isn't {"car_registration_numbers": [...]} with 1 to INSURANCES_MAX_REGISTRATIONS
+                        strings.
+    """
+    if type(data) is not dict or data.keys() != {'car_registration_numbers'}:
+        raise ValueError('Body has to have only car_registration_numbers')
+    registrations = data['car_registration_numbers']
+    if type(registrations) is not list or not all(type(registration) is str for registration in registrations):
+        raise ValueError('car_registration_numbers has to be a list of strings')
+    if not 1 <= len(registrations) <= INSURANCES_MAX_REGISTRATIONS:
+        raise ValueError(f'car_registration_numbers has to have 1 to {INSURANCES_MAX_REGISTRATIONS} items')
+    return list(dict.fromkeys(registrations))
@@ -1,10 +1,11 @@
-from schemadict import schemadict
+from app.validator.configuration import Schema
 
 """
-insurance_schema implements .validate() method which will return error if any of dict keys won't meet declared constraints
+insurance_schema is built once, its .validate() raises ValidationError (ValueError) listing every key that doesn't
+meet declared constraints
 """
 
-insurance_schema = schemadict({
+insurance_schema = Schema({
     'legal_identifier': {
         'type': str,
         'min_len': 9,
@@ -0,0 +1,55 @@
+"""
+Encoding time of GET /insurances/all sized responses - Flask's DefaultJSONProvider used by make_response() before,
+compared with the provider installed by configure_json() (orjson when it is installed). Run from insurances directory:
+
+    python -m benchmarks.bench_json --rows 10000
+"""
+import argparse
+import sys
+import time
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from app.json.configuration import JSON_PROVIDER_CLASS
+
+ROW = {
+    'id': 1, 'legal_identifier': 'INS/2023/000001', 'start_date': '2023-01-01', 'end_date': '2024-01-01',
+    'car_registration_number': 'DPL96RR', 'img_url': 'https://bucket.s3.amazonaws.com/insurances/1.png', 'active': True
+}
+
+
+def measure(provider: DefaultJSONProvider, payload: dict, repeats: int) -> float:
+    """
+    :return: Best encoding time in milliseconds.
+    """
+    durations = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        provider.response(payload).get_data()
+        durations.append(time.perf_counter() - start)
+    return min(durations) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--repeats', type=int, default=20)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    payload = {'all_insurances': [{**ROW, 'id': number} for number in range(args.rows)]}
+
+    with app.app_context():
+        results = {
+            'DefaultJSONProvider': measure(DefaultJSONProvider(app), payload, args.repeats),
+            JSON_PROVIDER_CLASS.__name__: measure(JSON_PROVIDER_CLASS(app), payload, args.repeats),
+        }
+
+    print(f'rows: {args.rows:,}', file=sys.stdout)
+    for name, duration in results.items():
+        print(f'{name:<20} {duration:8.2f} ms/response', file=sys.stdout)
+
+
+if __name__ == '__main__':
+    main()
@@ -8,7 +8,10 @@ from flask_restful import Api
 from app.env_variables import TEST_SQLALCHEMY_DATABASE_URI, SQLALCHEMY_DATABASE_URI
 from app.db.configuration import sa
 
-from app.route.insurance import AllInsurancesResource, InsurancesResource, InsuranceResourceAdd
+from app.route.insurance import (
+    AllInsurancesResource, ExpiringInsurancesResource, LatestActiveInsurancesResource,
+    InsurancesByRegistrationsResource, DeactivateExpiredInsurancesResource, InsurancesResource, InsuranceResourceAdd
+)
 
 logging.basicConfig(level=logging.INFO)
 
@@ -38,6 +41,10 @@ def app():
 
         api = Api(app)
         api.add_resource(AllInsurancesResource, '/insurances/all')
+        api.add_resource(ExpiringInsurancesResource, '/insurances/expiring')
+        api.add_resource(LatestActiveInsurancesResource, '/insurances/latest_active')
+        api.add_resource(InsurancesByRegistrationsResource, '/insurances/by_registrations')
+        api.add_resource(DeactivateExpiredInsurancesResource, '/insurances/deactivate_expired')
         api.add_resource(InsurancesResource, '/insurances/<int:insurance_id>')
         api.add_resource(InsuranceResourceAdd, '/insurances')
 
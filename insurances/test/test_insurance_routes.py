@@ -30,7 +30,10 @@ def test_crate_insurance_with_invalid_data(client, insurance_data):
     invalid_insurance_data = {**insurance_data, **{'car_registration_number': 'DPL96RR R'}}
     response = client.post("/insurances", json=invalid_insurance_data)
     assert response.status_code == 400
-    assert response.json == {'message': "Invalid request"}
+    assert response.json == {'message': "Invalid request", 'errors': [
+        {'field': 'car_registration_number', 'rule': 'max_len', 'message': 'length has to be at most 7'},
+        {'field': 'car_registration_number', 'rule': 'regex', 'message': 'has to match ^[A-Z0-9]{7}$'}
+    ]}
 
 
 def test_get_one_by_id(client, insurance_data):
@@ -155,7 +158,10 @@ def test_update_insurance_by_id_with_bad_data(client, insurance_data):
     response = client.patch("/insurances/1",
                             json={**insurance_data, 'car_registration_number': 'DDD0000 0'})  # regex won't match
     assert response.status_code == 400
-    assert response.json == {"message": "Invalid request"}
+    assert response.json == {"message": "Invalid request", "errors": [
+        {"field": "car_registration_number", "rule": "max_len", "message": "length has to be at most 7"},
+        {"field": "car_registration_number", "rule": "regex", "message": "has to match ^[A-Z0-9]{7}$"}
+    ]}
 
 
 def test_update_insurance_by_id_when_not_exists(client, insurance_data):
@@ -173,3 +179,126 @@ def test_update_insurance_by_id_when_not_exists(client, insurance_data):
     response = client.patch("/insurances/1", json=insurance_data)
     assert response.status_code == 404
     assert response.json == {"message": "Insurance does not exist"}
+
+
+def test_get_expiring_insurances(client, insurance_data):
+    """
+    Test that active insurances ending within the range are returned by default, ordered by end date, page by
+    page, and that inactive ones are returned only on request.
+
+    :param client: The client to make requests to the API
+    :param insurance_data: The data of the insurances to be created
+    :return: None
+    """
+    for number, (end_date, active) in enumerate([("2023-03-01", True), ("2023-01-15", True), ("2023-02-01", False),
+                                                 ("2023-01-15", True), ("2023-06-01", True)]):
+        insurance = {**insurance_data, "legal_identifier": f"KPA11111111111{number}", "end_date": end_date,
+                     "active": active}
+        assert client.post("/insurances", json=insurance).status_code == 201
+
+    response = client.get("/insurances/expiring?from=2023-01-01&to=2023-03-01&limit=2&fields=id,end_date")
+    assert response.status_code == 200
+    assert response.json == {
+        "insurances": [{"id": 2, "end_date": "2023-01-15"}, {"id": 4, "end_date": "2023-01-15"}],
+        "next_cursor": "2023-01-15_4"
+    }
+    response = client.get("/insurances/expiring?from=2023-01-01&to=2023-03-01&limit=2&fields=id&cursor=2023-01-15_4")
+    assert response.json == {"insurances": [{"id": 1}], "next_cursor": None}
+
+    response = client.get("/insurances/expiring?from=2023-01-01&to=2023-03-01&active=false")
+    assert [insurance["id"] for insurance in response.json["insurances"]] == [3]
+
+    # inactive insurances ending within the range are included on request, e.g. for notifications
+    response = client.get("/insurances/expiring?from=2023-01-01&to=2023-03-01&active=all&limit=3")
+    assert [insurance["id"] for insurance in response.json["insurances"]] == [2, 4, 3]
+    cursor = response.json["next_cursor"]
+    response = client.get(f"/insurances/expiring?from=2023-01-01&to=2023-03-01&active=all&cursor={cursor}")
+    assert [insurance["id"] for insurance in response.json["insurances"]] == [1]
+
+    response = client.get("/insurances/expiring?from=2023-01-01")
+    assert response.status_code == 400
+    assert response.json == {"message": "Invalid request"}
+
+
+def test_get_latest_active_insurances(client, insurance_data):
+    """
+    Test that the active insurance with the greatest end date is returned for every car, None for cars without
+    active insurance.
+
+    :param client: The client to make requests to the API
+    :param insurance_data: The data of the insurances to be created
+    :return: None
+    """
+    for number, (registration, end_date, active) in enumerate([("DPL96RR", "2023-01-01", True),
+                                                               ("DPL96RR", "2024-01-01", True),
+                                                               ("DPL96RR", "2025-01-01", False),
+                                                               ("WX12345", "2022-01-01", False)]):
+        insurance = {**insurance_data, "legal_identifier": f"KPA11111111111{number}",
+                     "car_registration_number": registration, "end_date": end_date, "active": active}
+        assert client.post("/insurances", json=insurance).status_code == 201
+
+    response = client.post("/insurances/latest_active",
+                           json={"car_registration_numbers": ["DPL96RR", "WX12345", "DPL96RR"]})
+    assert response.status_code == 200
+    assert response.json == {"insurances": {
+        "DPL96RR": {**insurance_data, "legal_identifier": "KPA111111111111", "end_date": "2024-01-01", "id": 2},
+        "WX12345": None
+    }}
+
+    for body in ({"car_registration_numbers": []}, {"car_registration_numbers": "DPL96RR"},
+                 {"car_registration_numbers": [1]}, ["DPL96RR"]):
+        response = client.post("/insurances/latest_active", json=body)
+        assert response.status_code == 400
+        assert response.json == {"message": "Invalid request"}
+
+
+def test_get_insurances_by_registrations(client, insurance_data):
+    """
+    Test that insurances of all requested cars are returned grouped by registration number, empty list for cars
+    without insurances.
+
+    :param client: The client to make requests to the API
+    :param insurance_data: The data of the insurances to be created
+    :return: None
+    """
+    for number, (registration, end_date) in enumerate([("DPL96RR", "2024-01-01"), ("WX12345", "2023-01-01"),
+                                                       ("DPL96RR", "2023-01-01")]):
+        insurance = {**insurance_data, "legal_identifier": f"KPA11111111111{number}",
+                     "car_registration_number": registration, "end_date": end_date}
+        assert client.post("/insurances", json=insurance).status_code == 201
+
+    response = client.post("/insurances/by_registrations", json={"car_registration_numbers": ["DPL96RR", "KR00000"]})
+    assert response.status_code == 200
+    assert {registration: [insurance["id"] for insurance in insurances]
+            for registration, insurances in response.json["insurances"].items()} == {"DPL96RR": [3, 1], "KR00000": []}
+
+    response = client.post("/insurances/by_registrations", json={"registrations": ["DPL96RR"]})
+    assert response.status_code == 400
+    assert response.json == {"message": "Invalid request"}
+
+
+def test_deactivate_expired_insurances(client, insurance_data, monkeypatch):
+    """
+    Test that only active insurances which have already ended are deactivated and that repeated call changes
+    nothing.
+
+    :param client: The client to make requests to the API
+    :param insurance_data: The data of the insurances to be created
+    :param monkeypatch: Fixture used to deactivate one insurance per batch.
+    :return: None
+    """
+    monkeypatch.setattr('app.route.insurance.INSURANCES_DEACTIVATE_BATCH_SIZE', 1)
+    for number, end_date in enumerate(["2023-01-01", "2099-01-01", "2022-06-01"]):
+        insurance = {**insurance_data, "legal_identifier": f"KPA11111111111{number}", "end_date": end_date}
+        assert client.post("/insurances", json=insurance).status_code == 201
+
+    response = client.post("/insurances/deactivate_expired")
+    assert response.status_code == 200
+    assert response.json == {"deactivated": 2}
+    assert [insurance["active"] for insurance in client.get("/insurances/all").json["all_insurances"]] == [
+        False, True, False
+    ]
+
+    etag = client.get("/insurances/all").headers["ETag"]
+    assert client.post("/insurances/deactivate_expired").json == {"deactivated": 0}
+    assert client.get("/insurances/all").headers["ETag"] == etag
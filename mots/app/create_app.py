@@ -4,8 +4,12 @@ from flask_migrate import Migrate
 from flask_restful import Api
 from app.env_variables import SQLALCHEMY_DATABASE_URI
 from app.db.configuration import sa
+from app.json.configuration import configure_json
 from app.db.model import MotModel  # Unused import to make flask_migrate work
-from app.route.mot import AllMotsResource, MotsResource, MotResourceAdd
+from app.route.mot import (
+    AllMotsResource, ExpiringMotsResource, MotsByRegistrationsResource, DeactivateExpiredMotsResource,
+    MotsResource, MotResourceAdd
+)
 
 app = Flask(__name__)
 
@@ -60,7 +64,11 @@ def main():
         # ----------------------------------------------------------------------
         api = Api(app)
         api.add_resource(AllMotsResource, '/mots/all')
+        api.add_resource(ExpiringMotsResource, '/mots/expiring')
+        api.add_resource(MotsByRegistrationsResource, '/mots/by_registrations')
+        api.add_resource(DeactivateExpiredMotsResource, '/mots/deactivate_expired')
         api.add_resource(MotsResource, '/mots/<int:mot_id>')
         api.add_resource(MotResourceAdd, '/mots')
+        configure_json(app, api)
 
     return app
@@ -1,5 +1,41 @@
+from datetime import date
 from typing import Any, Self
+from sqlalchemy import and_, or_, select, true, update
+
 from app.db.configuration import sa
+from app.db.serialization import RowSerializer
+
+
+class TableVersionModel(sa.Model):
+    """
+    Change counter of a table. It is incremented in the same transaction as every write made through save(),
+    update() and delete() of the table's model, so reading it is a cheap validator of the whole table - one
+    primary key lookup instead of reading the rows. Used for ETags of GET endpoints.
+    """
+    __tablename__ = 'table_versions'
+
+    name = sa.Column(sa.String(64), primary_key=True)
+    version = sa.Column(sa.BigInteger, nullable=False, default=0)
+
+    @classmethod
+    def bump(cls, name: str) -> None:
+        """
+        Increments version of the table in current transaction, caller commits it together with the change.
+
+        :param name: Name of the table.
+        :return: None
+        """
+        bumped = sa.session.execute(update(cls).where(cls.name == name).values(version=cls.version + 1))
+        if not bumped.rowcount:
+            sa.session.add(cls(name=name, version=1))
+
+    @classmethod
+    def current(cls, name: str) -> int:
+        """
+        :param name: Name of the table.
+        :return: Version of the table, 0 if it has never been changed.
+        """
+        return sa.session.execute(select(cls.version).where(cls.name == name)).scalar() or 0
 
 
 class MotModel(sa.Model):
@@ -22,6 +58,12 @@ class MotModel(sa.Model):
     ```
     """
     __tablename__ = 'mots'
+    __table_args__ = (
+        # expiring MOTs are read as a range of end_date of active ones
+        sa.Index('ix_mots_active_end_date', 'active', 'end_date'),
+        # MOTs of cars are read by registration number, ordered by end_date
+        sa.Index('ix_mots_registration_end_date', 'car_registration_number', 'end_date'),
+    )
     id = sa.Column(sa.Integer, primary_key=True)
     legal_identifier = sa.Column(sa.String(25), nullable=False,
                                  unique=True)  # Approx length that I managed to find using web sources was 23
@@ -55,6 +97,7 @@ class MotModel(sa.Model):
         :return: None
         """
         sa.session.add(self)
+        TableVersionModel.bump(self.__tablename__)
         sa.session.commit()
 
     def delete(self) -> None:
@@ -64,6 +107,7 @@ class MotModel(sa.Model):
         :return: None
         """
         sa.session.delete(self)
+        TableVersionModel.bump(self.__tablename__)
         sa.session.commit()
 
     def update(self, data: dict[str, Any]) -> None:
@@ -97,6 +141,7 @@ class MotModel(sa.Model):
         self.active = data.get('active', self.active)
 
         sa.session.add(self)
+        TableVersionModel.bump(self.__tablename__)
         sa.session.commit()
 
     @classmethod
@@ -108,10 +153,119 @@ class MotModel(sa.Model):
         return sa.session.get(cls, {"id": mot_id})
 
     @classmethod
-    def get_all(cls) -> list[Self]:
+    def get_all(cls) -> list[dict[str, Any]]:
+        """
+        Retrieve all objects of the class. Rows are serialized straight from selected columns, without
+        creating MotModel objects.
+
+        :return: A list of mot dictionaries, same as the ones returned by as_dict().
+        """
+        return mot_serializer.all()
+
+    @classmethod
+    def get_expiring(cls, date_from: date, date_to: date, limit: int, cursor: tuple[date, int] | None = None,
+                     fields: list[str] | None = None, active: bool | None = True
+                     ) -> tuple[list[dict[str, Any]], tuple[date, int] | None]:
+        """
+        Retrieve one page of MOTs which end_date is between date_from and date_to (both inclusive), ordered by
+        end_date and id. The query is a range scan of ix_mots_active_end_date and pages use keyset pagination
+        on (end_date, id), so only rows of the page are read no matter how many MOTs there are in the table.
+
+        :param date_from: First end date of returned MOTs.
+        :param date_to: Last end date of returned MOTs.
+        :param limit: Maximal number of MOTs on the page.
+        :param cursor: End date and id of the last MOT of previous page, None for the first page.
+        :param fields: Names of returned fields declared in MOT_FIELDS, all of them when None.
+        :param active: Active status of returned MOTs, None returns both active and inactive MOTs.
+        :return: MOTs of the page and cursor of the next page, which is None when there are no more MOTs.
+        """
+        fields = fields or list(MOT_FIELDS)
+        # end_date and id are always selected, because they are the cursor
+        selected = ['id', 'end_date', *(field for field in fields if field not in ('id', 'end_date'))]
+        serializer = RowSerializer(cls, selected)
+        query = (
+            select(*serializer.columns)
+            # Without condition on active the index can't serve end_date range, IN of both statuses is two range scans
+            .where(cls.active.in_((True, False)) if active is None else cls.active == active,
+                   cls.end_date.between(date_from, date_to))
+            .order_by(cls.end_date, cls.id)
+            .limit(limit + 1)
+        )
+        if cursor is not None:
+            end_date, mot_id = cursor
+            query = query.where(or_(cls.end_date > end_date, and_(cls.end_date == end_date, cls.id > mot_id)))
+
+        rows = sa.session.execute(query).all()
+        next_cursor = (rows[limit - 1].end_date, rows[limit - 1].id) if len(rows) > limit else None
+
+        mots = serializer.as_dicts(rows[:limit])
+        for field in {'id', 'end_date'} - set(fields):
+            for mot in mots:
+                del mot[field]
+        return mots, next_cursor
+
+    @classmethod
+    def get_by_registrations(cls, registrations: list[str]) -> dict[str, list[dict[str, Any]]]:
         """
-        Retrieve all objects of the class.
+        Retrieve MOTs of many cars with one query - registration numbers are sent as IN list, which the
+        database resolves with lookups of the index starting with car_registration_number.
 
-        :return: A list of objects of the class.
+        :param registrations: Registration numbers of the cars.
+        :return: MOT dictionaries, same as the ones returned by as_dict(), ordered by end_date and id, by
+                 registration number. Cars without MOTs have empty list.
         """
-        return [mot.as_dict() for mot in sa.session.query(cls).all()]
+        query = (
+            select(*mot_serializer.columns)
+            .where(cls.car_registration_number.in_(registrations))
+            .order_by(cls.car_registration_number, cls.end_date, cls.id)
+        )
+        by_registration = {registration: [] for registration in registrations}
+        for mot in mot_serializer.as_dicts(sa.session.execute(query)):
+            by_registration[mot['car_registration_number']].append(mot)
+        return by_registration
+
+    @classmethod
+    def deactivate_expired(cls, today: date, batch_size: int) -> int:
+        """
+        Sets active to False for all active MOTs which end_date is before today. MOTs are deactivated
+        in batches - ids of a batch are read with a range scan of ix_mots_active_end_date and deactivated with
+        one UPDATE, which is committed together with version of the table, so locks are held only for one batch.
+        Version is bumped only by batches which changed some rows, so running it again when nothing has expired
+        changes nothing and keeps ETags valid.
+
+        :param today: MOTs ending before this date are deactivated.
+        :param batch_size: Maximal number of MOTs deactivated by one UPDATE.
+        :return: Number of deactivated MOTs.
+        """
+        expired = (
+            select(cls.id)
+            .where(cls.active == true(), cls.end_date < today)
+            .order_by(cls.end_date)
+            .limit(batch_size)
+        )
+        deactivated = 0
+        while ids := sa.session.execute(expired).scalars().all():
+            changed = sa.session.execute(
+                update(cls).where(cls.id.in_(ids), cls.active == true()).values(active=False)
+            ).rowcount
+            if changed:
+                TableVersionModel.bump(cls.__tablename__)
+            sa.session.commit()
+            deactivated += changed
+        return deactivated
+
+
+"""
+Fields of mot in order of keys of as_dict()
+"""
+MOT_FIELDS = (
+    'id',
+    'legal_identifier',
+    'start_date',
+    'end_date',
+    'car_registration_number',
+    'img_url',
+    'active',
+)
+
+mot_serializer = RowSerializer(MotModel, MOT_FIELDS)
@@ -22,3 +22,13 @@ TEST_DB_PORT = getenv('TEST_DB_PORT', '3306')
 TEST_DB_NAME = getenv('TEST_DB_NAME', 'db_1')
 TEST_DB_CONTAINER = getenv('TEST_DB_CONTAINER', 'mysql')
 TEST_SQLALCHEMY_DATABASE_URI = f'mysql://{TEST_DB_USERNAME}:{TEST_DB_PASSWORD}@{TEST_DB_CONTAINER}:{TEST_DB_PORT}/{TEST_DB_NAME}'
+
+# Keyset pagination of /mots/expiring
+MOTS_PAGE_SIZE = int(getenv('MOTS_PAGE_SIZE', '100'))
+MOTS_PAGE_MAX_SIZE = int(getenv('MOTS_PAGE_MAX_SIZE', '1000'))
+
+# Registration numbers accepted by one batch lookup request
+MOTS_MAX_REGISTRATIONS = int(getenv('MOTS_MAX_REGISTRATIONS', '5000'))
+
+# Expired MOTs deactivated by one UPDATE of deactivate_expired
+MOTS_DEACTIVATE_BATCH_SIZE = int(getenv('MOTS_DEACTIVATE_BATCH_SIZE', '1000'))
@@ -1,11 +1,20 @@
+import logging
+from datetime import date
+from typing import Any
+
 from flask import request, Response, make_response
-from flask_restful import Resource, reqparse
+from flask_restful import Resource
 from sqlalchemy.exc import IntegrityError
 
 
 from app.db.configuration import sa
-from app.db.model import MotModel
+from app.db.model import MotModel, MOT_FIELDS
+from app.env_variables import (
+    MOTS_PAGE_SIZE, MOTS_PAGE_MAX_SIZE, MOTS_MAX_REGISTRATIONS, MOTS_DEACTIVATE_BATCH_SIZE
+)
+from app.route.conditional import conditional
 from app.validator.mot import mot_schema
+from app.validator.configuration import invalid_request
 
 
 class AllMotsResource(Resource):
@@ -15,6 +24,7 @@ class AllMotsResource(Resource):
     :return: JSON response containing all mots.
     :rtype: flask.Response
     """
+    @conditional(MotModel.__tablename__)
     def get(self) -> Response:
         """
         Get all mots from the MotModel.
@@ -28,7 +38,84 @@ class AllMotsResource(Resource):
         return response
 
 
+class ExpiringMotsResource(Resource):
+    """
+    Resource class for retrieving MOTs ending between two dates, e.g. to notify about MOTs ending soon without
+    downloading all of them.
+    """
+    @conditional(MotModel.__tablename__)
+    def get(self) -> Response:
+        """
+        Get page of MOTs which end_date is between given dates, ordered by end_date and id.
+
+        Query parameters:
+            - from, to: Inclusive range of end_date in YYYY-MM-DD format, both are required.
+            - active: 'true' (default) or 'false', active status of returned MOTs, 'all' for both.
+            - limit: Number of MOTs on the page, MOTS_PAGE_SIZE by default, at most MOTS_PAGE_MAX_SIZE.
+            - cursor: next_cursor of the previous page.
+            - fields: Comma separated names of returned fields, all fields by default.
+
+        :return: Response object with a JSON containing MOTs of the page under 'mots' and 'next_cursor', which
+                 is None on the last page. 400 if any of query parameters is invalid.
+        """
+        try:
+            args = request.args
+            date_from = date.fromisoformat(args['from'])
+            date_to = date.fromisoformat(args['to'])
+            active = {'true': True, 'false': False, 'all': None}[args.get('active', 'true')]
+            limit = int(args.get('limit', MOTS_PAGE_SIZE))
+            if not 1 <= limit <= MOTS_PAGE_MAX_SIZE:
+                raise ValueError(f'limit has to be between 1 and {MOTS_PAGE_MAX_SIZE}')
+            cursor = _parse_cursor(args['cursor']) if args.get('cursor') else None
+            fields = [field.strip() for field in args['fields'].split(',')] if args.get('fields') else None
+            if fields and not set(fields) <= set(MOT_FIELDS):
+                raise ValueError(f'Unknown fields: {set(fields) - set(MOT_FIELDS)}')
+        except (KeyError, ValueError) as e:
+            logging.info(e)
+            return invalid_request(e), 400
+
+        mots, next_cursor = MotModel.get_expiring(date_from, date_to, limit, cursor, fields, active)
+        return {'mots': mots, 'next_cursor': _format_cursor(next_cursor)}, 200
+
+
+class MotsByRegistrationsResource(Resource):
+    """
+    Resource class for retrieving MOTs of many cars at once.
+    """
+    def post(self) -> Response:
+        """
+        Get MOTs of every car from JSON body {"car_registration_numbers": [...]}, which has at most
+        MOTS_MAX_REGISTRATIONS registration numbers.
+
+        :return: Response object with a JSON containing lists of MOTs by registration number under 'mots'.
+                 400 if the body is invalid.
+        """
+        try:
+            registrations = _parse_registrations(request.get_json(silent=True))
+        except ValueError as e:
+            logging.info(e)
+            return invalid_request(e), 400
+        return {'mots': MotModel.get_by_registrations(registrations)}, 200
+
+
+class DeactivateExpiredMotsResource(Resource):
+    """
+    Resource class for deactivating MOTs which have already ended, called daily by the scheduler.
+    """
+    def post(self) -> Response:
+        """
+        Deactivate all active MOTs which end_date is before today. It is idempotent, repeated call deactivates
+        only MOTs which have expired since the previous one.
+
+        :return: Response object with a JSON containing number of deactivated MOTs under 'deactivated'.
+        """
+        deactivated = MotModel.deactivate_expired(date.today(), MOTS_DEACTIVATE_BATCH_SIZE)
+        logging.info(f'Deactivated {deactivated} expired MOTs')
+        return {'deactivated': deactivated}, 200
+
+
 class MotsResource(Resource):
+    @conditional(MotModel.__tablename__)
     def get(self, mot_id: int) -> Response:
         """
 
@@ -68,23 +155,20 @@ class MotsResource(Resource):
         """
         try:
             data = request.get_json()
-            mot_schema.validate(data)
+            mot_schema.validate(data, partial=True)
             mot = MotModel.get_by_id(mot_id)
             if mot:
                 mot.update(data)
                 return mot.as_dict(), 200
             return {"message": "Mot does not exist"}, 404
-        except ValueError or TypeError:
-            return {"message": "Invalid request"}, 400
+        except ValueError or TypeError as e:
+            return invalid_request(e), 400
 
 
 class MotResourceAdd(Resource):
     """
     MotResourceAdd class is a subclass of Resource class. It handles the POST request to add a new MOT (Ministry of Transport) record.
 
-    Attributes:
-        parser (RequestParser): A RequestParser object for parsing the request arguments.
-
     Methods:
         post(self) -> Response:
             Handles the POST request and adds a new MOT record.
@@ -94,15 +178,6 @@ class MotResourceAdd(Resource):
                 - If there is an integrity error, rolls back the session and returns the error message and status code 403.
                 - If there is a value or type error in the request, returns the error message and status code 400.
     """
-    parser = reqparse.RequestParser()
-    parser.add_argument('legal_identifier', type=str, required=True, help='Legal identifier of mot is required')
-    parser.add_argument('start_date', type=str, required=True, help='Start date of mot is required')
-    parser.add_argument('end_date', type=str, required=True, help='End date of mot is required')
-    parser.add_argument('car_registration_number', type=str, required=True, help='Car registration number of mot is required')
-    parser.add_argument('img_url', type=str, required=True,
-                        help='Image url of the mot is required')
-    parser.add_argument('active', type=bool, required=True, help='Active flag of mot is required')
-
     def post(self) -> Response:
         """
         Endpoint to handle POST requests.
@@ -115,7 +190,7 @@ class MotResourceAdd(Resource):
                  fails due to a value or type error, it will return a JSON object with an
                  "Invalid request" message and a status code 400.
         """
-        data = self.parser.parse_args()
+        data = request.get_json(silent=True)
 
         try:
             mot_schema.validate(data)
@@ -125,5 +200,43 @@ class MotResourceAdd(Resource):
         except IntegrityError as e:
             sa.session.rollback()
             return {"message": e.orig.args[1]}, 403
-        except ValueError or TypeError:
-            return {"message": "Invalid request"}, 400
+        except ValueError or TypeError as e:
+            return invalid_request(e), 400
+
+
+def _parse_cursor(cursor: str) -> tuple[date, int]:
+    """
+    :param cursor: Cursor in format returned by _format_cursor().
+    :return: End date and id of the last MOT of previous page.
+    :raises ValueError: If cursor is malformed.
+    """
+    end_date, _, mot_id = cursor.partition('_')
+    return date.fromisoformat(end_date), int(mot_id)
+
+
+def _format_cursor(cursor: tuple[date, int] | None) -> str | None:
+    """
+    :param cursor: End date and id of the last MOT of the page, None on the last page.
+    :return: Opaque cursor of the next page, e.g. '2024-05-31_42'.
+    """
+    if cursor is None:
+        return None
+    end_date, mot_id = cursor
+    return f'{end_date.isoformat()}_{mot_id}'
+
+
+def _parse_registrations(data: Any) -> list[str]:
+    """
+    :param data: JSON body of batch lookup request.
+    :return: Unique registration numbers from the body, in order of their first occurrence.
+    :raises ValueError: If the body isn't {"car_registration_numbers": [...]} with 1 to MOTS_MAX_REGISTRATIONS
+                        strings.
+    """
+    if type(data) is not dict or data.keys() != {'car_registration_numbers'}:
+        raise ValueError('Body has to have only car_registration_numbers')
+    registrations = data['car_registration_numbers']
+    if type(registrations) is not list or not all(type(registration) is str for registration in registrations):
+        raise ValueError('car_registration_numbers has to be a list of strings')
+    if not 1 <= len(registrations) <= MOTS_MAX_REGISTRATIONS:
+        raise ValueError(f'car_registration_numbers has to have 1 to {MOTS_MAX_REGISTRATIONS} items')
+    return list(dict.fromkeys(registrations))
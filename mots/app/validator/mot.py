@@ -1,10 +1,11 @@
-from schemadict import schemadict
+from app.validator.configuration import Schema
 
 """
-mot_schema implements .validate() method which will return error if any of dict keys won't meet declared constraints
+mot_schema is built once, its .validate() raises ValidationError (ValueError) listing every key that doesn't
+meet declared constraints
 """
 
-mot_schema = schemadict({
+mot_schema = Schema({
     'legal_identifier': {
         'type': str,
         'min_len': 20,
@@ -8,7 +8,10 @@ from flask_restful import Api
 from app.env_variables import TEST_SQLALCHEMY_DATABASE_URI, SQLALCHEMY_DATABASE_URI
 from app.db.configuration import sa
 
-from app.route.mot import AllMotsResource, MotsResource, MotResourceAdd
+from app.route.mot import (
+    AllMotsResource, ExpiringMotsResource, MotsByRegistrationsResource, DeactivateExpiredMotsResource,
+    MotsResource, MotResourceAdd
+)
 
 logging.basicConfig(level=logging.INFO)
 
@@ -37,6 +40,9 @@ def app():
 
         api = Api(app)
         api.add_resource(AllMotsResource, '/mots/all')
+        api.add_resource(ExpiringMotsResource, '/mots/expiring')
+        api.add_resource(MotsByRegistrationsResource, '/mots/by_registrations')
+        api.add_resource(DeactivateExpiredMotsResource, '/mots/deactivate_expired')
         api.add_resource(MotsResource, '/mots/<int:mot_id>')
         api.add_resource(MotResourceAdd, '/mots')
 
@@ -46,7 +46,10 @@ def test_crate_mot_with_invalid_data(client, mot_data):
     invalid_mot_data = {**mot_data, ** {'car_registration_number': 'DPL96RR R'}}
     response = client.post("/mots", json=invalid_mot_data)
     assert response.status_code == 400
-    assert response.json == {'message': "Invalid request"}
+    assert response.json == {'message': "Invalid request", 'errors': [
+        {'field': 'car_registration_number', 'rule': 'max_len', 'message': 'length has to be at most 7'},
+        {'field': 'car_registration_number', 'rule': 'regex', 'message': 'has to match ^[A-Z0-9]{7}$'}
+    ]}
 
 
 def test_get_one_by_id(client, mot_data):
@@ -149,7 +152,10 @@ def test_update_mot_by_id_with_bad_data(client, mot_data):
     client.post('/mots/1', json=mot_data)
     response = client.patch("/mots/1", json={**mot_data, 'car_registration_number': 'DDD0000 0'}) # regex won't match
     assert response.status_code == 400
-    assert response.json == {"message": "Invalid request"}
+    assert response.json == {"message": "Invalid request", "errors": [
+        {"field": "car_registration_number", "rule": "max_len", "message": "length has to be at most 7"},
+        {"field": "car_registration_number", "rule": "regex", "message": "has to match ^[A-Z0-9]{7}$"}
+    ]}
 
 def test_update_mot_by_id_when_not_exists(client, mot_data):
     """
@@ -169,3 +175,103 @@ def test_update_mot_by_id_when_not_exists(client, mot_data):
     assert response.status_code == 404
     assert response.json == {"message": "Mot does not exist"}
 
+
+
+def test_get_expiring_mots(client, mot_data):
+    """
+    Test that active MOTs ending within the range are returned by default, ordered by end date, page by page,
+    and that inactive ones are returned only on request.
+
+    :param client: The client for making HTTP requests.
+    :param mot_data: The data of the MOTs to be created.
+    :return: None
+    """
+    for number, (end_date, active) in enumerate([("2023-03-01", True), ("2023-01-15", True), ("2023-02-01", False),
+                                                 ("2023-01-15", True), ("2023-06-01", True)]):
+        mot = {**mot_data, "legal_identifier": f"XXX/XXX/XXX/XXXX/000{number}", "end_date": end_date, "active": active}
+        assert client.post("/mots", json=mot).status_code == 201
+
+    response = client.get("/mots/expiring?from=2023-01-01&to=2023-03-01&limit=2&fields=id,end_date")
+    assert response.status_code == 200
+    assert response.json == {
+        "mots": [{"id": 2, "end_date": "2023-01-15"}, {"id": 4, "end_date": "2023-01-15"}],
+        "next_cursor": "2023-01-15_4"
+    }
+    response = client.get("/mots/expiring?from=2023-01-01&to=2023-03-01&limit=2&fields=id&cursor=2023-01-15_4")
+    assert response.json == {"mots": [{"id": 1}], "next_cursor": None}
+
+    response = client.get("/mots/expiring?from=2023-01-01&to=2023-03-01&active=false")
+    assert [mot["id"] for mot in response.json["mots"]] == [3]
+
+    # inactive mots ending within the range are included on request, e.g. for notifications
+    response = client.get("/mots/expiring?from=2023-01-01&to=2023-03-01&active=all&limit=3")
+    assert [mot["id"] for mot in response.json["mots"]] == [2, 4, 3]
+    cursor = response.json["next_cursor"]
+    response = client.get(f"/mots/expiring?from=2023-01-01&to=2023-03-01&active=all&cursor={cursor}")
+    assert [mot["id"] for mot in response.json["mots"]] == [1]
+
+
+def test_get_expiring_mots_with_invalid_parameters(client):
+    """
+    Test that expiring MOTs can't be requested without date range or with malformed parameters.
+
+    :param client: The client for making HTTP requests.
+    :return: None
+    """
+    for query in ("to=2023-03-01", "from=2023-01-01&to=2023-13-01", "from=2023-01-01&to=2023-03-01&limit=0",
+                  "from=2023-01-01&to=2023-03-01&cursor=4", "from=2023-01-01&to=2023-03-01&fields=owner",
+                  "from=2023-01-01&to=2023-03-01&active=yes"):
+        response = client.get(f"/mots/expiring?{query}")
+        assert response.status_code == 400
+        assert response.json == {"message": "Invalid request"}
+
+
+def test_get_mots_by_registrations(client, mot_data):
+    """
+    Test that MOTs of all requested cars are returned grouped by registration number, empty list for cars without
+    MOTs.
+
+    :param client: The client for making HTTP requests.
+    :param mot_data: The data of the MOTs to be created.
+    :return: None
+    """
+    for number, (registration, end_date) in enumerate([("DPL96RR", "2024-01-01"), ("WX12345", "2023-01-01"),
+                                                       ("DPL96RR", "2023-01-01")]):
+        mot = {**mot_data, "legal_identifier": f"XXX/XXX/XXX/XXXX/000{number}",
+               "car_registration_number": registration, "end_date": end_date}
+        assert client.post("/mots", json=mot).status_code == 201
+
+    response = client.post("/mots/by_registrations", json={"car_registration_numbers": ["DPL96RR", "KR00000"]})
+    assert response.status_code == 200
+    assert {registration: [mot["id"] for mot in mots] for registration, mots in response.json["mots"].items()} == {
+        "DPL96RR": [3, 1],
+        "KR00000": []
+    }
+
+    response = client.post("/mots/by_registrations", json={"car_registration_numbers": []})
+    assert response.status_code == 400
+    assert response.json == {"message": "Invalid request"}
+
+
+def test_deactivate_expired_mots(client, mot_data, monkeypatch):
+    """
+    Test that only active MOTs which have already ended are deactivated and that repeated call changes nothing.
+
+    :param client: The client for making HTTP requests.
+    :param mot_data: The data of the MOTs to be created.
+    :param monkeypatch: Fixture used to deactivate one MOT per batch.
+    :return: None
+    """
+    monkeypatch.setattr('app.route.mot.MOTS_DEACTIVATE_BATCH_SIZE', 1)
+    for number, end_date in enumerate(["2023-01-01", "2099-01-01", "2022-06-01"]):
+        mot = {**mot_data, "legal_identifier": f"XXX/XXX/XXX/XXXX/000{number}", "end_date": end_date}
+        assert client.post("/mots", json=mot).status_code == 201
+
+    response = client.post("/mots/deactivate_expired")
+    assert response.status_code == 200
+    assert response.json == {"deactivated": 2}
+    assert [mot["active"] for mot in client.get("/mots/all").json["all_mots"]] == [False, True, False]
+
+    etag = client.get("/mots/all").headers["ETag"]
+    assert client.post("/mots/deactivate_expired").json == {"deactivated": 0}
+    assert client.get("/mots/all").headers["ETag"] == etag
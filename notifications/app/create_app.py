@@ -1,12 +1,12 @@
 import httpx
 
 from collections import defaultdict
-from typing import Any
 from datetime import date, timedelta
 
 from flask import Flask
 
 from app.models.mapers import NotificationMapper
+from app.parsers.paginated_request_json_parser import PaginatedRequestJsonParser
 from app.parsers.request_json_parser import RequestJsonParser
 from app.services.email_notifications_sender import EmailNotificationsSender
 from app.email.configuration import MAIL_SETTINGS, MailSender
@@ -30,20 +30,19 @@ def main():
             :param days: The number of days to check for upcoming end dates.
             :return: A dictionary with a success message and status code.
             """
-            def with_end_date_within(days_left: int, liability_elements: list[dict[str, Any]]) -> list[dict[str, Any]]:
-                return [liability for liability in liability_elements if
-                        date.today() <= date.fromisoformat(liability['end_date']) <= date.today() + timedelta(
-                            days=days_left)]
-
-            mots = with_end_date_within(
-                days,
-                RequestJsonParser("http://mots-service:8002/mots/all", "all_mots").parse(httpx)
-            )
-            insurances = with_end_date_within(
-                days,
-                RequestJsonParser("http://insurances-service:8004/insurances/all", "all_insurances").parse(
-                    httpx)
-            )
+            # only MOTs and insurances ending within the days are transferred, not all of them, inactive ones
+            # included, as they were when all of them were filtered here
+            expiring = {
+                'from': date.today().isoformat(),
+                'to': (date.today() + timedelta(days=days)).isoformat(),
+                'active': 'all',
+                'fields': 'car_registration_number,end_date',
+                'limit': 1000
+            }
+            mots = PaginatedRequestJsonParser("http://mots-service:8002/mots/expiring", "mots", expiring).parse(httpx)
+            insurances = PaginatedRequestJsonParser(
+                "http://insurances-service:8004/insurances/expiring", "insurances", expiring
+            ).parse(httpx)
 
             drivers = RequestJsonParser("http://drivers:8008/drivers/all", "all_drivers").parse(httpx)
 
@@ -0,0 +1,39 @@
+from dataclasses import dataclass, field
+from typing import Any
+
+from app.parsers.request_parser import RequestParser
+
+
+@dataclass
+class PaginatedRequestJsonParser(RequestParser):
+    """
+    Parser of JSON responses of paginated endpoints, which return items of one page under `param` and cursor of
+    the next page under 'next_cursor'. Pages are requested until next_cursor is None.
+
+    Attributes:
+        url (str): The URL to request the JSON data from.
+        param (str): The key of the items in the JSON data.
+        params (dict[str, Any]): Query parameters sent with every page request, cursor is added to them.
+
+    Example Usage:
+        mots = PaginatedRequestJsonParser("http://mots-service:8002/mots/expiring", "mots",
+                                          {"from": "2024-01-01", "to": "2024-01-31"}).parse(httpx)
+    """
+    url: str
+    param: str
+    params: dict[str, Any] = field(default_factory=dict)
+
+    def parse(self, http_client) -> list[dict[str, Any]]:
+        """
+        :param http_client: The HTTP client object used to make the requests.
+        :return: Items of all pages.
+        """
+        items = []
+        cursor = None
+        while True:
+            params = {**self.params, 'cursor': cursor} if cursor else self.params
+            page = http_client.get(self.url, params=params).json()
+            items.extend(page[self.param])
+            cursor = page['next_cursor']
+            if cursor is None:
+                return items
@@ -0,0 +1,152 @@
+import threading
+from datetime import date
+from typing import Any
+
+from sqlalchemy import Date, Select, case, func, select
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+from app.db.configuration import sa
+from app.db.model import RepairModel, RepairStatus, TableVersionModel
+
+"""
+Percentiles of approximate duration returned for every garage
+"""
+DURATION_PERCENTILES = (50, 90)
+
+"""
+Name of the status of finished repairs, repairs in any other status are the backlog of their garage
+"""
+READY_STATUS = 'ready'
+
+
+class date_add_days(FunctionElement):
+    """
+    Date moved by given number of days, date_add_days(RepairModel.start_date, RepairModel.approximate_duration).
+    """
+    type = Date()
+    name = 'date_add_days'
+    inherit_cache = True
+
+
+@compiles(date_add_days)
+def _compile_date_add_days(element: date_add_days, compiler: Any, **kw: Any) -> str:
+    day, days = element.clauses
+    return f'DATE_ADD({compiler.process(day, **kw)}, INTERVAL {compiler.process(days, **kw)} DAY)'
+
+
+class GarageAnalytics:
+    """
+    Repair statistics of every garage, computed by the database with one query - rows are ranked by duration
+    with window functions and aggregated per garage, so only one row per garage is transferred.
+
+    Computed statistics are cached together with version of repairs table and reused until any write (e.g.
+    change of repair status) changes it, checking it costs one primary key lookup per request.
+
+    Statistics of a garage:
+        - repairs, finished, backlog: Number of all repairs, repairs in READY_STATUS and all the others.
+        - mean_duration: Mean approximate duration in days, None when no repair has it.
+        - duration_percentiles: Nearest-rank percentiles of approximate duration, keys p50, p90...
+        - next_estimated_completion, backlog_estimated_completion: The first and the last estimated completion date
+          (start date + approximate duration) of the backlog, None when no repair of the backlog has both.
+
+    Example usage:
+        statistics = garage_analytics.statistics()
+        statistics['garages'][0]['backlog_estimated_completion']
+    """
+    def __init__(self):
+        self._cached: tuple[int, dict[str, Any]] | None = None
+        self._lock = threading.Lock()
+
+    def statistics(self) -> dict[str, Any]:
+        """
+        :return: Statistics of every garage under 'garages', ordered by garage name.
+        """
+        version = TableVersionModel.current(RepairModel.__tablename__)
+        cached = self._cached
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        with self._lock:
+            cached = self._cached
+            if cached is not None and cached[0] == version:
+                return cached[1]
+            statistics = {'garages': [_garage_statistics(row) for row in sa.session.execute(statistics_query())]}
+            self._cached = (version, statistics)
+            return statistics
+
+    def invalidate(self) -> None:
+        """
+        Drops cached statistics, they are computed again on next request.
+        """
+        self._cached = None
+
+
+def statistics_query() -> Select:
+    """
+    :return: Select of one row of statistics per garage, columns are named like keys of the statistics and
+             percentiles are named p50, p90...
+    """
+    duration = RepairModel.approximate_duration
+    has_duration = duration.isnot(None)
+    finished = RepairStatus.name == READY_STATUS
+    # repairs without duration are ranked in their own partition, so ranks of durations are 1...durations
+    ranked = (
+        select(
+            RepairModel.garage_name,
+            duration,
+            finished.label('finished'),
+            case((~finished, date_add_days(RepairModel.start_date, duration))).label('estimated_completion'),
+            func.row_number().over(
+                partition_by=(RepairModel.garage_name, has_duration), order_by=duration
+            ).label('duration_rank'),
+            func.count(duration).over(partition_by=RepairModel.garage_name).label('durations')
+        )
+        .join(RepairStatus, RepairModel.repair_status == RepairStatus.id)
+        .subquery()
+    )
+    # nearest-rank percentile is the shortest duration which rank is at least p% of durations
+    percentiles = [
+        func.min(case(
+            (ranked.c.approximate_duration.isnot(None) & (ranked.c.duration_rank * 100 >= ranked.c.durations * p),
+             ranked.c.approximate_duration)
+        )).label(f'p{p}')
+        for p in DURATION_PERCENTILES
+    ]
+    return (
+        select(
+            ranked.c.garage_name,
+            func.count().label('repairs'),
+            func.sum(case((ranked.c.finished, 1), else_=0)).label('finished'),
+            func.avg(ranked.c.approximate_duration).label('mean_duration'),
+            *percentiles,
+            func.min(ranked.c.estimated_completion).label('next_estimated_completion'),
+            func.max(ranked.c.estimated_completion).label('backlog_estimated_completion')
+        )
+        .group_by(ranked.c.garage_name)
+        .order_by(ranked.c.garage_name)
+    )
+
+
+def _garage_statistics(row: Any) -> dict[str, Any]:
+    """
+    :param row: Row selected by statistics_query().
+    :return: Statistics of the garage.
+    """
+    finished = int(row.finished)
+    return {
+        'garage_name': row.garage_name,
+        'repairs': row.repairs,
+        'finished': finished,
+        'backlog': row.repairs - finished,
+        'mean_duration': float(row.mean_duration) if row.mean_duration is not None else None,
+        'duration_percentiles': {f'p{p}': getattr(row, f'p{p}') for p in DURATION_PERCENTILES},
+        'next_estimated_completion': _isoformat(row.next_estimated_completion),
+        'backlog_estimated_completion': _isoformat(row.backlog_estimated_completion)
+    }
+
+
+def _isoformat(day: date | None) -> str | None:
+    return day.isoformat() if day is not None else None
+
+
+garage_analytics = GarageAnalytics()
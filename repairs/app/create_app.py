@@ -6,6 +6,7 @@ from flask_restful import Api
 from app.env_variables import SQLALCHEMY_DATABASE_URI
 from app.db.model import RepairModel, RepairStatus # Models are imported and not used, but necessary for flask_migrate mechanizm
 from app.db.configuration import sa
+from app.json.configuration import configure_json
 from app.routes.repair_resources import RepairEndPointsMapper
 from app.routes.repair_blueprints import repairs
 
@@ -58,6 +59,7 @@ def main() -> Flask:
     api = Api(app)
     RepairEndPointsMapper(api).init_endpoints()
     app.register_blueprint(repairs)
+    configure_json(app, api)
 
     # -------------------------------------------------------------
     # MIGRATION CONFIGURATION
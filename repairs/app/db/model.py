@@ -1,5 +1,40 @@
 from typing import Self, Any
+from sqlalchemy import select, update
+
 from app.db.configuration import sa
+from app.db.serialization import RowSerializer
+
+
+class TableVersionModel(sa.Model):
+    """
+    Change counter of a table. It is incremented in the same transaction as every write made through save(),
+    update() and delete() of the table's model, so reading it is a cheap validator of the whole table - one
+    primary key lookup instead of reading the rows. Used for ETags of GET endpoints.
+    """
+    __tablename__ = 'table_versions'
+
+    name = sa.Column(sa.String(64), primary_key=True)
+    version = sa.Column(sa.BigInteger, nullable=False, default=0)
+
+    @classmethod
+    def bump(cls, name: str) -> None:
+        """
+        Increments version of the table in current transaction, caller commits it together with the change.
+
+        :param name: Name of the table.
+        :return: None
+        """
+        bumped = sa.session.execute(update(cls).where(cls.name == name).values(version=cls.version + 1))
+        if not bumped.rowcount:
+            sa.session.add(cls(name=name, version=1))
+
+    @classmethod
+    def current(cls, name: str) -> int:
+        """
+        :param name: Name of the table.
+        :return: Version of the table, 0 if it has never been changed.
+        """
+        return sa.session.execute(select(cls.version).where(cls.name == name)).scalar() or 0
 
 
 class RepairStatus(sa.Model):
@@ -24,8 +59,8 @@ class RepairModel(sa.Model):
     - `delete()`: Deletes the `RepairModel` object from the database.
     - `update(data: dict[str, Any])`: Updates the `RepairModel` object with the provided data.
     - `get_by_id(repair_id: int) -> RepairModel`: Retrieves a repair record by its ID.
-    - `get_all_by_car_id(car_id: int) -> list[RepairModel]`: Retrieves all repair records associated with a specific car ID.
-    - `get_all() -> list[RepairModel]`: Retrieves all repair records.
+    - `get_all_by_car_id(car_id: int) -> list[dict[str, Any]]`: Retrieves all repair records associated with a specific car ID.
+    - `get_all() -> list[dict[str, Any]]`: Retrieves all repair records.
 
     Usage:
 
@@ -87,6 +122,7 @@ class RepairModel(sa.Model):
         :return: None
         """
         sa.session.add(self)
+        TableVersionModel.bump(self.__tablename__)
         sa.session.commit()
 
     def delete(self) -> None:
@@ -97,6 +133,7 @@ class RepairModel(sa.Model):
 
         """
         sa.session.delete(self)
+        TableVersionModel.bump(self.__tablename__)
         sa.session.commit()
 
     def update(self, data: dict[str, Any]) -> None:
@@ -136,6 +173,7 @@ class RepairModel(sa.Model):
         self.garage_phone = data.get('garage_phone', self.garage_phone)
 
         sa.session.add(self)
+        TableVersionModel.bump(self.__tablename__)
         sa.session.commit()
 
     @classmethod
@@ -151,24 +189,38 @@ class RepairModel(sa.Model):
         return sa.session.get(cls, {"id": repair_id})
 
     @classmethod
-    def get_all_by_car_id(cls, car_id: int) -> list[Self]:
+    def get_all_by_car_id(cls, car_id: int) -> list[dict[str, Any]]:
         """
         Retrieve all repairs by car ID.
 
         :param car_id: The ID of the car for which repairs are retrieved.
-        :return: A list of repair objects associated with the specified car ID.
+        :return: A list of repair dictionaries associated with the specified car ID.
         """
-        found_repairs = sa.session.execute(sa.select(cls).filter_by(car_id=car_id)).scalars()
-        if found_repairs:
-            return [repair.as_dict() for repair in found_repairs]
-        return []
+        return repair_serializer.all(cls.car_id == car_id)
 
     @classmethod
-    def get_all(cls) -> list[Self]:
+    def get_all(cls) -> list[dict[str, Any]]:
         """
-        Retrieves all instances of the class.
+        Retrieves all instances of the class. Rows are serialized straight from selected columns, without
+        creating RepairModel objects.
 
-        :return: A list of instances of the class.
-        :rtype: list
+        :return: A list of repair dictionaries, same as the ones returned by as_dict().
         """
-        return [repair.as_dict() for repair in sa.session.query(cls).all()]
+        return repair_serializer.all()
+
+
+"""
+Fields of repair in order of keys of as_dict()
+"""
+REPAIR_FIELDS = (
+    'id',
+    'car_id',
+    'repair_status',
+    'repair_description',
+    'start_date',
+    'approximate_duration',
+    'garage_name',
+    'garage_phone',
+)
+
+repair_serializer = RowSerializer(RepairModel, REPAIR_FIELDS)
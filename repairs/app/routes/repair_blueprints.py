@@ -3,12 +3,15 @@ from sqlalchemy.exc import IntegrityError
 
 from app.db.configuration import sa
 from app.db.model import RepairModel
+from app.routes.conditional import conditional
 from app.validator.repair import repair_schema
+from app.validator.configuration import invalid_request
 
 repairs = Blueprint('repairs', __name__, url_prefix='/repairs')
 
 
 @repairs.route('/by_car_id/<int:car_id>', methods=['GET'])
+@conditional(RepairModel.__tablename__)
 def get_by_car_id(car_id: int) -> Response:
     """
     :param car_id: The ID of the car for which repairs are requested.
@@ -31,7 +34,8 @@ def add_pending() -> Response:
     """
     request_data = request.get_json()
     try:
-        repair_schema.validate(request_data)
+        # pending repair has no start date and duration yet
+        repair_schema.validate(request_data, partial=True)
         repair = RepairModel(**request_data)
         repair.save()
         return repair.as_dict(), 201, {'Content-Type': 'application/json'}
@@ -40,8 +44,8 @@ def add_pending() -> Response:
         sa.session.rollback()
         return {"message": e.orig.args[1]}, 403
 
-    except ValueError or TypeError:
-        return {"message": "Invalid request"}, 400
+    except ValueError or TypeError as e:
+        return invalid_request(e), 400
 
 @repairs.route('/start_pending/<int:repair_id>', methods=['POST'])
 def start_pending(repair_id: int) -> Response:
@@ -1,10 +1,13 @@
 import logging
 
 from flask import Response, make_response, request
-from flask_restful import Resource, reqparse, Api
+from flask_restful import Resource, Api
 from sqlalchemy.exc import IntegrityError
 from app.validator.repair import repair_schema
+from app.validator.configuration import invalid_request
+from app.analytics.garages import garage_analytics
 from app.db.model import RepairModel
+from app.routes.conditional import conditional
 from app.db.configuration import sa
 
 logging.basicConfig(level=logging.INFO)
@@ -14,21 +17,9 @@ class AddRepairResource(Resource):
     """
     Class representing a resource for adding repairs.
 
-    Attributes:
-        parser (RequestParser): Request parser for parsing and validating request data.
-
     Methods:
         post: Handles the POST request to add a new repair.
     """
-    parser = reqparse.RequestParser()
-    parser.add_argument('car_id', type=int, required=True)
-    parser.add_argument('repair_status', type=int, required=True)
-    parser.add_argument('repair_description', type=str, required=True)
-    parser.add_argument('approximate_duration', type=int, required=True)
-    parser.add_argument('start_date', type=str, required=True)
-    parser.add_argument('garage_name', type=str, required=True)
-    parser.add_argument('garage_phone', type=str, required=True)
-
     def post(self) -> Response:
         """
         Handles the HTTP POST request to create a new repair.
@@ -37,7 +28,7 @@ class AddRepairResource(Resource):
         :return: A Response object with the result of the request.
 
         """
-        request_data = self.parser.parse_args()
+        request_data = request.get_json(silent=True)
 
         try:
             repair_schema.validate(request_data)
@@ -49,8 +40,8 @@ class AddRepairResource(Resource):
             sa.session.rollback()
             return {"message": e.orig.args[1]}, 403
 
-        except ValueError or TypeError:
-            return {"message": "Invalid request"}, 400
+        except ValueError or TypeError as e:
+            return invalid_request(e), 400
 
 
 class AllRepairsResource(Resource):
@@ -60,6 +51,7 @@ class AllRepairsResource(Resource):
     This class extends the `Resource` class from the `flask_restful` module.
 
     """
+    @conditional(RepairModel.__tablename__)
     def get(self) -> Response:
         """
         Get all repairs.
@@ -79,6 +71,7 @@ class RepairsResource(Resource):
     This class represents a resource endpoint for handling repairs.
 
     """
+    @conditional(RepairModel.__tablename__)
     def get(self, repair_id: int) -> Response:
         """
         :param repair_id: The ID of the repair to retrieve.
@@ -117,14 +110,32 @@ class RepairsResource(Resource):
         """
         try:
             data = request.get_json()
-            repair_schema.validate(data)
+            repair_schema.validate(data, partial=True)
             repair = RepairModel.get_by_id(repair_id)
             if repair:
                 repair.update(data)
                 return repair.as_dict(), 200
             return {"message": "Repair does not exist"}, 404
-        except ValueError or TypeError:
-            return {"message": "Invalid request"}, 400
+        except ValueError or TypeError as e:
+            return invalid_request(e), 400
+
+
+class GarageAnalyticsResource(Resource):
+    """
+    A class representing an API resource for repair statistics of every garage.
+
+    """
+    @conditional(RepairModel.__tablename__)
+    def get(self) -> Response:
+        """
+        Get repair statistics of every garage, see GarageAnalytics for their meaning. Statistics are computed once
+        per change of repairs table.
+
+        :return: Response object
+            - 200: {"garages": [{"garage_name": ..., "repairs": ..., "backlog": ..., "duration_percentiles": {...},
+                    ...}]}
+        """
+        return garage_analytics.statistics(), 200
 
 
 class RepairEndPointsMapper:
@@ -137,6 +148,7 @@ class RepairEndPointsMapper:
         (AddRepairResource, '/repairs'),
         (AllRepairsResource, '/repairs/all'),
         (RepairsResource, '/repairs/<int:repair_id>'),
+        (GarageAnalyticsResource, '/repairs/analytics/garages'),
     ]
 
     def __init__(self, api: Api):
@@ -1,10 +1,11 @@
-from schemadict import schemadict
+from app.validator.configuration import Schema
 
 """
-repair_schema implements .validate() method which will return error if any of dict keys won't meet declared constraints
+repair_schema is built once, its .validate() raises ValidationError (ValueError) listing every key that doesn't
+meet declared constraints
 """
 
-repair_schema = schemadict({
+repair_schema = Schema({
     'car_id': {
         'type': int,
     },
@@ -7,6 +7,7 @@ from flask_restful import Api
 
 from app.env_variables import TEST_SQLALCHEMY_DATABASE_URI, SQLALCHEMY_DATABASE_URI
 from app.db.configuration import sa
+from app.analytics.garages import garage_analytics
 from app.db.model import RepairStatus
 from app.routes.repair_resources import RepairEndPointsMapper
 
@@ -45,6 +46,7 @@ def app():
 
         ])
         sa.session.commit()
+        garage_analytics.invalidate()
 
         api = Api(app)
         RepairEndPointsMapper(api).init_endpoints()
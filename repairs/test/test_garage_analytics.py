@@ -0,0 +1,65 @@
+GARAGE_REPAIRS = [
+    ("WWA Main Garage", 1, 2, "2024-02-01"),
+    ("WWA Main Garage", 2, 10, "2024-02-05"),
+    ("WWA Main Garage", 3, 1, "2024-01-01"),
+    ("WWA Main Garage", 1, 3, "2024-02-10"),
+    ("KRK Garage", 3, 5, "2024-01-10"),
+]
+
+
+class TestGarageAnalyticsRoutes:
+    def test_garage_statistics(self, client, repair_data) -> None:
+        """
+        Test that statistics of every garage are computed from its repairs and recomputed after status of a repair
+        changes.
+
+        :param client: The test client.
+        :param repair_data: The data for creating repairs.
+        :return: None.
+        """
+        for garage_name, repair_status, approximate_duration, start_date in GARAGE_REPAIRS:
+            response = client.post('/repairs', json={**repair_data, 'garage_name': garage_name,
+                                                     'repair_status': repair_status,
+                                                     'approximate_duration': approximate_duration,
+                                                     'start_date': start_date})
+            assert response.status_code == 201
+
+        response = client.get('/repairs/analytics/garages')
+        assert response.status_code == 200
+        assert response.json == {'garages': [
+            {
+                'garage_name': 'KRK Garage',
+                'repairs': 1,
+                'finished': 1,
+                'backlog': 0,
+                'mean_duration': 5.0,
+                'duration_percentiles': {'p50': 5, 'p90': 5},
+                'next_estimated_completion': None,
+                'backlog_estimated_completion': None
+            },
+            {
+                'garage_name': 'WWA Main Garage',
+                'repairs': 4,
+                'finished': 1,
+                'backlog': 3,
+                'mean_duration': 4.0,
+                'duration_percentiles': {'p50': 2, 'p90': 10},
+                'next_estimated_completion': '2024-02-03',
+                'backlog_estimated_completion': '2024-02-15'
+            }
+        ]}
+
+        client.post('/repairs/finish/2')
+        garage = client.get('/repairs/analytics/garages').json['garages'][1]
+        assert (garage['backlog'], garage['backlog_estimated_completion']) == (2, '2024-02-13')
+
+    def test_garage_statistics_without_repairs(self, client) -> None:
+        """
+        Test that statistics without repairs have no garages.
+
+        :param client: The test client.
+        :return: None.
+        """
+        response = client.get('/repairs/analytics/garages')
+        assert response.status_code == 200
+        assert response.json == {'garages': []}
@@ -9,6 +9,14 @@ def notify_about_ending_liabilities():
     httpx.get("http://notifications-service:8009/notify-ending-mots-or-insurances/7", timeout=60)
 
 
+def deactivate_expired_liabilities():
+    for url in ("http://mots-service:8002/mots/deactivate_expired",
+                "http://insurances-service:8004/insurances/deactivate_expired"):
+        response = httpx.post(url, timeout=60)
+        logging.info(f'{url}: {response.json()}')
+
+
+schedule.every().day.at("00:05", "Europe/Amsterdam").do(deactivate_expired_liabilities)
 schedule.every().day.at("08:00", "Europe/Amsterdam").do(notify_about_ending_liabilities)
 
 if __name__ == "__main__":